@@ -0,0 +1,245 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import sys
+import json
+import time
+import queue
+import shutil
+import argparse
+import platform
+import subprocess
+import multiprocessing
+from contextlib import contextmanager
+
+from headless_play import new_game, apply_drop_key, apply_input_sequence
+
+# End-to-end throughput of each agent pipeline on fixed-seed headless games. Every agent runs in its own
+# process so that its peak RSS is its own. These numbers bound how many games (and generations) per hour
+# training gets:
+#   python benchmark_agents.py                          # All agents, default piece budgets
+#   python benchmark_agents.py --agents heuristic_sprint snes_sprint --seeds 0 1 2
+
+HEURISTIC_WEIGHTS = [-1.6576130390167236, 0.7060774564743042, -1.2531158924102783, -0.38837742805480957]  # heuristic_test.py
+
+
+class PhaseTimer:
+    """Accumulates wall time per named phase of a decision."""
+
+    def __init__(self):
+        self.seconds = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        yield
+        self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where it can't be measured."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 if sys.platform != "darwin" else peak / (1024 * 1024)  # KB on Linux, bytes on macOS
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)  # Windows
+    except (ImportError, AttributeError):
+        return None
+
+
+# === Agents ===
+# Each agent plays one game from `seed` for at most `pieces` decisions and returns (decisions, pieces placed).
+
+def heuristic_sprint(seed, pieces, timer):
+    """The four-weight heuristic agent from heuristic_test.py."""
+    game = new_game("Sprint", seed)
+    decisions = 0
+
+    while not game.game_over and decisions < pieces:
+        with timer.phase("enumerate_and_evaluate"):
+            _, drop_heuristics = game.get_all_viable_hard_drops(HEURISTIC_WEIGHTS)
+        if not drop_heuristics:
+            break
+        with timer.phase("decide"):
+            key = max(drop_heuristics.items(), key=lambda x: x[1])[0]
+        with timer.phase("apply"):
+            apply_drop_key(game, key)
+        decisions += 1
+
+    return decisions, decisions
+
+
+def snes_sprint(seed, pieces, timer):
+    """The SNES-trained LinearMLP policy from train_sprint.py, loaded from sprint_best_snes.pt."""
+    import torch
+    from tetris_env import TetrisEnv
+    from train_sprint import LinearMLP
+
+    weights = torch.load("sprint_best_snes.pt")
+    policy = LinearMLP(input_dim=536, hidden_dim=64, output_dim=1)
+    env = TetrisEnv(mode="Sprint", render_env=False)
+    env.game = new_game("Sprint", seed)
+    decisions = 0
+
+    while not env.game.game_over and decisions < pieces:
+        with timer.phase("enumerate"):
+            drop_dict, _ = env.game.get_all_viable_hard_drops()
+        if not drop_dict:
+            break
+        with timer.phase("observe"):
+            observations = torch.tensor(env.get_candidate_observations(drop_dict.values()), dtype=torch.float32)
+        with timer.phase("forward"):
+            chosen_idx = torch.argmax(policy(observations, weights).squeeze(dim=1)).item()
+        with timer.phase("apply"):
+            apply_drop_key(env.game, list(drop_dict.keys())[chosen_idx])
+        decisions += 1
+
+    return decisions, decisions
+
+
+def mcts_blitz(seed, pieces, timer):
+    """The two-ply search agent from train_blitz_MCTS.py."""
+    from train_blitz_MCTS import MCTS
+
+    mcts = MCTS(model=None)
+    game = new_game("Blitz", seed, pieces)
+    decisions = 0
+
+    while not game.game_over:
+        with timer.phase("enumerate"):
+            action_dict, _ = game.clone().get_all_viable_hard_drops()
+        with timer.phase("search"):
+            root = mcts.run(None, game, list(action_dict.keys()))
+        with timer.phase("decide"):
+            action = max(root.children.items(), key=lambda item: item[1].game.score)[0]  # What get_policy_distribution picks
+        with timer.phase("apply"):
+            apply_drop_key(game, action)
+        decisions += 1
+
+    return decisions, decisions
+
+
+def thinker_blitz(seed, pieces, timer):
+    from thinker_io import restored_files, thinker_files
+
+    with restored_files(thinker_files()):  # Don't leave the benchmark's weights and state in the user's thinker dir
+        return thinker_blitz_game(seed, pieces, timer)
+
+
+def thinker_blitz_game(seed, pieces, timer):
+    """The Rust thinker agent as driven by train_blitz_heuristic.py and playtest.py: one cargo run per move."""
+    from thinker_io import write_compact_field_json, unpack_game_actions
+
+    if shutil.which("cargo") is None:
+        raise RuntimeError("cargo is not installed")
+    shutil.copyfile("default_cold_weights.json", "tetris_thinker/weights.json")
+
+    game = new_game("Blitz", seed, pieces)
+    decisions = 0
+
+    while not game.game_over:
+        with timer.phase("serialize"):
+            write_compact_field_json("tetris_thinker/input.json", game.game_state_to_dict())
+        with timer.phase("think"):
+            completed = subprocess.run(["cargo", "run", "--", "--quiet"], cwd="tetris_thinker", stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if completed.returncode != 0:
+            raise RuntimeError(f"tetris_thinker exited with code {completed.returncode}")
+        with timer.phase("parse"):
+            inputs = unpack_game_actions("tetris_thinker/selected_actions.json")
+        with timer.phase("apply"):
+            apply_input_sequence(game, inputs)
+        decisions += 1
+
+    return decisions, decisions
+
+
+AGENTS = {
+    "heuristic_sprint": (heuristic_sprint, 200),
+    "snes_sprint": (snes_sprint, 200),
+    "mcts_blitz": (mcts_blitz, 10),
+    "thinker_blitz": (thinker_blitz, 50),
+}
+
+
+def run_agent(name, seeds, pieces, results):
+    """Child process body: plays every seed and reports totals through `results`."""
+    agent, _ = AGENTS[name]
+    timer = PhaseTimer()
+    decisions = placed = 0
+
+    try:
+        start = time.perf_counter()
+        for seed in seeds:
+            game_decisions, game_pieces = agent(seed, pieces, timer)
+            decisions += game_decisions
+            placed += game_pieces
+        elapsed = time.perf_counter() - start
+    except Exception as error:  # Missing optional dependency, model file or toolchain
+        results.put({"agent": name, "error": f"{type(error).__name__}: {error}"})
+        return
+
+    results.put({
+        "agent": name,
+        "games": len(seeds),
+        "pieces": placed,
+        "decisions": decisions,
+        "seconds": elapsed,
+        "pieces_per_sec": placed / elapsed if elapsed else 0.0,
+        "decisions_per_sec": decisions / elapsed if elapsed else 0.0,
+        "ms_per_decision_by_phase": {phase: 1000 * seconds / max(decisions, 1) for phase, seconds in timer.seconds.items()},
+        "peak_rss_mb": peak_rss_mb(),
+    })
+
+
+def wait_for_result(name, worker, results, poll_seconds = 1.0):
+    """The worker's result, or an error result if it exits without posting one (segfault, OOM kill, import error)."""
+    while True:
+        try:
+            return results.get(timeout=poll_seconds)
+        except queue.Empty:
+            pass
+        if worker.exitcode is not None:
+            try:
+                return results.get(timeout=poll_seconds)  # Posted just before exiting
+            except queue.Empty:
+                return {"agent": name, "error": f"worker exited with code {worker.exitcode} without a result"}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agent pipeline throughput benchmarks.")
+    parser.add_argument("--agents", nargs="*", default=list(AGENTS), choices=list(AGENTS))
+    parser.add_argument("--seeds", nargs="*", type=int, default=[0, 1, 2])
+    parser.add_argument("--pieces", type=int, help="Piece budget per game (defaults depend on the agent).")
+    parser.add_argument("--output", default="benchmark_agents.json")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")  # Fresh interpreter per agent, so peak RSS isn't shared
+    report = {"meta": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(), "seeds": args.seeds}, "results": {}}
+
+    for name in args.agents:
+        pieces = args.pieces or AGENTS[name][1]
+        print(f"[BENCH] {name}: {len(args.seeds)} game(s), up to {pieces} pieces each...")
+
+        results = context.Queue()
+        worker = context.Process(target=run_agent, args=(name, args.seeds, pieces, results))
+        worker.start()
+        result = wait_for_result(name, worker, results)
+        worker.join()
+
+        report["results"][name] = result
+        if "error" in result:
+            print(f"[SKIP] {name}: {result['error']}")
+            continue
+
+        phases = ", ".join(f"{phase} {ms:.2f}" for phase, ms in result["ms_per_decision_by_phase"].items())
+        rss = f"{result['peak_rss_mb']:.0f} MB" if result["peak_rss_mb"] is not None else "n/a"
+        print(f"        {result['pieces_per_sec']:.1f} pieces/s, {result['decisions_per_sec']:.1f} decisions/s, peak RSS {rss}")
+        print(f"        ms/decision: {phases}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[DONE] Results written to {args.output}")
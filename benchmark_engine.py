@@ -0,0 +1,242 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Env constructors open a window; keep benchmarks headless
+
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+
+from game_class import TetrisGame
+
+# Micro-benchmarks for the engine hot paths. Every benchmark runs on the same seeded positions, so two runs on the
+# same machine are directly comparable. Results go to JSON and are checked against a stored baseline:
+#   python benchmark_engine.py                      # Run, write benchmark_results.json, compare with baseline
+#   python benchmark_engine.py --save-baseline      # Run and store the results as the new baseline
+#   python benchmark_engine.py --only drops clone   # Run benchmarks whose names contain any of the given words
+
+HEURISTIC_WEIGHTS = [-0.510066, 0.760666, -0.35663, -0.184483]  # Article weights, also used to build positions
+
+
+def make_positions(count, seed = 0):
+    """Plays seeded heuristic games (with a little seeded noise) and snapshots the game before every placement."""
+
+    rng = random.Random(seed)
+    positions = []
+    game_seed = seed
+
+    while len(positions) < count:
+        game = TetrisGame(render=False, game_mode="Blitz")
+        game.reset_game_state(seed=game_seed)
+        game_seed += 1
+
+        while not game.game_over and len(positions) < count:
+            positions.append(game.clone())
+
+            _, heuristics = game.get_all_viable_hard_drops(HEURISTIC_WEIGHTS)
+            ranked = sorted(heuristics, key=heuristics.get, reverse=True)
+            dx, rotation, hold = ranked[min(int(rng.expovariate(1.0)), len(ranked) - 1)]  # Usually best, sometimes worse
+
+            if hold:
+                game.hold_piece()
+            for _ in range([0, "L", 2, "R"].index(rotation)):
+                game.rotate_piece("L")
+            for _ in range(abs(dx)):
+                game.move_piece(1 if dx > 0 else -1, 0)
+            game.hard_drop()
+
+    return positions
+
+
+def with_piece(game, piece_type, rotation = 0, dx = 0):
+    """Replaces the active piece with a freshly spawned piece of the given type, rotated and shifted."""
+    game.current_piece_type = piece_type
+    game.current_piece = [(r + 2, c + 4) if piece_type != "I" else (r + 2, c + 3) for r, c in game.TETRIMINO_SHAPES[piece_type][0]]
+    game.current_rotation = 0
+    for _ in range(rotation):
+        game.rotate_piece("R")
+    for _ in range(abs(dx)):
+        game.move_piece(1 if dx > 0 else -1, 0)
+    return game
+
+
+def engine_benchmarks(positions):
+    """Returns {name: (prepare, op)}. prepare(n) builds n fresh arguments outside the timed region; op consumes one."""
+
+    def cycle(items, n):
+        return [items[i % len(items)] for i in range(n)]
+
+    def fresh_clones(n, adjust = None):
+        games = [position.clone() for position in cycle(positions, n)]
+        if adjust is not None:
+            for game in games:
+                adjust(game)
+        return games
+
+    def ready_to_lock(game):
+        game.sonic_drop()
+
+    def full_bottom_rows(game):
+        game.grid[-2:, :] = "Z"
+        game.masks_stale = True  # Written in place, so the collision masks need rebuilding
+
+    def t_spin_candidate(game):
+        with_piece(game, "T", rotation=2)
+        game.sonic_drop()
+        game.qualified_for_T_spin = True
+
+    def i_against_wall(game):
+        return with_piece(game, "I", rotation=1, dx=-5)  # Vertical I flush against the left wall: rotating needs a kick
+
+    def rotate_both_ways(game):
+        game.rotate_piece("R")
+        game.rotate_piece("L")
+
+    t_positions = [position.clone() for position in positions[:50]]
+    for game in t_positions:
+        t_spin_candidate(game)
+
+    return {
+        "is_valid_position": (lambda n: cycle(positions, n), lambda g: g.is_valid_position(g.current_piece)),
+        "move_piece": (lambda n: fresh_clones(n), lambda g: (g.move_piece(-1, 0), g.move_piece(1, 0))),
+        "rotate_piece": (lambda n: fresh_clones(n), rotate_both_ways),
+        "rotate_piece_I_kicks": (lambda n: [i_against_wall(g) for g in fresh_clones(n)], lambda g: (g.rotate_piece("R"), g.rotate_piece("R"))),
+        "lock_piece": (lambda n: fresh_clones(n, ready_to_lock), lambda g: g.lock_piece()),
+        "clear_lines": (lambda n: fresh_clones(n, full_bottom_rows), lambda g: g.clear_lines()),
+        "detect_T_spin": (lambda n: cycle(t_positions, n), lambda g: g.detect_T_spin()),
+        "get_all_viable_hard_drops": (lambda n: cycle(positions, n), lambda g: g.get_all_viable_hard_drops(HEURISTIC_WEIGHTS)),
+        "evaluate_heuristics": (lambda n: cycle(positions, n), lambda g: g.evaluate_heuristics(g.grid, HEURISTIC_WEIGHTS)),
+        "clone": (lambda n: cycle(positions, n), lambda g: g.clone()),
+        "game_state_to_dict": (lambda n: cycle(positions, n), lambda g: g.game_state_to_dict()),
+    }
+
+
+def env_benchmarks(positions):
+    """get_observation for every env. Envs whose dependencies (gym) are missing are skipped."""
+
+    env_classes = [
+        ("sprint_env", "SprintHeuristicEnv", {}),
+        ("debug_env", "DebugHeuristicEnv", {}),
+        ("blitz_env", "BlitzEnv", {}),
+        ("tetris_env", "TetrisEnv", {"mode": "Sprint"}),
+    ]
+
+    benchmarks = {}
+    for module_name, class_name, kwargs in env_classes:
+        try:
+            module = __import__(module_name)
+        except ImportError as error:
+            print(f"[SKIP] {class_name}.get_observation: {error}")
+            continue
+
+        env = getattr(module, class_name)(**kwargs)
+
+        def observe(game, env=env):
+            env.game = game  # Observations only read env.game, so point the env at each benchmark position
+            return env.get_observation()
+
+        benchmarks[f"{class_name}.get_observation"] = (lambda n: [positions[i % len(positions)] for i in range(n)], observe)
+
+    return benchmarks
+
+
+def time_benchmark(prepare, op, min_time = 0.5, repeats = 3):
+    """Best-of-`repeats` ops/sec, growing the batch until one timed batch takes at least `min_time` seconds."""
+
+    batch = 16
+    while True:
+        args = prepare(batch)
+        start = time.perf_counter()
+        for arg in args:
+            op(arg)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or batch >= 1 << 20:
+            break
+        batch = int(batch * max(2.0, min_time / max(elapsed, 1e-9) * 1.2))
+
+    best = batch / elapsed
+    for _ in range(repeats - 1):
+        args = prepare(batch)
+        start = time.perf_counter()
+        for arg in args:
+            op(arg)
+        best = max(best, batch / (time.perf_counter() - start))
+
+    return {"ops_per_sec": best, "ops": batch}
+
+
+def compare_to_baseline(results, baseline, threshold):
+    """Prints a comparison table and returns the names of benchmarks slower than the baseline by more than `threshold`."""
+
+    regressions = []
+    print(f"\n{'benchmark':<38}{'ops/sec':>14}{'baseline':>14}{'change':>10}")
+    for name, result in results.items():
+        current = result["ops_per_sec"]
+        if name not in baseline:
+            print(f"{name:<38}{current:>14.1f}{'-':>14}{'new':>10}")
+            continue
+
+        reference = baseline[name]["ops_per_sec"]
+        change = current / reference - 1.0
+        flag = "  REGRESSION" if change < -threshold else ""
+        print(f"{name:<38}{current:>14.1f}{reference:>14.1f}{change:>+10.1%}{flag}")
+        if flag:
+            regressions.append(name)
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Engine micro-benchmarks.")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write this run's results.")
+    parser.add_argument("--baseline", default="benchmark_baseline.json", help="Stored results to compare against.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown before a benchmark counts as a regression.")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Minimum seconds per timed batch.")
+    parser.add_argument("--positions", type=int, default=200, help="Number of seeded positions to benchmark on.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="*", help="Only run benchmarks whose names contain one of these words.")
+    args = parser.parse_args()
+
+    print(f"[SETUP] Building {args.positions} positions from seed {args.seed}...")
+    positions = make_positions(args.positions, args.seed)
+
+    benchmarks = engine_benchmarks(positions)
+    benchmarks.update(env_benchmarks(positions))
+    if args.only:
+        benchmarks = {name: bench for name, bench in benchmarks.items() if any(word in name for word in args.only)}
+
+    results = {}
+    for name, (prepare, op) in benchmarks.items():
+        results[name] = time_benchmark(prepare, op, args.min_time)
+        print(f"[BENCH] {name:<38}{results[name]['ops_per_sec']:>14.1f} ops/sec")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "positions": args.positions,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[DONE] Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[DONE] Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n[FAIL] {len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\n[PASS] No regressions beyond {args.threshold:.0%}.")
+    else:
+        print(f"[NOTE] No baseline at {args.baseline}; run with --save-baseline to create one.")
@@ -5,10 +5,10 @@ from gym import spaces
 from game_class import TetrisGame
 
 class BlitzEnv(gym.Env):
-    def __init__(self):
+    def __init__(self, render_env = True):
         super().__init__()
 
-        self.game = TetrisGame(render=True, game_mode="Blitz")
+        self.game = TetrisGame(render=render_env, game_mode="Blitz")
         self.reset_tracker = 0
 
         self.action_space = None  # AI chooses from dictionary keys
@@ -0,0 +1,155 @@
+import os
+import copy
+import queue
+import random
+import threading
+
+import numpy as np
+import torch
+
+# Checkpoint and resume for long training runs. Snapshots are taken on the training thread (a copy of the state, which
+# is cheap) and written by a background thread, so training never waits on the disk. Each write goes to a temporary
+# file that is fsynced and then renamed over the checkpoint, so a crash or preemption mid-write leaves the previous
+# checkpoint intact:
+#   checkpointer = AsyncCheckpointer("sprint_checkpoint.pt", every=10)
+#   resumed = load_checkpoint("sprint_checkpoint.pt") if args.resume else None
+#   searcher = SNES(problem, popsize=100, **snes_init(resumed, stdev_init=1.0))
+#   checkpointer.attach(searcher, resumed)          # Saves every 10 generations from then on
+#   searcher.run(remaining_generations(resumed, 500))
+#   checkpointer.close()                            # Final checkpoint, and waits for the writer
+# SNES checkpoints hold the search distribution (center and stdev), the best solution so far, the generation counter
+# and the Python, NumPy and torch RNG states. Scripts with their own models checkpoint a dict through save() instead.
+
+
+def rng_state():
+    """The Python, NumPy and torch global RNG states."""
+    return {"python": random.getstate(), "numpy": np.random.get_state(), "torch": torch.get_rng_state()}
+
+
+def set_rng_state(state):
+    random.setstate(state["python"])
+    np.random.set_state(state["numpy"])
+    torch.set_rng_state(state["torch"])
+
+
+def write_atomic(state, path):
+    """torch.save to `path` through a temporary file, so `path` always holds a complete checkpoint."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        torch.save(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path):
+    """The checkpoint saved at `path`, or None if there isn't one. Restores the RNG states it holds."""
+    if not os.path.exists(path):
+        print(f"[CHECKPOINT] No checkpoint at {path}. Starting from scratch.")
+        return None
+    try:
+        state = torch.load(path, weights_only=False)  # RNG states aren't plain tensors
+    except TypeError:
+        state = torch.load(path)  # torch versions before weights_only
+    if "rng" in state:
+        set_rng_state(state["rng"])
+    print(f"[CHECKPOINT] Resuming from {path} at generation/episode {state.get('generation', 0)}.")
+    return state
+
+
+def snes_init(resumed, **init):
+    """SNES keyword arguments: `init` (center_init, stdev_init) for a new run, or the saved distribution to resume."""
+    if resumed is None:
+        return init
+    return {"center_init": resumed["center"], "stdev_init": resumed["stdev"]}
+
+
+def remaining_generations(resumed, num_generations):
+    """Generations still to run out of `num_generations`."""
+    return num_generations if resumed is None else max(0, num_generations - resumed["generation"])
+
+
+class AsyncCheckpointer:
+    """Writes checkpoints to `path` on a background thread. If a write is still going when the next snapshot arrives,
+    the older pending snapshot is dropped: only the latest state matters."""
+
+    def __init__(self, path, every = 10):
+        self.path = path
+        self.every = every  # Generations (or episodes) between checkpoints
+        self.pending = queue.Queue(maxsize=1)
+        self.error = None
+
+        self.searcher = None
+        self.start_generation = 0
+        self.best_values = None
+        self.best_eval = None
+
+        self.writer = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+        self.writer.start()
+
+    def _write_loop(self):
+        while True:
+            state = self.pending.get()
+            if state is None:
+                return
+            try:
+                write_atomic(state, self.path)
+            except Exception as error:  # Keep training; report it and try again next time
+                self.error = error
+                print(f"[CHECKPOINT] Failed to write {self.path}: {error}")
+
+    def save(self, state):
+        """Queues a copy of `state` (any torch.save-able dict) for writing and returns straight away."""
+        snapshot = copy.deepcopy(state)
+        try:
+            self.pending.get_nowait()  # Superseded by this one
+        except queue.Empty:
+            pass
+        self.pending.put(snapshot)
+
+    # SNES runs
+
+    def attach(self, searcher, resumed = None):
+        """Checkpoints `searcher` every `every` generations, continuing the generation count and best solution of
+        `resumed` (a load_checkpoint result) if given."""
+        self.searcher = searcher
+        if resumed is not None:
+            self.start_generation = resumed["generation"]
+            self.best_values, self.best_eval = resumed["best_values"], resumed["best_eval"]
+        searcher.after_step_hook.append(self._after_step)
+
+    def generation(self):
+        return self.start_generation + self.searcher.step_count
+
+    def _update_best(self):
+        best = self.searcher.status.get("best")
+        if best is not None and (self.best_eval is None or float(best.evaluation) > self.best_eval):
+            self.best_values, self.best_eval = best.values.detach().cpu().clone(), float(best.evaluation)
+
+    def _after_step(self):
+        self._update_best()
+        if self.generation() % self.every == 0:
+            self.save(self.snes_state())
+
+    def snes_state(self):
+        return {
+            "generation": self.generation(),
+            "center": self.searcher.status["center"].detach().cpu().clone(),
+            "stdev": self.searcher.status["stdev"].detach().cpu().clone(),
+            "best_values": self.best_values,
+            "best_eval": self.best_eval,
+            "rng": rng_state(),
+        }
+
+    def best(self):
+        """(values, eval) of the best solution over every run of this checkpoint."""
+        self._update_best()
+        return self.best_values, self.best_eval
+
+    def close(self):
+        """Writes a last checkpoint of the attached searcher (if any) and waits for every pending write to finish."""
+        if self.searcher is not None:
+            self._update_best()
+            self.save(self.snes_state())
+        self.pending.put(None)
+        self.writer.join()
@@ -5,10 +5,10 @@ from gym import spaces
 from game_class import TetrisGame
 
 class DebugHeuristicEnv(gym.Env):
-    def __init__(self):
+    def __init__(self, render_env = True):
         super().__init__()
 
-        self.game = TetrisGame(render=True, game_mode="Test")
+        self.game = TetrisGame(render=render_env, game_mode="Test")
         self.last_lines_cleared = 0
         self.reset_tracker = 0
 
@@ -0,0 +1,122 @@
+import os
+import glob
+import json
+import hashlib
+
+from thinker_ffi import THINKER_DIR
+from thinker_sim import BINARY_NAME
+
+# Persistent fitness cache for integer weight vectors. SNES samples are rounded to int32 before the thinker sees them,
+# so with a small stdev many candidates in a generation (and across generations) are the same weights. Playing them
+# again on the same seeds with the same engine gives the same scores, so they're looked up instead:
+#   cache = FitnessCache()                                     # fitness_cache.jsonl, this checkout's engine version
+#   fitness = cache.evaluate(weight_sets, seeds, simulate)     # simulate(missing_weight_sets, seeds) -> scores
+# Entries are keyed by the sha1 of (weights, seeds, engine version, evaluator settings). The file is append-only JSON
+# lines, one entry per line, read into an in-memory index on open. Every entry is flushed as it's written, so a run
+# restarted after a crash picks up everything evaluated before it; a line cut short by the crash is skipped.
+
+DEFAULT_PATH = "fitness_cache.jsonl"
+
+# What decides a game's score besides the weights and seed: the thinker's source, TetrisGame and everything it imports
+# (kicks and spawns, placements, reachability), and the Python that drives simulated and pooled games
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ENGINE_FILES = [
+    "tetris_thinker/Cargo.toml", "tetris_thinker/Cargo.lock", "tetris_thinker/src/*.rs",
+    "game_class.py", "srs.py", "placements.py", "reachability.py",
+    "headless_play.py", "thinker_pool.py", "thinker_sim.py", "thinker_ffi.py", "thinker_io.py",
+]
+
+
+def engine_version():
+    """Short hash of the engine sources and of the thinker binary that will actually run, so entries from an older
+    engine (or from a prebuilt binary that's stale against the sources) are never returned."""
+    digest = hashlib.sha1()
+    for pattern in ENGINE_FILES:
+        for path in sorted(glob.glob(os.path.join(ROOT, pattern))):
+            digest.update(os.path.relpath(path, ROOT).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+
+    # thinker_sim.thinker_command runs the release binary as built if there is one; otherwise cargo builds the sources
+    binary = os.path.join(THINKER_DIR, "target", "release", BINARY_NAME)
+    if os.path.exists(binary):
+        with open(binary, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+class FitnessCache:
+    """Append-only on-disk map from (weights, seeds, engine, settings) to per-seed scores."""
+
+    def __init__(self, path = DEFAULT_PATH, engine = None):
+        self.path = path
+        self.engine = engine or engine_version()
+        self.index = {}
+        self.hits = self.misses = 0
+
+        line = ""
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Partial line from an interrupted write
+                    self.index[entry["key"]] = entry["fitness"]
+        self.file = open(path, "a")
+        if self.file.tell() > 0 and not line.endswith("\n"):
+            self.file.write("\n")  # Start after the cut-short line rather than on the end of it
+
+    def key(self, weights, seeds, **settings):
+        """Cache key for one weight vector on a seed set. `settings` are anything else that changes the scores
+        (piece budget, search depth, evaluator)."""
+        record = {
+            "weights": [int(round(w)) for w in weights],
+            "seeds": [int(seed) for seed in seeds],
+            "engine": self.engine,
+            "settings": settings,
+        }
+        return hashlib.sha1(json.dumps(record, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key):
+        return self.index.get(key)
+
+    def put(self, key, fitness):
+        """Records per-seed scores and writes them through to disk."""
+        fitness = [float(score) for score in fitness]
+        self.index[key] = fitness
+        self.file.write(json.dumps({"key": key, "fitness": fitness}) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def evaluate(self, weight_sets, seeds, evaluate_fn, **settings):
+        """Per-seed scores for every weight set, as [weight set][seed]. Only weight vectors not already cached (and
+        each distinct one only once) go to `evaluate_fn(weight_sets, seeds)`, which returns scores in the same shape."""
+        keys = [self.key(weights, seeds, **settings) for weights in weight_sets]
+
+        missing = {}
+        for key, weights in zip(keys, weight_sets):
+            if key not in self.index and key not in missing:
+                missing[key] = weights
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+
+        if missing:
+            fitness = evaluate_fn(list(missing.values()), seeds)
+            for key, scores in zip(missing, fitness):
+                self.put(key, scores)
+
+        return [self.index[key] for key in keys]
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,173 @@
+import os
+import io
+import argparse
+import zipfile
+import numpy as np
+
+from spectator import game_snapshot, apply_snapshot
+
+# Records games as RGB frames (uint8 arrays of shape (height, width, 3)) on an offscreen surface, without a window.
+# Frames are only drawn when capture() is called, so the caller decides the frame rate (every placement, every input...).
+# They are written in chunks to a zip of .npy members, which np.load() opens like any .npz:
+#   frames = np.load("game.npz")["chunk_00000"]        # (chunk_frames, height, width, 3)
+#   python frame_capture.py heuristic_test.rpl --game 0 --output game0.npz    # Re-render a recorded game
+
+
+class FrameRecorder:
+    """Draws snapshots of a game offscreen and appends them to `path` in compressed chunks of `chunk_frames` frames.
+    renderer="pygame" reproduces the game window; renderer="numpy" is a much faster flat-color board, hold and queue."""
+
+    def __init__(self, path, size = (800, 700), chunk_frames = 256, renderer = "pygame", cell_size = 16):
+        self.path = path
+        self.chunk_frames = chunk_frames
+        self.renderer = renderer
+        self.cell_size = cell_size
+        self.frames = []
+        self.num_frames = 0
+
+        # Continue numbering after any chunks already in the file
+        self.chunk_index = 0
+        if os.path.exists(path):
+            with zipfile.ZipFile(path) as archive:
+                self.chunk_index = len(archive.namelist())
+
+        if renderer == "pygame":
+            import pygame
+            from game_class import TetrisGame
+
+            pygame.font.init()
+            self.canvas = TetrisGame(render=False)  # Drawing-only game; snapshots are loaded into it before each frame
+            self.canvas.screen = pygame.Surface(size)
+            self.to_bytes = pygame.image.tobytes
+        elif renderer != "numpy":
+            raise ValueError(f"Unknown renderer {renderer!r}; use 'pygame' or 'numpy'")
+
+    def capture(self, game):
+        """Renders the current state of `game` as one frame."""
+        snapshot = game_snapshot(game)
+
+        if self.renderer == "pygame":
+            apply_snapshot(self.canvas, snapshot)
+            self.canvas.draw_grid()
+            self.canvas.dirty_rects = []  # Nothing presents this surface, so drop the damage list draw_grid builds up
+            width, height = self.canvas.screen.get_size()
+            frame = np.frombuffer(self.to_bytes(self.canvas.screen, "RGB"), dtype=np.uint8).reshape(height, width, 3)  # Several times faster than surfarray
+        else:
+            frame = rasterize_snapshot(snapshot, self.cell_size)
+
+        self.frames.append(frame)
+        self.num_frames += 1
+        if len(self.frames) >= self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered frames as one compressed chunk."""
+        if not self.frames:
+            return
+
+        buffer = io.BytesIO()
+        np.save(buffer, np.stack(self.frames))
+        with zipfile.ZipFile(self.path, "a", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr(f"chunk_{self.chunk_index:05d}.npy", buffer.getvalue())
+
+        self.chunk_index += 1
+        self.frames = []
+
+    def close(self):
+        self.flush()
+
+
+def load_frames(path):
+    """Yields every frame in a recording, in order, one chunk in memory at a time."""
+    with np.load(path) as archive:
+        for name in sorted(archive.files):
+            yield from archive[name]
+
+
+# === NumPy rasterizer ===
+# Board (20 visible rows) on the left, a one-cell gap, then a 4-cell-wide column with the hold piece on top and the
+# five next pieces below it. Colors match TETRIMINO_COLORS in game_class.py.
+
+PALETTE = np.array([
+    (0, 0, 0),        # Empty
+    (0, 208, 255),    # I
+    (255, 224, 32),   # O
+    (160, 64, 240),   # T
+    (255, 128, 32),   # L
+    (64, 128, 255),   # J
+    (64, 208, 64),    # S
+    (255, 64, 32),    # Z
+    (90, 90, 90),     # Background
+], dtype=np.uint8)
+BACKGROUND = len(PALETTE) - 1
+
+# Spawn-orientation cells (row, col) inside a 2x4 preview box
+PREVIEW_CELLS = {
+    "I": [(0, 0), (0, 1), (0, 2), (0, 3)],
+    "O": [(0, 1), (0, 2), (1, 1), (1, 2)],
+    "T": [(0, 1), (1, 0), (1, 1), (1, 2)],
+    "L": [(0, 2), (1, 0), (1, 1), (1, 2)],
+    "J": [(0, 0), (1, 0), (1, 1), (1, 2)],
+    "S": [(0, 1), (0, 2), (1, 0), (1, 1)],
+    "Z": [(0, 0), (0, 1), (1, 1), (1, 2)],
+}
+PIECE_INDEX = {piece: code for piece, code in zip(["I", "O", "T", "L", "J", "S", "Z"], range(1, 8))}
+
+
+def rasterize_snapshot(snapshot, cell_size = 16):
+    """Returns an RGB frame of a spectator snapshot without pygame."""
+    codes = np.full((20, 16), BACKGROUND, dtype=np.uint8)  # 20 rows x (10 board + 1 gap + 4 side + 1 margin) cells
+
+    # Board with the active piece on top. Snapshot grid codes follow replay.PIECE_CODES order, the same as PALETTE.
+    codes[:, :10] = snapshot["grid"][4:]
+    for r, c in snapshot["cells"]:
+        if 4 <= r < 24:
+            codes[r - 4, c] = PIECE_INDEX[snapshot["piece"]]
+
+    # Hold piece in rows 0-1, then each next piece in its own 3-row slot
+    side = [snapshot["held"]] + list(snapshot["next"][:5])
+    for slot, piece in enumerate(side):
+        if piece is None:
+            continue
+        top = slot * 3 + (1 if slot > 0 else 0)  # One spare row between the hold and the queue
+        for r, c in PREVIEW_CELLS[piece]:
+            codes[top + r, 11 + c] = PIECE_INDEX[piece]
+
+    return PALETTE[codes].repeat(cell_size, axis=0).repeat(cell_size, axis=1)
+
+
+def render_replay_frames(replay, path, **recorder_args):
+    """Re-simulates a replay.GameReplay and records one frame before the first placement and one after each placement."""
+    from game_class import TetrisGame
+    from replay import apply_replay_placement
+
+    recorder = FrameRecorder(path, **recorder_args)
+    game = TetrisGame(render=False, game_mode=replay.mode)
+    game.reset_game_state(seed=replay.seed)
+
+    recorder.capture(game)
+    for placement in replay.placements:
+        apply_replay_placement(game, placement)
+        recorder.capture(game)
+
+    recorder.close()
+    return recorder.num_frames
+
+
+if __name__ == "__main__":
+    from replay import read_replays
+
+    parser = argparse.ArgumentParser(description="Re-render a recorded game into a frame archive.")
+    parser.add_argument("replay_path")
+    parser.add_argument("--game", type=int, default=0, help="Index of the game in the replay file.")
+    parser.add_argument("--output", default="replay_frames.npz")
+    parser.add_argument("--renderer", choices=["pygame", "numpy"], default="pygame")
+    args = parser.parse_args()
+
+    for index, replay in enumerate(read_replays(args.replay_path)):
+        if index == args.game:
+            count = render_replay_frames(replay, args.output, renderer=args.renderer)
+            print(f"[DONE] {count} frames of game {index} written to {args.output}")
+            break
+    else:
+        print(f"[ERROR] {args.replay_path} holds fewer than {args.game + 1} games.")
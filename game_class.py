@@ -3,10 +3,28 @@ import numpy as np
 import random
 import time
 import threading
-import copy
+import operator
+from collections import namedtuple
+import srs
+from placements import GameState, CandidateGrids, evaluate_candidates, placement_holds
+from reachability import find_reachable_placements
+
+# Everything apply_placement can change besides the grid. Lists are replaced rather than mutated, so saving them is
+# just saving references.
+UNDO_FIELDS = (
+    "score", "b2b", "clear_combo", "lines_cleared", "total_pieces_placed", "game_over", "game_over_condition",
+    "held_piece", "hold_used", "current_piece_type", "piece_rotation", "piece_row", "piece_col", "next_queue",
+    "primary_bag", "secondary_bag", "bag_piece_count", "most_recent_score", "most_recent_T_spin",
+    "most_recent_clear", "qualified_for_T_spin", "wall_kick_5_used",
+)
+get_undo_fields = operator.attrgetter(*UNDO_FIELDS)
+
+# What undo() needs to reverse one apply_placement: the cells filled, the rows cleared (and what was in them), the
+# previous UNDO_FIELDS values, and the bag RNG state if a bag was refilled (None otherwise).
+UndoToken = namedtuple("UndoToken", ["cells", "cleared_rows", "cleared_contents", "fields", "rng_state"])
 
 class TetrisGame:
-    def __init__(self, render = True, game_mode = None):
+    def __init__(self, render = True, game_mode = None, seed = None):
     # Constants
         self.DEFAULT_WIDTH, self.DEFAULT_HEIGHT = 800, 700
         self.COLS, self.ROWS = 10, 24  # Play matrix dimensions
@@ -20,6 +38,10 @@ class TetrisGame:
         self.GRAVITY = 100000  # Default fall speed in milliseconds (1000ms = 1 second per row)
         self.LOCKOUT_OVERRIDE = 200000  # Time in milliseconds before forced lockout
         self.RENDER = render # Boolean value for whether or not to render the game.
+        self.FPS = 60 # Frame cap for interactive play. Rendering happens once per frame, with a single flip.
+        self.MENU_FPS = 30 # Frame cap for the menu and game over screens, which barely change.
+        self.LOGIC_TICK = 4 # Fixed logic timestep in milliseconds. Inputs, DAS/ARR and gravity advance in steps of this size.
+        self.logic_time = None # Logical clock in milliseconds, advanced by main() one LOGIC_TICK at a time. None outside of main().
         self.TICK_BASED = False # Gets set to True if tick() is called.
 
         # Tracking variables
@@ -55,12 +77,32 @@ class TetrisGame:
         self.game_over_condition = "Top Out!" # Tracks game over condition.
         self.advanced_controls = False # Used to modify ARR and DAS to Camden-prefered values.
         self.current_piece_type = None
-        self.current_piece = None
-        self.current_rotation = None
+        # The active piece is stored compactly as its rotation index (into self.ROTATION_STATES) and the row and column of
+        # its reference cell (see srs.py); current_piece and current_rotation are built from these on demand.
+        self.piece_rotation = None
+        self.piece_row = None
+        self.piece_col = None
+        # Row bitmasks of self.grid for collision tests (bit c set when column c is filled). Rebuilt when self.grid is
+        # replaced; code that writes into self.grid in place sets masks_stale.
+        self.row_masks = None
+        self.masks_grid = None
+        self.masks_stale = True
         self.lock_reward = 0 # Counts the number of occupied cells in the row each mino of a piece occupies, and then returns it for AI reward.
         self.flat_placement = False # Set to true if none of the spaces immediately under a piece are empty. For AI reward.
         self.height_gap = False # Set to true if the bottom-most space a piece occupies is 8 or more spaces above the next-highest filled grid space.
         self.most_recent_score = 0 # To be used for Blitz training.
+        self.most_recent_T_spin = False # T-spin type of the most recent lock (False, "Mini T-Spin", "T-Spin"). Recorded in replays.
+        self.most_recent_clear = 0 # Number of lines cleared by the most recent lock. Recorded in replays.
+        self.seed = seed if seed is not None else random.randrange(2**32) # Bag RNG seed. Every game is reproducible from its seed and placements.
+        self.rng = random.Random(self.seed) # Per-game RNG so that bags don't depend on the global random state.
+        self.replay_writer = None # Optional replay.ReplayWriter that logs every placement.
+        self.spectator = None # Optional spectator.SpectatorPublisher that streams snapshots to a separate renderer.
+        self.render_cache = None # Fonts, layout and pre-rendered tiles for the current window size. Built by get_render_cache().
+        self.full_redraw = True # Makes the next draw_grid() repaint the whole window instead of only what changed.
+        self.drawn_grid = None # Visible grid as of the last frame, to find rows changed by locks and clears.
+        self.drawn_overlay = [] # Cells covered by the ghost and active piece in the last frame.
+        self.drawn_side_state = None # Hold/queue state as of the last frame.
+        self.dirty_rects = [] # Screen regions changed since the last present_frame().
 
         # Colors
         self.BLACK = (0, 0, 0)
@@ -82,83 +124,100 @@ class TetrisGame:
             "I": (0, 208, 255)
         }
 
-        # Shape definitions with SRS spawn orientations
-        self.TETRIMINO_SHAPES = {
-            "Z": [[(0, -1), (0, 0), (1, 0), (1, 1)]],
-            "S": [[(1, -1), (1, 0), (0, 0), (0, 1)]],
-            "L": [[(1, -1), (1, 0), (1, 1), (0, 1)]],
-            "J": [[(1, -1), (1, 0), (1, 1), (0, -1)]],
-            "O": [[(0, 0), (0, 1), (1, 0), (1, 1)]],
-            "T": [[(1, -1), (1, 0), (1, 1), (0, 0)]],
-            "I": [[(0, 0), (0, 1), (0, 2), (0, 3)]]
-        }
-
-        self.PIECE_PIVOTS = {
-            "L": 1,  # Middle of three-segment row
-            "J": 1,  # Middle of three-segment row
-            "T": 1,  # Middle of three-segment row
-            "S": 1,  # Lower of vertical two-stack
-            "Z": 2,  # Lower of vertical two-stack
-            "I": 1,  # Center horizontally, bottom-most square vertically
-            "O": 0  # True center, does not move
-        }
-
-        # SRS Wall Kick Data (J, L, S, T, Z)
-        self.SRS_WALL_KICKS = {
-            (0, "R"): [(0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)],  # 0 → R
-            ("R", 0): [(0, 0), (1, 0), (1, 1), (0, -2), (1, -2)],  # R → 0
-            ("R", 2): [(0, 0), (1, 0), (1, 1), (0, -2), (1, -2)],  # R → 2
-            (2, "R"): [(0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)],  # 2 → R
-            (2, "L"): [(0, 0), (1, 0), (1, -1), (0, 2), (1, 2)],  # 2 → L
-            ("L", 2): [(0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)],  # L → 2
-            ("L", 0): [(0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)],  # L → 0
-            (0, "L"): [(0, 0), (1, 0), (1, -1), (0, 2), (1, 2)],  # 0 → L
-        }
-
-        # SRS Wall Kick Data for I-Piece (Different from other pieces)
-        self.SRS_WALL_KICKS_I = {
-            (0, "R"): [(0, 0), (-2, 0), (1, 0), (-2, 1), (1, -2)],
-            ("R", 0): [(0, 0), (2, 0), (-1, 0), (2, -1), (-1, 2)],
-            ("R", 2): [(0, 0), (-1, 0), (2, 0), (-1, -2), (2, 1)],
-            (2, "R"): [(0, 0), (1, 0), (-2, 0), (1, 2), (-2, -1)],
-            (2, "L"): [(0, 0), (2, 0), (-1, 0), (2, -1), (-1, 2)],
-            ("L", 2): [(0, 0), (-2, 0), (1, 0), (-2, 1), (1, -2)],
-            ("L", 0): [(0, 0), (1, 0), (-2, 0), (1, 2), (-2, -1)],
-            (0, "L"): [(0, 0), (-1, 0), (2, 0), (-1, -2), (2, 1)],
-        }
+        # Piece shapes, pivots, SRS wall kick data and T-spin corners live in srs.py, shared with placements.py
+        self.TETRIMINO_SHAPES = srs.TETRIMINO_SHAPES
+        self.PIECE_PIVOTS = srs.PIECE_PIVOTS
+        self.ROTATION_STATES = srs.ROTATION_STATES
+        self.T_SPIN_CORNERS = srs.T_SPIN_CORNERS
+        self.T_SPIN_TYPES = srs.T_SPIN_TYPES
+        self.SRS_WALL_KICKS = srs.SRS_WALL_KICKS
+        self.SRS_WALL_KICKS_I = srs.SRS_WALL_KICKS_I
 
         # Initialize grid
         self.grid = np.full((self.ROWS, self.COLS), "X")
 
         # Initialize game state
-        self.current_piece_type, self.current_piece, self.current_rotation = self.spawn_piece()
+        self.spawn_piece()
         self.game_over = False
 
         self.screen = None
+        self.clock = None
 
         # Initialize pygame if render is set to True
         if render:
             pygame.init()
             self.screen = pygame.display.set_mode((self.DEFAULT_WIDTH, self.DEFAULT_HEIGHT), pygame.RESIZABLE)
             pygame.display.set_caption("Tetris")
+            self.clock = pygame.time.Clock()
             
 
+    @property
+    def current_piece(self):
+        """The active piece's four (row, col) cells, built from its compact state. Assigning a list of cells moves the
+        piece there, keeping the current rotation if the cells have its shape."""
+        if self.piece_row is None:
+            return None
+        return srs.piece_cells(self.current_piece_type, self.piece_rotation, self.piece_row, self.piece_col)
+
+    @current_piece.setter
+    def current_piece(self, cells):
+        if cells is None:
+            self.piece_rotation = self.piece_row = self.piece_col = None
+            return
+        self.piece_rotation, self.piece_row, self.piece_col = srs.locate_piece(self.current_piece_type, cells, self.piece_rotation or 0)
+
+    @property
+    def current_rotation(self):
+        """The active piece's rotation state (0, "R", 2, "L"). Assigning one keeps the minos where they are when the new
+        rotation has the same shape (I, S and Z pairs), and otherwise keeps the reference cell."""
+        return None if self.piece_rotation is None else self.ROTATION_STATES[self.piece_rotation]
+
+    @current_rotation.setter
+    def current_rotation(self, rotation):
+        if rotation is None:
+            self.piece_rotation = None
+            return
+        new_rotation = self.ROTATION_STATES.index(rotation)
+        if self.piece_row is not None and new_rotation != self.piece_rotation:
+            located = srs.locate_piece(self.current_piece_type, self.current_piece, new_rotation)
+            if located[0] == new_rotation:
+                self.piece_row, self.piece_col = located[1], located[2]
+        self.piece_rotation = new_rotation
+
+    def collision_masks(self):
+        """Row bitmasks of self.grid, rebuilt only when the grid has changed."""
+        if self.masks_stale or self.masks_grid is not self.grid:
+            self.row_masks = srs.row_masks(self.grid != "X")
+            self.masks_grid = self.grid
+            self.masks_stale = False
+        return self.row_masks
+
+    def piece_fits(self, rotation, row, col):
+        """Whether the active piece fits at (rotation index, row, col)."""
+        return srs.fits(self.collision_masks(), self.current_piece_type, rotation, row, col)
+
     def is_valid_position(self, piece):
         """Check if a piece's position is valid (inside bounds and not colliding)."""
+        masks = self.collision_masks()
         for r, c in piece:
             if c < 0 or c >= self.COLS or r >= self.ROWS:  # Out of bounds
                 return False
-            if r >= 0 and self.grid[r, c] != "X":  # Collision
+            if r >= 0 and masks[r] >> c & 1:  # Collision
                 return False
         return True
 
     def lock_piece(self):
         """Locks the current piece into the self.grid and spawns a new piece."""
 
+        score_before_lock = self.score # Drop points are awarded before locking; the replay writer records them separately.
+
+        piece_cells = self.current_piece # Built once; the piece doesn't move from here on
+
         # **Lock the piece into the self.grid**
-        for r, c in self.current_piece:
+        for r, c in piece_cells:
             if r >= 0:
                 self.grid[r, c] = self.current_piece_type  
+        self.masks_stale = True
 
         # Increment or decrement total pieces placed
         if self.game_mode == "Blitz":
@@ -168,7 +227,7 @@ class TetrisGame:
 
         # Identify occupied rows
         occupied_rows = set()
-        for r, _ in self.current_piece:
+        for r, _ in piece_cells:
             if r >= 0:
                 occupied_rows.add(r)
         
@@ -183,7 +242,7 @@ class TetrisGame:
         self.flat_placement = False # Set to False for new piece.
         flat = True # Helper necessary for loop logic; not redundant for once.
 
-        for r, c in self.current_piece:
+        for r, c in piece_cells:
             below_r = r + 1
             if below_r >= self.ROWS:
                 continue  # On floor = flat
@@ -196,7 +255,7 @@ class TetrisGame:
         self.height_gap = False  # Default to False
 
         # Get the lowest row the current piece occupies
-        piece_lowest_row = max(r for r, _ in self.current_piece if r >= 0)
+        piece_lowest_row = max(r for r, _ in piece_cells if r >= 0)
 
         # Get the lowest occupied row in the grid
         occupied_cells = np.argwhere(self.grid != "X")
@@ -217,33 +276,44 @@ class TetrisGame:
         # **Check for and clear full lines**
         self.clear_lines()
 
+        # Log the placement before the next piece replaces it
+        if self.replay_writer is not None:
+            self.replay_writer.record_placement(self, self.score - score_before_lock)
+
         # **Spawn a new piece from the updated queue**
-        self.current_piece_type, self.current_piece, self.current_rotation = self.spawn_piece()
+        self.spawn_piece()
 
         # **Reset hold usage (holding is allowed again)**
         self.hold_used = False
 
         # **Check if the new piece is already colliding (Game Over)**
-        if not self.is_valid_position(self.current_piece):
+        if not self.piece_fits(self.piece_rotation, self.piece_row, self.piece_col):
             self.game_over = True  # Game over if the new piece cannot be placed
 
+        # Hand a snapshot to the spectator renderer, if any. This never blocks.
+        if self.spectator is not None:
+            self.spectator.publish(self)
+
         # **Ensure the display updates immediately**
         if self.RENDER:
             self.draw_grid()
-            pygame.display.flip()
+            self.present_frame()
 
         # Handle game over if AI is out of pieces to place
         if self.total_pieces_placed <= 0:
             self.game_over = True
 
+        # Write the finished game to the replay file
+        if self.game_over and self.replay_writer is not None:
+            self.replay_writer.finish_game()
+
 
     def move_piece(self, dx, dy):
         """Attempt to move the current piece by (dx, dy)."""
 
-        new_position = [(r + dy, c + dx) for r, c in self.current_piece]
-        
-        if self.is_valid_position(new_position):
-            self.current_piece[:] = new_position
+        if self.piece_fits(self.piece_rotation, self.piece_row + dy, self.piece_col + dx):
+            self.piece_row += dy
+            self.piece_col += dx
 
             # Disqualify T-spin if the move was a successful left/right shift
             if dx != 0:
@@ -309,13 +379,13 @@ class TetrisGame:
 
         # If both bags are empty, fill both
         if not self.primary_bag and not self.secondary_bag:
-            self.primary_bag = random.sample(full_bag, len(full_bag))  # Shuffle first bag
-            self.secondary_bag = random.sample(full_bag, len(full_bag))  # Shuffle second bag
+            self.primary_bag = self.rng.sample(full_bag, len(full_bag))  # Shuffle first bag
+            self.secondary_bag = self.rng.sample(full_bag, len(full_bag))  # Shuffle second bag
 
         # If only the primary bag is empty, refill it from the secondary and create a new secondary
         elif not self.primary_bag:
             self.primary_bag = self.secondary_bag
-            self.secondary_bag = random.sample(full_bag, len(full_bag))  # Shuffle new secondary bag
+            self.secondary_bag = self.rng.sample(full_bag, len(full_bag))  # Shuffle new secondary bag
 
 
     def spawn_piece(self):
@@ -343,13 +413,9 @@ class TetrisGame:
                 self.refill_bag()
             self.next_queue.append(self.primary_bag.pop(0))
 
-        # Get the shape of the new piece
-        piece = self.TETRIMINO_SHAPES[self.current_piece_type][0]
-
-        # **Spawn the piece at the correct position**
-        adjusted_piece = [(r + 2, c + 4) if self.current_piece_type != "I" else (r + 2, c + 3) for r, c in piece]
-
-        return self.current_piece_type, adjusted_piece, 0  # (0 = spawn state)
+        # **Spawn the piece at the correct position, in its spawn state**
+        self.piece_rotation = 0
+        self.piece_row, self.piece_col = srs.SPAWN_POSITIONS[self.current_piece_type]
 
     def hold_piece(self):
         """Handles the hold mechanic. Can only be used once per active piece."""
@@ -360,23 +426,33 @@ class TetrisGame:
         if self.held_piece is None:
             # If no piece is held, store the current piece and spawn a new one
             self.held_piece = self.current_piece_type
-            self.current_piece_type, self.current_piece, self.current_rotation = self.spawn_piece()
+            self.spawn_piece()
         else:
             # If a piece is already held, swap it with the current piece
             self.held_piece, self.current_piece_type = self.current_piece_type, self.held_piece
-            self.current_piece, self.current_rotation = self.TETRIMINO_SHAPES[self.current_piece_type][0], 0
 
-            # Adjust position for spawning
-            self.current_piece = [(r + 2, c + 4) if self.current_piece_type != "I" else (r + 2, c + 3) for r, c in self.current_piece]
+            # Back to the spawn position and state
+            self.piece_rotation = 0
+            self.piece_row, self.piece_col = srs.SPAWN_POSITIONS[self.current_piece_type]
 
         self.hold_used = True  # Mark hold as used until next piece locks
 
     def is_grounded(self):
         """Returns True if the piece is directly above a solid block or the floor."""
-        for r, c in self.current_piece:
-            if r + 1 >= self.ROWS or (r + 1 >= 0 and self.grid[r + 1, c] != "X"):  # Check if a block is below
-                return True
-        return False
+        return not self.piece_fits(self.piece_rotation, self.piece_row + 1, self.piece_col)
+
+    def padded_occupancy(self, grid = None):
+        """Boolean occupancy of the grid with a one-cell border (see srs.padded_occupancy)."""
+        grid = self.grid if grid is None else grid
+        return srs.padded_occupancy(grid != "X")
+
+    def classify_T_spins(self, pivots, rotations, wall_kick_5 = False, occupancy = None):
+        """Batched T-spin check for T placements on the same board, without locking anything.
+        pivots is (N, 2) pivot (row, col) positions, rotations is N rotation states (0, "R", 2, "L") and wall_kick_5 is a
+        bool or N bools. Returns an int8 array of indices into self.T_SPIN_TYPES: 0 none, 1 mini, 2 full.
+        Assumes every candidate qualifies (its last move was a rotation)."""
+        occupancy = self.padded_occupancy() if occupancy is None else occupancy
+        return srs.classify_T_spins(occupancy, pivots, [self.ROTATION_STATES.index(rotation) for rotation in rotations], wall_kick_5)
 
     def detect_T_spin(self):
         """Determines if the last move was a T-Spin, returning False if not a T piece."""
@@ -385,100 +461,10 @@ class TetrisGame:
         if self.current_piece_type != "T" or not self.qualified_for_T_spin:
             return False
 
-        # Initialize localized variables for corner checks. Front is the direction the T-piece is 'pointing' in, while back is the opposite.
-        front_left_filled = False
-        front_right_filled = False
-        back_right_filled = False
-        back_left_filled = False
-
         # Identify the pivot position (center of the T piece).
-        pivot_index = self.PIECE_PIVOTS["T"]
-        pivot_r, pivot_c = self.current_piece[pivot_index]
-
-        # **Handle corner checking for each rotation state
-        if self.current_rotation == 0:
-            # **Check front-facing squares**
-            front_left_filled = (
-                pivot_r - 1 >= 0 and pivot_c - 1 >= 0 and self.grid[pivot_r - 1, pivot_c - 1] != "X"
-            )
-            front_right_filled = (
-                pivot_r - 1 >= 0 and pivot_c + 1 < self.COLS and self.grid[pivot_r - 1, pivot_c + 1] != "X"
-            )
-
-            # **Check bottom-facing squares (considering out-of-bounds cases)**
-            back_left_filled = (
-                pivot_r + 1 >= self.ROWS or  # Back touching self.grid floor
-                self.grid[pivot_r + 1, pivot_c - 1] != "X"  # Cell is filled
-            )
-            back_right_filled = (
-                pivot_r + 1 >= self.ROWS or  # Back touching self.grid floor
-                self.grid[pivot_r + 1, pivot_c + 1] != "X"  # Cell is filled
-            )
-
-        elif self.current_rotation == "R":
-            # **Check front-facing squares**
-            front_left_filled = (
-                pivot_r - 1 >= 0 and pivot_c - 1 >= 0 and self.grid[pivot_r - 1, pivot_c + 1] != "X"
-            )
-            front_right_filled = (
-                pivot_r - 1 >= 0 and pivot_c + 1 < self.COLS and self.grid[pivot_r + 1, pivot_c + 1] != "X"
-            )
-
-            # **Check bottom-facing squares (considering out-of-bounds cases)**
-            back_left_filled = (
-                pivot_c - 1 < 0 or  # Touching left wall
-                self.grid[pivot_r - 1, pivot_c - 1] != "X"  # Cell is filled
-            )
-            back_right_filled = (
-                pivot_c - 1 < 0 or  # Touching left wall
-                self.grid[pivot_r + 1, pivot_c - 1] != "X"  # Cell is filled
-            )
-
-        elif self.current_rotation == 2:
-            # **Check front-facing squares**
-            front_left_filled = (
-                pivot_r - 1 >= 0 and pivot_c - 1 >= 0 and self.grid[pivot_r + 1, pivot_c + 1] != "X"
-            )
-            front_right_filled = (
-                pivot_r - 1 >= 0 and pivot_c + 1 < self.COLS and self.grid[pivot_r + 1, pivot_c - 1] != "X"
-            )
-
-            # Check bottom-facing squares (no out-of-bounds cases for down-facing T-piece)
-            back_left_filled = (
-                self.grid[pivot_r - 1, pivot_c + 1] != "X"  # Cell is filled
-            )
-            back_right_filled = (
-                self.grid[pivot_r - 1, pivot_c - 1] != "X"  # Cell is filled
-            )
-
-        elif self.current_rotation == "L":
-            # **Check front-facing squares**
-            front_left_filled = (
-                pivot_r - 1 >= 0 and pivot_c - 1 >= 0 and self.grid[pivot_r + 1, pivot_c - 1] != "X"
-            )
-            front_right_filled = (
-                pivot_r - 1 >= 0 and pivot_c + 1 < self.COLS and self.grid[pivot_r - 1, pivot_c - 1] != "X"
-            )
-
-            # **Check bottom-facing squares (considering out-of-bounds cases)**
-            back_left_filled = (
-                pivot_c + 1 >= self.COLS or  # Touching right wall
-                self.grid[pivot_r + 1, pivot_c + 1] != "X"  # Cell is filled
-            )
-            back_right_filled = (
-                pivot_c + 1 >= self.COLS or  # Touching right wall
-                self.grid[pivot_r - 1, pivot_c + 1] != "X"  # Cell is filled
-            )
-
-        # Return T-Spin state if detected.
-        if front_left_filled and front_right_filled and (back_left_filled or back_right_filled):
-            return "T-Spin"
-        elif self.wall_kick_5_used: # Could technically be added to the first conditional above, but would be difficult to read.
-            return "T-Spin"
-        elif back_left_filled and back_right_filled and (front_left_filled or front_right_filled):
-            return "Mini T-Spin"
-        else:
-            return False
+        pivot = (self.piece_row, self.piece_col)  # The reference cell of a T is its pivot
+        T_spin = self.classify_T_spins([pivot], [self.current_rotation], self.wall_kick_5_used)[0]
+        return self.T_SPIN_TYPES[T_spin]
 
     def handle_clear_text(self, text, has_b2b):
         """Sets the global self.clear_text variable to the given string for two seconds before clearing it.
@@ -512,8 +498,9 @@ class TetrisGame:
         full_rows = [r for r in range(self.ROWS) if all(self.grid[r, c] != "X" for c in range(self.COLS))] # Identify full rows
         num_cleared = len(full_rows)  # Number of lines cleared
         T_spin = self.detect_T_spin() # Detect T-Spin (False, "Mini T-Spin", "T-Spin")
-        score_awarded = 0 # Score to be awarded to the player at the end of the function.
-        unique_b2b = False # Identifier for cases when self.b2b isn't a simple 1.5x self.score multiplier
+        self.most_recent_T_spin = T_spin
+        self.most_recent_clear = num_cleared
+        perfect_clear = False # Set below if the clear empties the self.grid
         has_b2b = self.b2b # Checks whether the player had self.b2b *before* all the scoring logic changes it. Otherwise, initial 'difficult' clears would award self.b2b-modified points.
 
         if num_cleared == 0:
@@ -538,7 +525,24 @@ class TetrisGame:
             # Update the self.grid
             self.grid = new_grid
 
-        # Increment or decrement total cleared lines differently based on gamemode.
+        self.count_cleared_lines(num_cleared)
+
+        # Award points based on the number of lines cleared (T-spins give points even without lines cleared)
+        score_awarded, points, self.b2b, text = self.score_clear(num_cleared, T_spin, perfect_clear, has_b2b, self.clear_combo)
+        if text:
+            self.handle_clear_text(text, has_b2b)
+
+        # Finally, round self.score to nearest whole number to avoid floating point shenanigans
+        self.score += points
+        self.score = round(self.score)
+        self.most_recent_score = score_awarded
+
+        # Increment combo counter only *after* adding the combo self.score
+        if num_cleared > 0:
+            self.clear_combo += 1
+
+    def count_cleared_lines(self, num_cleared):
+        """Increment or decrement total cleared lines differently based on gamemode, ending a finished Sprint."""
         if self.game_mode == "Sprint" and self.lines_cleared > num_cleared:
             self.lines_cleared -= num_cleared
         elif self.game_mode == "Sprint" and self.lines_cleared <= num_cleared:
@@ -548,111 +552,174 @@ class TetrisGame:
         else:
             self.lines_cleared += num_cleared
 
-        # Award points based on the number of lines cleared (T-spins give points even without lines cleared)
+    def score_clear(self, num_cleared, T_spin, perfect_clear, has_b2b, combo):
+        """Scoring rules for one lock, without touching the game. Returns (score_awarded, points, b2b, clear_text):
+        the clear's value before multipliers plus the combo bonus (what most_recent_score shows), the points actually
+        added to the score, the B2B state afterwards, and the clear text to show (None for no text)."""
+
+        score_awarded = 0
+        unique_b2b = False # Identifier for cases when b2b isn't a simple 1.5x score multiplier
+        b2b = has_b2b
+        text = None
+
         # No lines cleared:
         if num_cleared == 0 and T_spin == "Mini T-Spin":
             score_awarded = 100 # Mini non-clear T-spin
-            # self.handle_clear_text("Mini T-Spin!", has_b2b)
-            # Non-clear mini T-spins don't break self.b2b, but don't start it either
+            # Non-clear mini T-spins don't break b2b, but don't start it either
         elif num_cleared == 0 and T_spin == "T-Spin":
             score_awarded = 400  # Non-clear T-spin
-            # self.handle_clear_text("T-Spin!", has_b2b)
-            # Non-clear T-spins don't break self.b2b, but don't start it either
+            # Non-clear T-spins don't break b2b, but don't start it either
 
         # Single line clears:
         elif num_cleared == 1 and not perfect_clear and not T_spin:
-            score_awarded = 100  # Single
-            self.b2b = False
-            self.handle_clear_text("Single!", has_b2b)
+            score_awarded, b2b, text = 100, False, "Single!"  # Single
         elif num_cleared == 1 and not perfect_clear and T_spin == "Mini T-Spin":
-            score_awarded = 200 # Mini TSS
-            self.b2b = True
-            self.handle_clear_text("Mini TSS!", has_b2b)
+            score_awarded, b2b, text = 200, True, "Mini TSS!"  # Mini TSS
         elif num_cleared == 1 and not perfect_clear and T_spin == "T-Spin":
-            score_awarded = 800 # TSS
-            self.b2b = True
-            self.handle_clear_text("TSS!", has_b2b)
+            score_awarded, b2b, text = 800, True, "TSS!"  # TSS
         elif num_cleared == 1 and perfect_clear:
-            score_awarded = 900 # PC Single
-            self.b2b = False
-            self.handle_clear_text("Perfect Clear!", has_b2b)
+            score_awarded, b2b, text = 900, False, "Perfect Clear!"  # PC Single
         # Not possible to perfect clear with either form of TSS, so no need to handle it
-        
+
         # Double line clears:
         elif num_cleared == 2 and not perfect_clear and not T_spin:
-            score_awarded = 300  # Double
-            self.b2b = False
-            self.handle_clear_text("Double!", has_b2b)
+            score_awarded, b2b, text = 300, False, "Double!"  # Double
         elif num_cleared == 2 and not perfect_clear and T_spin == "Mini T-Spin":
-            score_awarded = 400 # Mini TSD
-            self.b2b = True
-            self.handle_clear_text("Mini TSD!", has_b2b)
+            score_awarded, b2b, text = 400, True, "Mini TSD!"  # Mini TSD
         elif num_cleared == 2 and not perfect_clear and T_spin == "T-Spin":
-            score_awarded = 1200 # TSD
-            self.b2b = True
-            self.handle_clear_text("TSD!", has_b2b)
+            score_awarded, b2b, text = 1200, True, "TSD!"  # TSD
         elif num_cleared == 2 and perfect_clear:
-            score_awarded = 1500  # PC Double 
-            self.b2b = False
-            self.handle_clear_text("Perfect Clear!", has_b2b)
+            score_awarded, b2b, text = 1500, False, "Perfect Clear!"  # PC Double
         # Not possible to perfect clear with either form of TSD, so no need to handle it
 
         # Triple line clears:
         elif num_cleared == 3 and not perfect_clear and not T_spin:
-            score_awarded = 500  # Triple
-            self.b2b = False
-            self.handle_clear_text("Triple!", has_b2b)
+            score_awarded, b2b, text = 500, False, "Triple!"  # Triple
         elif num_cleared == 3 and not perfect_clear and T_spin:
-            score_awarded = 1600 # TST
-            self.b2b = True
-            self.handle_clear_text("TST!", has_b2b)
+            score_awarded, b2b, text = 1600, True, "TST!"  # TST
         elif num_cleared == 3 and perfect_clear and not T_spin:
-            score_awarded = 2300  # PC Triple
-            self.b2b = False
-            self.handle_clear_text("Perfect Clear!", has_b2b)
+            score_awarded, b2b, text = 2300, False, "Perfect Clear!"  # PC Triple
         elif num_cleared == 3 and perfect_clear and T_spin:
-            score_awarded = 3400  # PC TST
-            self.b2b = True
+            score_awarded, b2b, text = 3400, True, "Perfect TST!"  # PC TST
             unique_b2b = 800
-            self.handle_clear_text("Perfect TST!", has_b2b)
         # No such thing as a mini TST, since all four corners are necessarily covered.
 
         # Quadruple line clears (Tetrises):
         elif num_cleared == 4 and not perfect_clear:
-            score_awarded = 800  # Tetris
-            self.b2b = True
-            self.handle_clear_text("Tetris!", has_b2b)
+            score_awarded, b2b, text = 800, True, "Tetris!"  # Tetris
         elif num_cleared == 4 and perfect_clear:
-            score_awarded = 2800  # PC Tetris
-            self.b2b = True
+            score_awarded, b2b, text = 2800, True, "Perfect Tetris!"  # PC Tetris
             unique_b2b = 1200
-            self.handle_clear_text("Perfect Tetris!", has_b2b)
 
         # Point assignment:
-        if not has_b2b or not self.b2b: # No self.b2b
-            self.score += score_awarded
-            self.most_recent_score = score_awarded
-        elif has_b2b and self.b2b and not unique_b2b: # Non-PC self.b2b. Must have had self.b2b and also not broken it with the clear.
-            self.score += (score_awarded * 1.5)
-            self.most_recent_score = score_awarded
-        else: # PC self.b2b
-            self.score += (score_awarded + unique_b2b)
-            self.most_recent_score = score_awarded
-
-        # Finally, assign bonus points for combo and round self.score to nearest whole number to avoid floating point shenanigans
-        self.score += (50 * self.clear_combo)
-        self.score = round(self.score)
-        self.most_recent_score += (50 * self.clear_combo)
-        self.most_recent_score = round(self.most_recent_score)
-
-        # Increment combo counter only *after* adding the combo self.score
+        if not has_b2b or not b2b: # No b2b
+            points = score_awarded
+        elif has_b2b and b2b and not unique_b2b: # Non-PC b2b. Must have had b2b and also not broken it with the clear.
+            points = score_awarded * 1.5
+        else: # PC b2b
+            points = score_awarded + unique_b2b
+
+        # Bonus points for combo
+        points += 50 * combo
+        score_awarded = round(score_awarded + 50 * combo)
+
+        return score_awarded, points, b2b, text
+
+    def apply_placement(self, placement):
+        """Plays a placement in place, for depth-first search, and returns an UndoToken for undo().
+        `placement` is anything with piece_type and cells (placements.Candidate, reachability.Reachable...), plus
+        t_spin if it has one; whether it holds first is read from its hold field, inputs or key (placements.placement_holds).
+        Clears, T-spins, B2B and combos score as in lock_piece, but drop points, reward shaping fields, replays,
+        spectators and rendering are left out. Undo tokens must be undone in reverse order."""
+
+        fields = get_undo_fields(self)
+        hold = placement_holds(placement)
+
+        # Spawning pops from these, so give the game its own copies and keep the old ones for undo. Only a bag refill
+        # touches the secondary bag and the RNG.
+        spawns = 2 if hold and self.held_piece is None else 1
+        self.next_queue = list(self.next_queue)
+        self.primary_bag = list(self.primary_bag)
+        rng_state = None
+        if len(self.primary_bag) < spawns:
+            rng_state = self.rng.getstate()
+            self.secondary_bag = list(self.secondary_bag)
+
+        if hold:
+            if self.held_piece is None:
+                self.held_piece = self.current_piece_type
+                self.spawn_piece()  # The piece coming out of the queue is the one being placed
+            else:
+                self.held_piece, self.current_piece_type = self.current_piece_type, self.held_piece
+
+        # Lock the piece and clear any rows it completed
+        cells = tuple((r, c) for r, c in placement.cells if r >= 0)
+        for r, c in cells:
+            self.grid[r, c] = placement.piece_type
+        self.masks_stale = True
+
+        cleared_rows = sorted({r for r, _ in cells if (self.grid[r] != "X").all()})
+        cleared_contents = None
+        perfect_clear = False
+        if cleared_rows:
+            cleared_contents = self.grid[cleared_rows]  # Fancy indexing copies
+            self.grid[len(cleared_rows):] = self.grid[[r for r in range(self.ROWS) if r not in cleared_rows]]
+            self.grid[:len(cleared_rows)] = "X"
+            perfect_clear = not (self.grid != "X").any()
+
+        # Score it
+        num_cleared = len(cleared_rows)
+        T_spin = getattr(placement, "t_spin", False) if placement.piece_type == "T" else False
+        has_b2b = self.b2b
+        if num_cleared == 0:
+            self.clear_combo = 0
+        self.count_cleared_lines(num_cleared)
+        score_awarded, points, self.b2b, _ = self.score_clear(num_cleared, T_spin, perfect_clear, has_b2b, self.clear_combo)
+        self.score = round(self.score + points)
+        self.most_recent_score = score_awarded
+        self.most_recent_T_spin = T_spin
+        self.most_recent_clear = num_cleared
         if num_cleared > 0:
             self.clear_combo += 1
 
+        if self.game_mode == "Blitz":
+            self.total_pieces_placed -= 1
+        else:
+            self.total_pieces_placed += 1
+
+        # Next piece, as lock_piece spawns it
+        self.spawn_piece()
+        self.hold_used = False
+        self.qualified_for_T_spin = False
+        if not self.piece_fits(self.piece_rotation, self.piece_row, self.piece_col) or self.total_pieces_placed <= 0:
+            self.game_over = True
+
+        return UndoToken(cells, cleared_rows, cleared_contents, fields, rng_state)
+
+    def undo(self, token):
+        """Reverses the apply_placement that returned `token`."""
+
+        # Put cleared rows back where they were, then empty the placed cells
+        if token.cleared_rows:
+            self.grid[[r for r in range(self.ROWS) if r not in token.cleared_rows]] = self.grid[len(token.cleared_rows):].copy()
+            self.grid[token.cleared_rows] = token.cleared_contents
+        for r, c in token.cells:
+            self.grid[r, c] = "X"
+        self.masks_stale = True
+
+        for name, value in zip(UNDO_FIELDS, token.fields):
+            setattr(self, name, value)
+        if token.rng_state is not None:
+            self.rng.setstate(token.rng_state)
+
+    def current_time_ms(self):
+        """Time in milliseconds for the input and gravity timers: the logical clock while main() runs, wall time otherwise."""
+        return self.logic_time if self.logic_time is not None else pygame.time.get_ticks()
+
     def handle_movement(self, direction = 0):
         """Handles self.DAS and self.ARR for left/right movement and resets lock delay when moving."""
 
-        current_time = pygame.time.get_ticks()
+        current_time = self.current_time_ms()
 
         if self.move_left_pressed:
             direction = -1  # Move left
@@ -682,7 +749,7 @@ class TetrisGame:
         If manual=True, moves the piece down by one row and skips input timing logic.
         """
 
-        current_time = pygame.time.get_ticks()
+        current_time = self.current_time_ms()
 
         if AI:
             # Direct one-step drop
@@ -743,7 +810,7 @@ class TetrisGame:
 
         if not self.TICK_BASED:
 
-            current_time = pygame.time.get_ticks()
+            current_time = self.current_time_ms()
 
             # Apply gravity
             if current_time - self.gravity_timer >= self.GRAVITY:
@@ -799,10 +866,7 @@ class TetrisGame:
                 self.lockout_override_timer = 0
 
     def rotate_piece(self, direction):
-        """Rotates the current piece using SRS with wall kicks, handling I-piece separately."""
-
-        # Rotation states order
-        rotation_states = [0, "R", 2, "L"]
+        """Rotates the current piece using SRS with wall kicks (the I-piece uses its own kick table)."""
 
         # O-piece does not rotate at all
         if self.current_piece_type == "O":
@@ -811,209 +875,39 @@ class TetrisGame:
             return
 
         # Determine the new rotation state
-        if direction == "R":  # Clockwise
-            new_rotation = rotation_states[(rotation_states.index(self.current_rotation) + 1) % 4]
-        else:  # Counter-clockwise
-            new_rotation = rotation_states[(rotation_states.index(self.current_rotation) - 1) % 4]
-
-        # Special case for I-piece (different pivot point logic)
-        if self.current_piece_type == "I":
-            self.rotate_I_piece(direction, new_rotation)
-            return
-
-        # Find pivot block index based on piece type
-        pivot_index = self.PIECE_PIVOTS[self.current_piece_type]
-        pivot_r, pivot_c = self.current_piece[pivot_index]  # Get pivot position
-
-        # Rotate each block around the pivot
-        if direction == "R":  # Clockwise 90°
-            new_piece = [(pivot_r + (c - pivot_c), pivot_c - (r - pivot_r)) for r, c in self.current_piece]
-        else:  # Counter-clockwise 90°
-            new_piece = [(pivot_r - (c - pivot_c), pivot_c + (r - pivot_r)) for r, c in self.current_piece]
+        new_rotation = (self.piece_rotation + (1 if direction == "R" else -1)) % 4
 
         # Choose correct SRS wall kick data
-        kick_data = self.SRS_WALL_KICKS
-        kick_tests = kick_data.get((self.current_rotation, new_rotation), [(0, 0)])
+        kick_data = self.SRS_WALL_KICKS_I if self.current_piece_type == "I" else self.SRS_WALL_KICKS
+        kick_tests = kick_data.get((self.current_rotation, self.ROTATION_STATES[new_rotation]), [(0, 0)])
 
-        self.wall_kick_5_used = False # Reset to false since a rotation is being attempted.
+        if self.current_piece_type != "I":
+            self.wall_kick_5_used = False # Reset to false since a rotation is being attempted.
 
         # Try applying each kick (track index for final kick detection)
         for i, (kick_x, kick_y) in enumerate(kick_tests):
-            kicked_piece = [(r + kick_y, c + kick_x) for r, c in new_piece]
-            if self.is_valid_position(kicked_piece):  # If no collision, apply rotation
-                self.current_piece = kicked_piece
-                self.current_rotation = new_rotation
-                self.qualified_for_T_spin = True
-                self.wall_kick_5_used = (i == len(kick_tests) - 1) # Set self.wall_kick_5_used to True only if it's the final wall kick attempt
+            if self.piece_fits(new_rotation, self.piece_row + kick_y, self.piece_col + kick_x):  # If no collision, apply rotation
+                self.piece_rotation = new_rotation
+                self.piece_row += kick_y
+                self.piece_col += kick_x
+                if self.current_piece_type != "I":  # I-pieces never T-spin
+                    self.qualified_for_T_spin = True
+                    self.wall_kick_5_used = (i == len(kick_tests) - 1) # Set self.wall_kick_5_used to True only if it's the final wall kick attempt
                 self.gravity_lock_timer = 0  # Reset lock delay
                 self.soft_drop_lock_timer = 0
                 return True  # Rotation succeeded
 
         return False  # Rotation failed, piece stays the same
 
-
-    def rotate_I_piece(self, direction, new_rotation):
-        """Handles I-piece rotation using correct pivot alignment in SRS."""
-        
-        if self.current_rotation == 0:  # Horizontal (Facing Upward)
-            # Extract mino positions sorted by column to correctly identify mino indexes
-            mino_positions = sorted(self.current_piece, key=lambda pos: pos[1])  # Sort by column
-
-            if direction == "L":  # Left Rotation
-                pivot_col = mino_positions[1][1]  # Mino 1's column (Pivot)
-                pivot_row = mino_positions[1][0]  # Mino 1's row
-                new_piece = [
-                    (pivot_row + 2, pivot_col),  # Mino 0 (Lowest)
-                    (pivot_row + 1, pivot_col),  # Mino 1 (Below)
-                    (pivot_row, pivot_col),      # Mino 2 (Pivot)
-                    (pivot_row - 1, pivot_col)   # Mino 3 (Above)
-                ]
-
-            else:  # Right Rotation
-                pivot_col = mino_positions[2][1]  # Mino 2's column (Pivot)
-                pivot_row = mino_positions[2][0]  # Mino 2's row
-                new_piece = [
-                    (pivot_row - 1, pivot_col),  # Mino 0 (Above)
-                    (pivot_row, pivot_col),      # Mino 1 (Pivot)
-                    (pivot_row + 1, pivot_col),  # Mino 2 (Below)
-                    (pivot_row + 2, pivot_col)   # Mino 3 (Lowest)
-                ]
-
-            # Apply SRS wall kicks
-            kick_tests = self.SRS_WALL_KICKS_I.get((self.current_rotation, new_rotation), [(0, 0)])
-            for kick_x, kick_y in kick_tests:
-                kicked_piece = [(r + kick_y, c + kick_x) for r, c in new_piece]
-                if self.is_valid_position(kicked_piece):
-                    self.current_piece = kicked_piece
-                    self.current_rotation = new_rotation
-                    self.gravity_lock_timer = 0  # Reset lock delay
-                    self.soft_drop_lock_timer = 0
-                    return True  # Rotation succeeded
-                
-            return False  # Rotation failed, piece stays the same
-
-        elif self.current_rotation == "R":  # Vertical "R" Position
-                # Extract mino positions sorted by row to correctly identify mino indexes
-                mino_positions = sorted(self.current_piece, key=lambda pos: pos[0])  # Sort by row
-
-                if direction == "R":  # Right Rotation (Aligns Horizontally)
-                    pivot_row = mino_positions[2][0]  # Mino 2's row (Pivot)
-                    pivot_col = mino_positions[2][1]  # Mino 2's column (Pivot)
-                    new_piece = [
-                        (pivot_row, pivot_col - 2),  # Mino 3 (Leftmost)
-                        (pivot_row, pivot_col - 1),  # Mino 2 (Left)
-                        (pivot_row, pivot_col),      # Mino 1 (Pivot)
-                        (pivot_row, pivot_col + 1)   # Mino 0 (Rightmost)
-                    ]
-
-                else:  # Left Rotation (Aligns Horizontally)
-                    pivot_row = mino_positions[1][0]  # Mino 1's row (Pivot)
-                    pivot_col = mino_positions[1][1]  # Mino 1's column (Pivot)
-                    new_piece = [
-                        (pivot_row, pivot_col - 2),  # Mino 0 (Leftmost)
-                        (pivot_row, pivot_col - 1),  # Mino 1 (Left)
-                        (pivot_row, pivot_col),      # Mino 2 (Pivot)
-                        (pivot_row, pivot_col + 1)   # Mino 3 (Rightmost)
-                    ]
-
-                # Apply SRS wall kicks
-                kick_tests = self.SRS_WALL_KICKS_I.get((self.current_rotation, new_rotation), [(0, 0)])
-                for kick_x, kick_y in kick_tests:
-                    kicked_piece = [(r + kick_y, c + kick_x) for r, c in new_piece]
-                    if self.is_valid_position(kicked_piece):
-                        self.current_piece = kicked_piece
-                        self.current_rotation = new_rotation
-                        self.gravity_lock_timer = 0  # Reset lock delay
-                        self.soft_drop_lock_timer = 0
-                        return True  # Rotation succeeded
-
-                return False  # Rotation failed, piece stays the same
-        
-        elif self.current_rotation == 2:  # Horizontal "Upside-Down"
-            # Extract mino positions sorted by column to correctly identify mino indexes
-            mino_positions = sorted(self.current_piece, key=lambda pos: pos[1])  # Sort by column
-            mino_positions.reverse()  # Ensure order matches expected mino indices in state 2
-
-            if direction == "L":  # Left Rotation (Aligns Vertically)
-                pivot_row = mino_positions[1][0]  # Mino 1's row (Pivot)
-                pivot_col = mino_positions[1][1]  # Mino 1's column (Pivot)
-                new_piece = [
-                    (pivot_row - 2, pivot_col),  # Mino 0 (Topmost)
-                    (pivot_row - 1, pivot_col),  # Mino 1 (Above Pivot)
-                    (pivot_row, pivot_col),      # Mino 2 (Pivot)
-                    (pivot_row + 1, pivot_col)   # Mino 3 (Below Pivot)
-                ]
-
-            else:  # Right Rotation (Aligns Vertically)
-                pivot_row = mino_positions[2][0]  # Mino 2's row (Pivot)
-                pivot_col = mino_positions[2][1]  # Mino 2's column (Pivot)
-                new_piece = [
-                    (pivot_row - 2, pivot_col),  # Mino 3 (Topmost)
-                    (pivot_row - 1, pivot_col),  # Mino 2 (Above Pivot)
-                    (pivot_row, pivot_col),      # Mino 1 (Pivot)
-                    (pivot_row + 1, pivot_col)   # Mino 0 (Lowest)
-                ]
-
-            # Apply SRS wall kicks
-            kick_tests = self.SRS_WALL_KICKS_I.get((self.current_rotation, new_rotation), [(0, 0)])
-            for kick_x, kick_y in kick_tests:
-                kicked_piece = [(r + kick_y, c + kick_x) for r, c in new_piece]
-                if self.is_valid_position(kicked_piece):
-                    self.current_piece = kicked_piece
-                    self.current_rotation = new_rotation
-                    self.gravity_lock_timer = 0  # Reset lock delay
-                    self.soft_drop_lock_timer = 0
-                    return True  # Rotation succeeded
-
-            return False  # Rotation failed, piece stays the same
-
-        elif self.current_rotation == "L":  # Vertical "L" Position
-            # Extract mino positions sorted by row to correctly identify mino indexes
-            mino_positions = sorted(self.current_piece, key=lambda pos: pos[0])  # Sort by row
-            mino_positions.reverse()  # Ensure order matches expected mino indices in state "L"
-
-            if direction == "L":  # Left Rotation (Aligns Horizontally)
-                pivot_row = mino_positions[1][0]  # Mino 1's row (Pivot)
-                pivot_col = mino_positions[1][1]  # Mino 1's column (Pivot)
-                new_piece = [
-                    (pivot_row, pivot_col - 1),  # Mino 3 (Leftmost)
-                    (pivot_row, pivot_col),      # Mino 2 (Pivot)
-                    (pivot_row, pivot_col + 1),  # Mino 1 (Right)
-                    (pivot_row, pivot_col + 2)   # Mino 0 (Rightmost)
-                ]
-
-            else:  # Right Rotation (Aligns Horizontally)
-                pivot_row = mino_positions[2][0]  # Mino 2's row (Pivot)
-                pivot_col = mino_positions[2][1]  # Mino 2's column (Pivot)
-                new_piece = [
-                    (pivot_row, pivot_col - 1),  # Mino 0 (Leftmost)
-                    (pivot_row, pivot_col),      # Mino 1 (Pivot)
-                    (pivot_row, pivot_col + 1),  # Mino 2 (Right)
-                    (pivot_row, pivot_col + 2)   # Mino 3 (Rightmost)
-                ]
-
-            # Apply SRS wall kicks
-            kick_tests = self.SRS_WALL_KICKS_I.get((self.current_rotation, new_rotation), [(0, 0)])
-            for kick_x, kick_y in kick_tests:
-                kicked_piece = [(r + kick_y, c + kick_x) for r, c in new_piece]
-                if self.is_valid_position(kicked_piece):
-                    self.current_piece = kicked_piece
-                    self.current_rotation = new_rotation
-                    self.gravity_lock_timer = 0  # Reset lock delay
-                    self.soft_drop_lock_timer = 0
-                    return True  # Rotation succeeded
-
-            return False  # Rotation failed, piece stays the same
-
     def get_ghost_piece(self):
         """Returns the lowest valid position for the current piece (ghost piece)."""
-        ghost_piece = list(self.current_piece)  # Copy the current piece
+        ghost_row = self.piece_row
 
         # Move the ghost piece down until it collides
-        while self.is_valid_position([(r + 1, c) for r, c in ghost_piece]):
-            ghost_piece = [(r + 1, c) for r, c in ghost_piece]
+        while self.piece_fits(self.piece_rotation, ghost_row + 1, self.piece_col):
+            ghost_row += 1
 
-        return ghost_piece
+        return srs.piece_cells(self.current_piece_type, self.piece_rotation, ghost_row, self.piece_col)
     
     def aggregate_height(self, grid=None):
         """
@@ -1103,6 +997,9 @@ class TetrisGame:
         Returns:
             float: The total weighted score for the grid.
         """
+        if weights is None:
+            return 0.0  # Callers that only need the resulting grids (e.g. train_sprint.py) don't pass weights
+
         a, b, c, d = weights
 
         agg_height = self.aggregate_height(grid)
@@ -1119,692 +1016,211 @@ class TetrisGame:
 
         return score
 
-    def get_all_viable_hard_drops(self, weights = None):
-        """Returns a list of every possible resulting grid for a given piece for the AI to choose from."""
-        original_next_queue = self.next_queue # To account for the hold piece being empty and having to potentially reset the next queue
-        original_held_piece = self.held_piece # Same deal here
-        viable_drops = {} # To be appended to before returning
-        drop_heuristics = {} # to be appended to before returning
-        active_piece = list(self.current_piece)
-        rotations = [0, "L", 2, "R"] # Looping variable
-        checks = {
-            0 : ["I", "J", "L", "O", "S", "T", "Z"],
-            "L" : ["I", "J", "L", "S", "T", "Z"], # No duplicate O-piece checks
-            2 : ["J", "L", "T"], # No duplicate I-/S-/T-piece checks
-            "R" : ["J", "L", "T"] # These three have four distinct rotational states.
-        }
+    def snapshot(self):
+        """Immutable copy of the state placement enumeration reads (see placements.GameState)."""
+        grid = np.copy(self.grid)
+        grid.flags.writeable = False
+        return GameState(grid, self.current_piece_type, self.piece_rotation, self.piece_row, self.piece_col, self.held_piece, self.hold_used, tuple(self.next_queue))
+
+    def get_candidates(self, weights = None):
+        """Scored placements of the active piece (and the hold piece) without their resulting grids;
+        see placements.evaluate_candidates and placements.materialize_grid."""
+        return evaluate_candidates(self.snapshot(), weights)
+
+    def get_reachable_placements(self, memo = None):
+        """Every lock position the active piece (or the hold piece) can reach, tucks and spins included, each with a
+        shortest input sequence; see reachability.find_reachable_placements."""
+        return find_reachable_placements(self.snapshot(), memo)
 
+    def get_all_viable_hard_drops(self, weights = None):
+        """Returns every possible resulting grid for a given piece for the AI to choose from, and each one's heuristic score.
+        Enumeration is done by placements.enumerate_placements on a snapshot, so the live game is never modified.
+        The grids are a lazy mapping: a grid is only built when its key is looked up."""
         weights = weights if weights is not None else (1, 1, 1, 1)
-        
-        # Current Piece Calculations:
-        for rotation in rotations:
-
-            if self.current_piece_type in checks[rotation]:
-
-                # One space to the left
-                if self.is_valid_position([(r, c - 1) for r, c in active_piece]):
-                    shifted_piece = [(r, c - 1) for r, c in active_piece]
-
-                    # Simulate the hard drop
-                    dropped_piece = list(shifted_piece)
-                    while True:
-                        next_pos = [(r + 1, c) for r, c in dropped_piece]
-                        if self.is_valid_position(next_pos):
-                            dropped_piece = next_pos
-                        else:
-                            break
-
-                    # Fill the piece into a copy of the grid
-                    grid_copy = np.copy(self.grid)
-                    for r, c in dropped_piece:
-                        if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                            grid_copy[r, c] = self.current_piece_type
-
-                    # Save the result
-                    viable_drops[(-1, rotation, False)] = grid_copy
-                    drop_heuristics[(-1, rotation, False)] = self.evaluate_heuristics(grid_copy, weights)
-
-                    # This feels like a war crime but the nested if statements make sense here.
-                    # Two spaces to the left
-                    if self.is_valid_position([(r, c - 2) for r, c in active_piece]):
-                        shifted_piece = [(r, c - 2) for r, c in active_piece]
-
-                        # Simulate the hard drop
-                        dropped_piece = list(shifted_piece)
-                        while True:
-                            next_pos = [(r + 1, c) for r, c in dropped_piece]
-                            if self.is_valid_position(next_pos):
-                                dropped_piece = next_pos
-                            else:
-                                break
-
-                        # Fill the piece into a copy of the grid
-                        grid_copy = np.copy(self.grid)
-                        for r, c in dropped_piece:
-                            if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                grid_copy[r, c] = self.current_piece_type
-
-                        # Save the result
-                        viable_drops[(-2, rotation, False)] = grid_copy
-                        drop_heuristics[(-2, rotation, False)] = self.evaluate_heuristics(grid_copy, weights)
-
-                        # Three spaces to the left
-                        if self.is_valid_position([(r, c - 3) for r, c in active_piece]):
-                            shifted_piece = [(r, c - 3) for r, c in active_piece]
-
-                            # Simulate the hard drop
-                            dropped_piece = list(shifted_piece)
-                            while True:
-                                next_pos = [(r + 1, c) for r, c in dropped_piece]
-                                if self.is_valid_position(next_pos):
-                                    dropped_piece = next_pos
-                                else:
-                                    break
-
-                            # Fill the piece into a copy of the grid
-                            grid_copy = np.copy(self.grid)
-                            for r, c in dropped_piece:
-                                if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                    grid_copy[r, c] = self.current_piece_type
-
-                            # Save the result
-                            viable_drops[(-3, rotation, False)] = grid_copy
-                            drop_heuristics[(-3, rotation, False)] = self.evaluate_heuristics(grid_copy, weights)
-
-                            # Four spaces to the left
-                            if self.is_valid_position([(r, c - 4) for r, c in active_piece]):
-                                shifted_piece = [(r, c - 4) for r, c in active_piece]
-
-                                # Simulate the hard drop
-                                dropped_piece = list(shifted_piece)
-                                while True:
-                                    next_pos = [(r + 1, c) for r, c in dropped_piece]
-                                    if self.is_valid_position(next_pos):
-                                        dropped_piece = next_pos
-                                    else:
-                                        break
-
-                                # Fill the piece into a copy of the grid
-                                grid_copy = np.copy(self.grid)
-                                for r, c in dropped_piece:
-                                    if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                        grid_copy[r, c] = self.current_piece_type
-
-                                # Save the result
-                                viable_drops[(-4, rotation, False)] = grid_copy
-                                drop_heuristics[(-4, rotation, False)] = self.evaluate_heuristics(grid_copy, weights)
-
-                # One space to the right
-                if self.is_valid_position([(r, c + 1) for r, c in active_piece]):
-                    shifted_piece = [(r, c + 1) for r, c in active_piece]
-
-                    # Simulate the hard drop
-                    dropped_piece = list(shifted_piece)
-                    while True:
-                        next_pos = [(r + 1, c) for r, c in dropped_piece]
-                        if self.is_valid_position(next_pos):
-                            dropped_piece = next_pos
-                        else:
-                            break
-
-                    # Fill the piece into a copy of the grid
-                    grid_copy = np.copy(self.grid)
-                    for r, c in dropped_piece:
-                        if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                            grid_copy[r, c] = self.current_piece_type
-
-                    # Save the result
-                    viable_drops[(1, rotation, False)] = grid_copy
-                    drop_heuristics[(1, rotation, False)] = self.evaluate_heuristics(grid_copy, weights)
-
-                    # Two spaces to the right
-                    if self.is_valid_position([(r, c + 2) for r, c in active_piece]):
-                        shifted_piece = [(r, c + 2) for r, c in active_piece]
-
-                        # Simulate the hard drop
-                        dropped_piece = list(shifted_piece)
-                        while True:
-                            next_pos = [(r + 1, c) for r, c in dropped_piece]
-                            if self.is_valid_position(next_pos):
-                                dropped_piece = next_pos
-                            else:
-                                break
-
-                        # Fill the piece into a copy of the grid
-                        grid_copy = np.copy(self.grid)
-                        for r, c in dropped_piece:
-                            if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                grid_copy[r, c] = self.current_piece_type
-
-                        # Save the result
-                        viable_drops[(2, rotation, False)] = grid_copy
-                        drop_heuristics[(2, rotation, False)] = self.evaluate_heuristics(grid_copy, weights)
-
-                        # Three spaces to the right
-                        if self.is_valid_position([(r, c + 3) for r, c in active_piece]):
-                            shifted_piece = [(r, c + 3) for r, c in active_piece]
-
-                            # Simulate the hard drop
-                            dropped_piece = list(shifted_piece)
-                            while True:
-                                next_pos = [(r + 1, c) for r, c in dropped_piece]
-                                if self.is_valid_position(next_pos):
-                                    dropped_piece = next_pos
-                                else:
-                                    break
-
-                            # Fill the piece into a copy of the grid
-                            grid_copy = np.copy(self.grid)
-                            for r, c in dropped_piece:
-                                if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                    grid_copy[r, c] = self.current_piece_type
-
-                            # Save the result
-                            viable_drops[(3, rotation, False)] = grid_copy
-                            drop_heuristics[(3, rotation, False)] = self.evaluate_heuristics(grid_copy, weights)
-
-                            # Four spaces to the right
-                            if self.is_valid_position([(r, c + 4) for r, c in active_piece]):
-                                shifted_piece = [(r, c + 4) for r, c in active_piece]
-
-                                # Simulate the hard drop
-                                dropped_piece = list(shifted_piece)
-                                while True:
-                                    next_pos = [(r + 1, c) for r, c in dropped_piece]
-                                    if self.is_valid_position(next_pos):
-                                        dropped_piece = next_pos
-                                    else:
-                                        break
-
-                                # Fill the piece into a copy of the grid
-                                grid_copy = np.copy(self.grid)
-                                for r, c in dropped_piece:
-                                    if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                        grid_copy[r, c] = self.current_piece_type
-
-                                # Save the result
-                                viable_drops[(4, rotation, False)] = grid_copy
-                                drop_heuristics[(4, rotation, False)] = self.evaluate_heuristics(grid_copy, weights)
-
-                                # Five spaces to the right
-                                if self.is_valid_position([(r, c + 5) for r, c in active_piece]):
-                                    shifted_piece = [(r, c + 5) for r, c in active_piece]
-
-                                    # Simulate the hard drop
-                                    dropped_piece = list(shifted_piece)
-                                    while True:
-                                        next_pos = [(r + 1, c) for r, c in dropped_piece]
-                                        if self.is_valid_position(next_pos):
-                                            dropped_piece = next_pos
-                                        else:
-                                            break
-
-                                    # Fill the piece into a copy of the grid
-                                    grid_copy = np.copy(self.grid)
-                                    for r, c in dropped_piece:
-                                        if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                            grid_copy[r, c] = self.current_piece_type
-
-                                    # Save the result
-                                    viable_drops[(5, rotation, False)] = grid_copy
-                                    drop_heuristics[(5, rotation, False)] = self.evaluate_heuristics(grid_copy, weights)
-
-                # Simulate the hard drop in place (necessarily viable so no if statement):
-                dropped_piece = list(active_piece)
-                while True:
-                    next_pos = [(r + 1, c) for r, c in dropped_piece]
-                    if self.is_valid_position(next_pos):
-                        dropped_piece = next_pos
-                    else:
-                        break
-
-                # Fill the piece into a copy of the grid
-                grid_copy = np.copy(self.grid)
-                for r, c in dropped_piece:
-                    if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                        grid_copy[r, c] = self.current_piece_type
-
-                # Save the result
-                viable_drops[(0, rotation, False)] = grid_copy
-                drop_heuristics[(0, rotation, False)] = self.evaluate_heuristics(grid_copy, weights)
-
-            # Rotate piece before iterating (or back to original iteration in case of the final loop).
-            self.rotate_piece("L")
-
-            active_piece = list(self.current_piece) # Re-initialize at new rotation
-
-        # Do the same calculations for the hold piece, so long as it isn't the same piece type as the active piece.
-        if self.held_piece != self.current_piece_type:
-
-            self.hold_piece() # Swap current piece w/ either held piece (or next-up, if hold is empty).
-            self.hold_used = False # Allow for the hold action to be used again afterwards
-
-
-            for rotation in rotations:
-
-                if self.current_piece_type in checks[rotation]:
-
-                    # One space to the left
-                    if self.is_valid_position([(r, c - 1) for r, c in active_piece]):
-                        shifted_piece = [(r, c - 1) for r, c in active_piece]
-
-                        # Simulate the hard drop
-                        dropped_piece = list(shifted_piece)
-                        while True:
-                            next_pos = [(r + 1, c) for r, c in dropped_piece]
-                            if self.is_valid_position(next_pos):
-                                dropped_piece = next_pos
-                            else:
-                                break
-
-                        # Fill the piece into a copy of the grid
-                        grid_copy = np.copy(self.grid)
-                        for r, c in dropped_piece:
-                            if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                grid_copy[r, c] = self.current_piece_type
-
-                        # Save the result
-                        viable_drops[(-1, rotation, True)] = grid_copy
-                        drop_heuristics[(-1, rotation, True)] = self.evaluate_heuristics(grid_copy, weights)
-
-                        # This feels like a war crime but the nested if statements make sense here.
-                        # Two spaces to the left
-                        if self.is_valid_position([(r, c - 2) for r, c in active_piece]):
-                            shifted_piece = [(r, c - 2) for r, c in active_piece]
-
-                            # Simulate the hard drop
-                            dropped_piece = list(shifted_piece)
-                            while True:
-                                next_pos = [(r + 1, c) for r, c in dropped_piece]
-                                if self.is_valid_position(next_pos):
-                                    dropped_piece = next_pos
-                                else:
-                                    break
-
-                            # Fill the piece into a copy of the grid
-                            grid_copy = np.copy(self.grid)
-                            for r, c in dropped_piece:
-                                if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                    grid_copy[r, c] = self.current_piece_type
-
-                            # Save the result
-                            viable_drops[(-2, rotation, True)] = grid_copy
-                            drop_heuristics[(-2, rotation, True)] = self.evaluate_heuristics(grid_copy, weights)
-
-                            # Three spaces to the left
-                            if self.is_valid_position([(r, c - 3) for r, c in active_piece]):
-                                shifted_piece = [(r, c - 3) for r, c in active_piece]
-
-                                # Simulate the hard drop
-                                dropped_piece = list(shifted_piece)
-                                while True:
-                                    next_pos = [(r + 1, c) for r, c in dropped_piece]
-                                    if self.is_valid_position(next_pos):
-                                        dropped_piece = next_pos
-                                    else:
-                                        break
-
-                                # Fill the piece into a copy of the grid
-                                grid_copy = np.copy(self.grid)
-                                for r, c in dropped_piece:
-                                    if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                        grid_copy[r, c] = self.current_piece_type
-
-                                # Save the result
-                                viable_drops[(-3, rotation, True)] = grid_copy
-                                drop_heuristics[(-3, rotation, True)] = self.evaluate_heuristics(grid_copy, weights)
-
-                                # Four spaces to the left
-                                if self.is_valid_position([(r, c - 4) for r, c in active_piece]):
-                                    shifted_piece = [(r, c - 4) for r, c in active_piece]
-
-                                    # Simulate the hard drop
-                                    dropped_piece = list(shifted_piece)
-                                    while True:
-                                        next_pos = [(r + 1, c) for r, c in dropped_piece]
-                                        if self.is_valid_position(next_pos):
-                                            dropped_piece = next_pos
-                                        else:
-                                            break
-
-                                    # Fill the piece into a copy of the grid
-                                    grid_copy = np.copy(self.grid)
-                                    for r, c in dropped_piece:
-                                        if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                            grid_copy[r, c] = self.current_piece_type
-
-                                    # Save the result
-                                    viable_drops[(-4, rotation, True)] = grid_copy
-                                    drop_heuristics[(-4, rotation, True)] = self.evaluate_heuristics(grid_copy, weights)
-
-                    # One space to the right
-                    if self.is_valid_position([(r, c + 1) for r, c in active_piece]):
-                        shifted_piece = [(r, c + 1) for r, c in active_piece]
-
-                        # Simulate the hard drop
-                        dropped_piece = list(shifted_piece)
-                        while True:
-                            next_pos = [(r + 1, c) for r, c in dropped_piece]
-                            if self.is_valid_position(next_pos):
-                                dropped_piece = next_pos
-                            else:
-                                break
-
-                        # Fill the piece into a copy of the grid
-                        grid_copy = np.copy(self.grid)
-                        for r, c in dropped_piece:
-                            if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                grid_copy[r, c] = self.current_piece_type
-
-                        # Save the result
-                        viable_drops[(1, rotation, True)] = grid_copy
-                        drop_heuristics[(1, rotation, True)] = self.evaluate_heuristics(grid_copy, weights)
-
-                        # Two spaces to the right
-                        if self.is_valid_position([(r, c + 2) for r, c in active_piece]):
-                            shifted_piece = [(r, c + 2) for r, c in active_piece]
-
-                            # Simulate the hard drop
-                            dropped_piece = list(shifted_piece)
-                            while True:
-                                next_pos = [(r + 1, c) for r, c in dropped_piece]
-                                if self.is_valid_position(next_pos):
-                                    dropped_piece = next_pos
-                                else:
-                                    break
-
-                            # Fill the piece into a copy of the grid
-                            grid_copy = np.copy(self.grid)
-                            for r, c in dropped_piece:
-                                if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                    grid_copy[r, c] = self.current_piece_type
-
-                            # Save the result
-                            viable_drops[(2, rotation, True)] = grid_copy
-                            drop_heuristics[(2, rotation, True)] = self.evaluate_heuristics(grid_copy, weights)
-
-                            # Three spaces to the right
-                            if self.is_valid_position([(r, c + 3) for r, c in active_piece]):
-                                shifted_piece = [(r, c + 3) for r, c in active_piece]
-
-                                # Simulate the hard drop
-                                dropped_piece = list(shifted_piece)
-                                while True:
-                                    next_pos = [(r + 1, c) for r, c in dropped_piece]
-                                    if self.is_valid_position(next_pos):
-                                        dropped_piece = next_pos
-                                    else:
-                                        break
-
-                                # Fill the piece into a copy of the grid
-                                grid_copy = np.copy(self.grid)
-                                for r, c in dropped_piece:
-                                    if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                        grid_copy[r, c] = self.current_piece_type
-
-                                # Save the result
-                                viable_drops[(3, rotation, True)] = grid_copy
-                                drop_heuristics[(3, rotation, True)] = self.evaluate_heuristics(grid_copy, weights)
-
-                                # Four spaces to the right
-                                if self.is_valid_position([(r, c + 4) for r, c in active_piece]):
-                                    shifted_piece = [(r, c + 4) for r, c in active_piece]
-
-                                    # Simulate the hard drop
-                                    dropped_piece = list(shifted_piece)
-                                    while True:
-                                        next_pos = [(r + 1, c) for r, c in dropped_piece]
-                                        if self.is_valid_position(next_pos):
-                                            dropped_piece = next_pos
-                                        else:
-                                            break
-
-                                    # Fill the piece into a copy of the grid
-                                    grid_copy = np.copy(self.grid)
-                                    for r, c in dropped_piece:
-                                        if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                            grid_copy[r, c] = self.current_piece_type
-
-                                    # Save the result
-                                    viable_drops[(4, rotation, True)] = grid_copy
-                                    drop_heuristics[(4, rotation, True)] = self.evaluate_heuristics(grid_copy, weights)
-
-                                    # Five spaces to the right
-                                    if self.is_valid_position([(r, c + 5) for r, c in active_piece]):
-                                        shifted_piece = [(r, c + 5) for r, c in active_piece]
-
-                                        # Simulate the hard drop
-                                        dropped_piece = list(shifted_piece)
-                                        while True:
-                                            next_pos = [(r + 1, c) for r, c in dropped_piece]
-                                            if self.is_valid_position(next_pos):
-                                                dropped_piece = next_pos
-                                            else:
-                                                break
-
-                                        # Fill the piece into a copy of the grid
-                                        grid_copy = np.copy(self.grid)
-                                        for r, c in dropped_piece:
-                                            if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                                                grid_copy[r, c] = self.current_piece_type
-
-                                        # Save the result
-                                        viable_drops[(5, rotation, True)] = grid_copy
-                                        drop_heuristics[(5, rotation, True)] = self.evaluate_heuristics(grid_copy, weights)
-
-                    # Simulate the hard drop in place (necessarily viable so no if statement):
-                    dropped_piece = list(active_piece)
-                    while True:
-                        next_pos = [(r + 1, c) for r, c in dropped_piece]
-                        if self.is_valid_position(next_pos):
-                            dropped_piece = next_pos
-                        else:
-                            break
-
-                    # Fill the piece into a copy of the grid
-                    grid_copy = np.copy(self.grid)
-                    for r, c in dropped_piece:
-                        if 0 <= r < self.ROWS and 0 <= c < self.COLS:
-                            grid_copy[r, c] = self.current_piece_type
-
-                    # Save the result
-                    viable_drops[(0, rotation, True)] = grid_copy
-                    drop_heuristics[(0, rotation, True)] = self.evaluate_heuristics(grid_copy, weights)
-
-                # Rotate piece before iterating (or back to original iteration in case of the final loop).
-                self.rotate_piece("L")
-
-                active_piece = list(self.current_piece) # Re-initialize at new rotation
-
-            self.hold_piece() # Swap back
-            self.hold_used = False # Allow for the hold action to be used again afterwards
-
-            # Replaces held piece and next queue as they were in case the hold queue was empty.
-            # No if statement since it should essentially just do nothing if the queue wasn't empty.
-            self.next_queue = original_next_queue
-            self.held_piece = original_held_piece
+
+        state = self.snapshot()
+        candidates = evaluate_candidates(state, weights)
+
+        viable_drops = CandidateGrids(state.grid, candidates)
+        drop_heuristics = {candidate.key: candidate.score for candidate in candidates}
 
         return viable_drops, drop_heuristics
 
 
-    def draw_hold_box(self):
-        """Draws the hold box aligned with the top half-cell margin, with proper sizing."""
+    def get_render_cache(self):
+        """Returns the fonts, layout and pre-rendered mino tiles for the current window size, rebuilding them
+        (and forcing a full redraw) only when the size has changed since the last call."""
         width, height = self.screen.get_size()
 
-        # Sets color of text to red if hold is currently locked.
-        if self.hold_used:
-            hold_text_color = (255, 150, 150)
-        else:
-            hold_text_color = (255, 255, 255)
+        if self.render_cache is not None and self.render_cache["size"] == (width, height):
+            return self.render_cache
 
         # Calculate square size dynamically
-        square_size = min(width // self.COLS, height // (self.VISIBLE_ROWS + 1))  # Adjust size dynamically
+        square_size = min(width // self.COLS, height // (self.VISIBLE_ROWS + 1))  # +1 ensures space for half-cell margins
         grid_width = square_size * self.COLS
-        grid_height = square_size * (self.VISIBLE_ROWS + 1)  # Include margins
+        grid_height = square_size * (self.VISIBLE_ROWS + 1)  # Expanded to include margins
 
-        # Centering the self.grid in the window
+        # Center the self.grid in the window
         margin_x = (width - grid_width) // 2
         margin_y = (height - grid_height) // 2
 
-        # Hold box position
-        hold_box_width = square_size * 5  
-        hold_box_height = square_size * 4  
-        hold_box_x = margin_x - hold_box_width - 10  
-        hold_box_y = margin_y + square_size * 0.5  
+        # Hold and next boxes sit level with the top half-cell margin, on either side of the grid
+        box_width = square_size * 5
+        box_height = square_size * 4
+        hold_box = pygame.Rect(margin_x - box_width - 10, int(margin_y + square_size * 0.5), box_width, box_height)
+        next_box = pygame.Rect(margin_x + grid_width + 10, int(margin_y + square_size * 0.5), box_width, box_height)
+
+        # Extended queue starts 2 squares below the next box. Its height is measured against the fixed GRID_HEIGHT, as before.
+        extended_box_y = next_box.y + box_height + square_size * 2
+        extended_margin_y = (height - self.GRID_HEIGHT) // 2
+        extended_box_height = self.GRID_HEIGHT - (next_box.y - extended_margin_y + box_height) - (square_size * 1.1)
+        extended_box = pygame.Rect(next_box.x, extended_box_y, box_width, int(extended_box_height))
+
+        # Fonts are the slowest thing to create, so they're built here and nowhere else
+        font = pygame.font.Font(None, 40)
+        clear_font = pygame.font.Font(None, 30)
+
+        # Stats box: below the hold box, extended by the clear text height plus one extra square
+        stats_box_y = margin_y + (square_size * 6.5)
+        stats_box_height = (margin_y + self.GRID_HEIGHT - stats_box_y) + clear_font.get_height() + (square_size * 0.5) + square_size
+        stats_box = pygame.Rect(margin_x - box_width - 10, int(stats_box_y), box_width, int(stats_box_height))
+
+        # Pre-rendered tiles: a locked/active mino is its color with a black outline, an empty cell is black with grid lines
+        tiles = {}
+        for piece_type, color in self.TETRIMINO_COLORS.items():
+            tile = pygame.Surface((square_size, square_size))
+            tile.fill(color)
+            pygame.draw.rect(tile, self.GRID_LINES if piece_type == "X" else self.BLACK, tile.get_rect(), 1)
+            tiles[piece_type] = tile
+
+        # Ghost tiles are hollow outlines, blitted over the empty-cell tile
+        ghost_tiles = {}
+        for piece_type, color in self.TETRIMINO_COLORS.items():
+            ghost = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
+            pygame.draw.rect(ghost, color, ghost.get_rect(), 2)
+            ghost_tiles[piece_type] = ghost
+
+        self.render_cache = {
+            "size": (width, height),
+            "square_size": square_size,
+            "margin_x": margin_x,
+            "margin_y": margin_y,
+            "grid_width": grid_width,
+            "grid_height": grid_height,
+            "hold_box": hold_box,
+            "next_box": next_box,
+            "extended_box": extended_box,
+            "stats_box": stats_box,
+            "font": font,
+            "clear_font": clear_font,
+            "button_font": pygame.font.Font(None, 36),
+            "hold_text": font.render("HOLD", True, (255, 255, 255)),
+            "hold_text_locked": font.render("HOLD", True, (255, 150, 150)),  # Red while hold is locked
+            "next_text": font.render("NEXT", True, (255, 255, 255)),
+            "stat_labels": [font.render(label, True, (255, 255, 255)) for label in ("TIME:", "SCORE:", "LINES:", "PIECES:")],
+            "tiles": tiles,
+            "ghost_tiles": ghost_tiles,
+        }
+        self.full_redraw = True
+
+        return self.render_cache
+
+    def cell_position(self, row, col):
+        """Screen position of a grid cell. Rows are shifted by 3.5 to hide the top 4 rows and leave half-cell margins."""
+        cache = self.render_cache
+        return (cache["margin_x"] + col * cache["square_size"], int(cache["margin_y"] + (row - 3.5) * cache["square_size"]))
+
+    def draw_piece_preview(self, piece_type, box_x, box_y, box_width, box_height):
+        """Draws a piece in its spawn orientation, centered in the given box."""
+        square_size = self.render_cache["square_size"]
+        tile = self.render_cache["tiles"][piece_type]
+        piece_shape = self.TETRIMINO_SHAPES[piece_type][0]
+
+        min_x = min(c for r, c in piece_shape)
+        min_y = min(r for r, c in piece_shape)
+        max_x = max(c for r, c in piece_shape)
+        max_y = max(r for r, c in piece_shape)
+
+        piece_width = (max_x - min_x + 1) * square_size
+        piece_height = (max_y - min_y + 1) * square_size
+
+        offset_x = box_x + (box_width - piece_width) // 2
+        offset_y = box_y + (box_height - piece_height) / 2
+
+        for r, c in piece_shape:
+            self.screen.blit(tile, (offset_x + (c - min_x) * square_size, int(offset_y + (r - min_y) * square_size)))
+
+        return offset_y, piece_height
+
+    def draw_hold_box(self):
+        """Draws the hold box aligned with the top half-cell margin, with the HOLD label one square below it."""
+        cache = self.render_cache
+        hold_box = cache["hold_box"]
 
         # Draw hold box
-        pygame.draw.rect(self.screen, self.BLACK, (hold_box_x, hold_box_y, hold_box_width, hold_box_height))
-        pygame.draw.rect(self.screen, self.GRID_LINES, (hold_box_x, hold_box_y, hold_box_width, hold_box_height), 2)
+        pygame.draw.rect(self.screen, self.BLACK, hold_box)
+        pygame.draw.rect(self.screen, self.GRID_LINES, hold_box, 2)
 
         # Draw the held piece
         if self.held_piece:
-            piece_shape = self.TETRIMINO_SHAPES[self.held_piece][0]
-            piece_color = self.TETRIMINO_COLORS[self.held_piece]
-
-            min_x = min(c for r, c in piece_shape)
-            min_y = min(r for r, c in piece_shape)
-            max_x = max(c for r, c in piece_shape)
-            max_y = max(r for r, c in piece_shape)
-
-            piece_width = (max_x - min_x + 1) * square_size
-            piece_height = (max_y - min_y + 1) * square_size
-
-            # Center the piece in the hold box
-            offset_x = hold_box_x + (hold_box_width - piece_width) // 2
-            offset_y = hold_box_y + (hold_box_height - piece_height) // 2
-
-            for r, c in piece_shape:
-                piece_rect = pygame.Rect(
-                    offset_x + (c - min_x) * square_size,
-                    offset_y + (r - min_y) * square_size,
-                    square_size, square_size
-                )
-                pygame.draw.rect(self.screen, piece_color, piece_rect)
-                pygame.draw.rect(self.screen, self.BLACK, piece_rect, 1)
-
-        # **Ensure the "HOLD" text is the same distance from the box as "NEXT" text**
-        font = pygame.font.Font(None, 40)
-        text = font.render("HOLD", True, hold_text_color)
+            self.draw_piece_preview(self.held_piece, *hold_box)
 
-        # **Align text exactly one self.grid square below the hold box (same as NEXT)**
-        text_y = hold_box_y + hold_box_height + square_size  # Matches `self.draw_next_box()`
-        text_rect = text.get_rect(center=(hold_box_x + hold_box_width // 2, text_y))
+        # Sets color of text to red if hold is currently locked.
+        text = cache["hold_text_locked"] if self.hold_used else cache["hold_text"]
+        text_rect = text.get_rect(center=(hold_box.centerx, hold_box.bottom + cache["square_size"]))
+        self.screen.fill(self.OUTSIDE_BACKGROUND, text_rect)  # Text is redrawn in place, so clear behind it first
         self.screen.blit(text, text_rect)
 
+        return hold_box.union(text_rect)
+
     def draw_next_box(self):
         """Draws the next piece box aligned with the top half-cell margin, mirrored on the right side,
-        and positions the 'NEXT' text correctly between the two next queues with a 2-self.grid-square margin.
-        Adds a horizontal separator if `self.bag_piece_count == 7` or `self.bag_piece_count == 0`."""
-
-        width, height = self.screen.get_size()
-
-        # Calculate square size dynamically
-        square_size = min(width // self.COLS, height // (self.VISIBLE_ROWS + 1))  # +1 for margin
-        grid_width = square_size * self.COLS
-        grid_height = square_size * (self.VISIBLE_ROWS + 1)  # Include margin
-
-        # Centering self.grid in the window
-        margin_x = (width - grid_width) // 2
-        margin_y = (height - grid_height) // 2
-
-        # Next box position: mirrored to the right
-        next_box_width = square_size * 5  # Same width as hold box
-        next_box_height = square_size * 4  # Same height as hold box
-        next_box_x = margin_x + grid_width + 10  # Right side of self.grid
-        next_box_y = margin_y + square_size * 0.5  # Align with top half-cell margin
+        with the 'NEXT' text one square below it.
+        Adds a horizontal separator if `self.bag_piece_count == 7` or `self.bag_piece_count == 6`."""
+        cache = self.render_cache
+        square_size = cache["square_size"]
+        next_box = cache["next_box"]
 
         # Draw next box background
-        pygame.draw.rect(self.screen, self.BLACK, (next_box_x, next_box_y, next_box_width, next_box_height))
-        pygame.draw.rect(self.screen, self.GRID_LINES, (next_box_x, next_box_y, next_box_width, next_box_height), 2)
+        pygame.draw.rect(self.screen, self.BLACK, next_box)
+        pygame.draw.rect(self.screen, self.GRID_LINES, next_box, 2)
 
         # **Draw the next piece**
         if self.next_queue:
-            piece_type = self.next_queue[0]  # Extract only the piece type
-            piece_shape = self.TETRIMINO_SHAPES[piece_type][0]
-            piece_color = self.TETRIMINO_COLORS[piece_type]
-
-            # Find min/max positions of the piece
-            min_x = min(c for r, c in piece_shape)
-            min_y = min(r for r, c in piece_shape)
-            max_x = max(c for r, c in piece_shape)
-            max_y = max(r for r, c in piece_shape)
-
-            piece_width = (max_x - min_x + 1) * square_size
-            piece_height = (max_y - min_y + 1) * square_size
-
-            # Center the piece in the next box
-            offset_x = next_box_x + (next_box_width - piece_width) // 2
-            offset_y = next_box_y + (next_box_height - piece_height) // 2
-
-            for r, c in piece_shape:
-                piece_rect = pygame.Rect(
-                    offset_x + (c - min_x) * square_size,
-                    offset_y + (r - min_y) * square_size,
-                    square_size, square_size
-                )
-                pygame.draw.rect(self.screen, piece_color, piece_rect)
-                pygame.draw.rect(self.screen, self.BLACK, piece_rect, 1)
-
-        # **Draw horizontal separator line if `self.bag_piece_count == 7` or `self.bag_piece_count == 0`**
+            self.draw_piece_preview(self.next_queue[0], *next_box)
+
+        # **Draw horizontal separator line if `self.bag_piece_count == 7` or `self.bag_piece_count == 6`**
         if self.bag_piece_count == 6:
-            separator_y = next_box_y + next_box_height - (square_size * 0.35)  # 0.35 cells above bottom edge
-            pygame.draw.line(self.screen, self.OUTSIDE_BACKGROUND, 
-                            (next_box_x + 2, separator_y), 
-                            (next_box_x + next_box_width - 2, separator_y), 2)
+            separator_y = next_box.bottom - (square_size * 0.35)  # 0.35 cells above bottom edge
+            pygame.draw.line(self.screen, self.OUTSIDE_BACKGROUND, (next_box.x + 2, separator_y), (next_box.right - 2, separator_y), 2)
 
         elif self.bag_piece_count == 7:
-            separator_y = next_box_y + (square_size * 0.35)  # 0.35 cells below top edge
-            pygame.draw.line(self.screen, self.OUTSIDE_BACKGROUND, 
-                            (next_box_x + 2, separator_y), 
-                            (next_box_x + next_box_width - 2, separator_y), 2)
+            separator_y = next_box.y + (square_size * 0.35)  # 0.35 cells below top edge
+            pygame.draw.line(self.screen, self.OUTSIDE_BACKGROUND, (next_box.x + 2, separator_y), (next_box.right - 2, separator_y), 2)
 
-        # **Ensure "NEXT" text is positioned exactly in the middle of the 2-square gap**
-        font = pygame.font.Font(None, 40)
-        text = font.render("NEXT", True, (255, 255, 255))
-        
         # **Position the text exactly one self.grid square below the next box**
-        text_y = next_box_y + next_box_height + square_size  # One square below next box
-        text_rect = text.get_rect(center=(next_box_x + next_box_width // 2, text_y))
-        self.screen.blit(text, text_rect)
+        text_rect = cache["next_text"].get_rect(center=(next_box.centerx, next_box.bottom + square_size))
+        self.screen.fill(self.OUTSIDE_BACKGROUND, text_rect)  # Antialiased text blitted over itself would thicken
+        self.screen.blit(cache["next_text"], text_rect)
 
-        # **Return required values for extended queue alignment**
-        return next_box_y, next_box_height
+        return next_box.union(text_rect)
 
-    def draw_extended_next_queue(self, next_box_y, next_box_height):
+    def draw_extended_next_queue(self):
         """Draws a box below the next piece box displaying the next four upcoming pieces,
-        ensuring it starts two self.grid squares below the next box and ends half a square from the bottom.
+        starting two self.grid squares below the next box and ending just above the bottom margin.
         Draws a horizontal separator line based on `self.bag_piece_count` conditions."""
-
-        width, height = self.screen.get_size()
-
-        # Calculate square size dynamically
-        square_size = min(width // self.COLS, height // (self.VISIBLE_ROWS + 1))
-        grid_width = square_size * self.COLS
-        grid_height = square_size * (self.VISIBLE_ROWS + 1)
-
-        # Centering the self.grid
-        margin_x = (width - grid_width) // 2
-
-        # **Position the extended queue exactly 2 self.grid squares below the next box**
-        extended_box_x = margin_x + grid_width + 10  # Right side of self.grid
-        extended_box_y = next_box_y + next_box_height + (square_size * 2)
-
-        # **Adjust the height to align the bottom with half a square from the bottom of the self.screen**
-        margin_y = (height - self.GRID_HEIGHT) // 2  # Center the self.grid vertically
-        extended_box_height = self.GRID_HEIGHT - (next_box_y - margin_y + next_box_height) - (square_size * 1.1)
-
-
-        # Extended queue width remains the same as the next box
-        extended_box_width = square_size * 5  
+        cache = self.render_cache
+        square_size = cache["square_size"]
+        extended_box = cache["extended_box"]
 
         # Draw extended queue background
-        pygame.draw.rect(self.screen, self.BLACK, (extended_box_x, extended_box_y, extended_box_width, extended_box_height))
-        pygame.draw.rect(self.screen, self.GRID_LINES, (extended_box_x, extended_box_y, extended_box_width, extended_box_height), 2)
+        pygame.draw.rect(self.screen, self.BLACK, extended_box)
+        pygame.draw.rect(self.screen, self.GRID_LINES, extended_box, 2)
 
         # **Determine vertical spacing for pieces**
         num_pieces = min(4, len(self.next_queue) - 1)  # Ensure up to 4 pieces are displayed
         if num_pieces > 0:
-            piece_spacing = extended_box_height / num_pieces  # Distribute pieces evenly
+            piece_spacing = extended_box.height / num_pieces  # Distribute pieces evenly
 
         # **Determine where to place the separator line**
         separator_index = None
@@ -1821,89 +1237,36 @@ class TetrisGame:
         elif self.bag_piece_count == 2:
             extra_separator_position = "bottom"  # Line near the bottom edge
 
-        # **Draw next four pieces in order**
+        # **Draw next four pieces in order**, each centered in an even share of the box
         for i, piece_type in enumerate(self.next_queue[1:num_pieces+1]):  # Skip first element (it's in next box)
-            piece_shape = self.TETRIMINO_SHAPES[piece_type][0]
-            piece_color = self.TETRIMINO_COLORS[piece_type]
-
-            # Find min/max positions of the piece
-            min_x = min(c for r, c in piece_shape)
-            min_y = min(r for r, c in piece_shape)
-            max_x = max(c for r, c in piece_shape)
-            max_y = max(r for r, c in piece_shape)
-
-            piece_width = (max_x - min_x + 1) * square_size
-            piece_height = (max_y - min_y + 1) * square_size
-
-            # Positioning: Evenly distribute pieces vertically
-            offset_x = extended_box_x + (extended_box_width - piece_width) // 2
-            offset_y = extended_box_y + (i * piece_spacing) + (piece_spacing - piece_height) / 2  # Center each piece
-
-            # **Draw the piece**
-            for r, c in piece_shape:
-                piece_rect = pygame.Rect(
-                    offset_x + (c - min_x) * square_size,
-                    offset_y + (r - min_y) * square_size,
-                    square_size, square_size
-                )
-                pygame.draw.rect(self.screen, piece_color, piece_rect)
-                pygame.draw.rect(self.screen, self.BLACK, piece_rect, 1)
+            offset_y, piece_height = self.draw_piece_preview(piece_type, extended_box.x, extended_box.y + i * piece_spacing, extended_box.width, piece_spacing)
 
             # **Draw separator line in the correct position**
             if separator_index is not None and i == separator_index:
                 separator_y = offset_y + piece_height + (piece_spacing - piece_height) / 2  # Center between pieces
-                pygame.draw.line(self.screen, self.OUTSIDE_BACKGROUND, 
-                                (extended_box_x + 2, separator_y), 
-                                (extended_box_x + extended_box_width - 2, separator_y), 2)
+                pygame.draw.line(self.screen, self.OUTSIDE_BACKGROUND, (extended_box.x + 2, separator_y), (extended_box.right - 2, separator_y), 2)
 
         # **Extra separators for self.bag_piece_count == 6 or 2**
         if extra_separator_position == "top":
-            separator_y = extended_box_y + (square_size * 0.35)  # 0.35 self.grid cells from the top
-            pygame.draw.line(self.screen, self.OUTSIDE_BACKGROUND, 
-                            (extended_box_x + 2, separator_y), 
-                            (extended_box_x + extended_box_width - 2, separator_y), 2)
+            separator_y = extended_box.y + (square_size * 0.35)  # 0.35 self.grid cells from the top
+            pygame.draw.line(self.screen, self.OUTSIDE_BACKGROUND, (extended_box.x + 2, separator_y), (extended_box.right - 2, separator_y), 2)
 
         elif extra_separator_position == "bottom":
-            separator_y = extended_box_y + extended_box_height - (square_size * 0.35)  # 0.35 self.grid cells from the bottom
-            pygame.draw.line(self.screen, self.OUTSIDE_BACKGROUND, 
-                            (extended_box_x + 2, separator_y), 
-                            (extended_box_x + extended_box_width - 2, separator_y), 2)
+            separator_y = extended_box.bottom - (square_size * 0.35)  # 0.35 self.grid cells from the bottom
+            pygame.draw.line(self.screen, self.OUTSIDE_BACKGROUND, (extended_box.x + 2, separator_y), (extended_box.right - 2, separator_y), 2)
+
+        return extended_box
 
     def draw_stats_box(self):
         """Draws a single unified box containing TIME, SCORE, LINES, PIECES, and an additional clear text message."""
-
-        remaining_time = None # Initialize
-
-        width, height = self.screen.get_size()
-
-        # Calculate square size dynamically
-        square_size = min(width // self.COLS, height // (self.VISIBLE_ROWS + 1))
-        grid_width = square_size * self.COLS
-        grid_height = square_size * (self.VISIBLE_ROWS + 1)
-
-        # Centering the self.grid
-        margin_x = (width - grid_width) // 2
-        margin_y = (height - grid_height) // 2
-
-        # **Base stats box dimensions**
-        extended_box_bottom = margin_y + self.GRID_HEIGHT
-        stats_box_y = margin_y + (square_size * 6.5)  # Start below hold box
-        stats_box_x = margin_x - (square_size * 5) - 10  # Left side of self.grid
-        stats_box_width = square_size * 5  # Matches extended next queue width
-        stats_box_height = extended_box_bottom - stats_box_y  # Default bottom alignment
-
-        # **Calculate additional height for self.clear_text**
-        font = pygame.font.Font(None, 40)
-        clear_font = pygame.font.Font(None, 30)
-        clear_text_render = clear_font.render(self.clear_text, True, self.clear_text_color)
-        clear_text_height = clear_text_render.get_height() + (square_size * 0.5)  # Extra padding
-
-        # **Extend stats box height for self.clear_text + one extra self.grid square**
-        stats_box_height += clear_text_height + square_size  # <--- Extra square added here
+        cache = self.render_cache
+        square_size = cache["square_size"]
+        stats_box = cache["stats_box"]
+        font = cache["font"]
 
         # **Draw extended stats box**
-        pygame.draw.rect(self.screen, self.BLACK, (stats_box_x, stats_box_y, stats_box_width, stats_box_height))
-        pygame.draw.rect(self.screen, self.GRID_LINES, (stats_box_x, stats_box_y, stats_box_width, stats_box_height), 2)
+        pygame.draw.rect(self.screen, self.BLACK, stats_box)
+        pygame.draw.rect(self.screen, self.GRID_LINES, stats_box, 2)
 
         # Calculate elapsed time in MM:SS.M format based on gamemode:
         if self.game_mode == "Blitz":
@@ -1919,127 +1282,105 @@ class TetrisGame:
             minutes = int(elapsed_time // 60)
             seconds = int(elapsed_time % 60)
             milliseconds = int((elapsed_time % 1) * 10)  # Correctly scale to 0-9 range
-        """ if remaining_time == 0:
-            self.game_over_condition = "Time's Up!"
-            self.game_over = True
-            self.game_over_screen() """
-
 
         # Format as MM:SS.M (single-digit milliseconds)
         time_display = f"{minutes:02}:{seconds:02}.{milliseconds}"
 
         # Divide the box into evenly spaced sections
-        labels = ["TIME:", "SCORE:", "LINES:", "PIECES:"]
         values = [time_display, self.score, self.lines_cleared, self.total_pieces_placed]
-        section_height = stats_box_height / 5  # Now divided into five sections (including self.clear_text space)
+        section_height = stats_box.height / 5  # Divided into five sections (including self.clear_text space)
 
-        for i, (label, value) in enumerate(zip(labels, values)):
-            section_y = stats_box_y + (i * section_height)
+        for i, (label_render, value) in enumerate(zip(cache["stat_labels"], values)):
+            section_y = stats_box.y + (i * section_height)
 
-            # Render text
-            label_render = font.render(label, True, (255, 255, 255))
+            # Labels are pre-rendered; only the values change
             value_render = font.render(str(value), True, (255, 255, 255))
 
             # Center text within its section
-            label_rect = label_render.get_rect(center=(stats_box_x + stats_box_width // 2, section_y + square_size * 0.75))
-            value_rect = value_render.get_rect(center=(stats_box_x + stats_box_width // 2, section_y + square_size * 2))
+            label_rect = label_render.get_rect(center=(stats_box.centerx, section_y + square_size * 0.75))
+            value_rect = value_render.get_rect(center=(stats_box.centerx, section_y + square_size * 2))
 
             # Draw text
             self.screen.blit(label_render, label_rect)
             self.screen.blit(value_render, value_rect)
 
         # **Draw horizontal line below "PIECES"**
-        line_y = stats_box_y + (section_height * 4.1)  # Positioned just below "PIECES"
-        pygame.draw.line(self.screen, (255, 255, 255), (stats_box_x + 5, line_y), (stats_box_x + stats_box_width - 5, line_y), 2)
+        line_y = stats_box.y + (section_height * 4.1)  # Positioned just below "PIECES"
+        pygame.draw.line(self.screen, (255, 255, 255), (stats_box.x + 5, line_y), (stats_box.right - 5, line_y), 2)
 
         # **Render and draw self.clear_text below the line**
-        clear_text_rect = clear_text_render.get_rect(center=(stats_box_x + stats_box_width // 2, line_y + square_size * 1.5))
+        clear_text_render = cache["clear_font"].render(self.clear_text, True, self.clear_text_color)
+        clear_text_rect = clear_text_render.get_rect(center=(stats_box.centerx, line_y + square_size * 1.5))
         self.screen.blit(clear_text_render, clear_text_rect)
 
-    def draw_grid(self):
-        """Draws only the visible part of the Tetris self.grid, with a half-cell-high margin at the top and bottom,
-        and colors those margins with self.OUTSIDE_BACKGROUND."""
-        width, height = self.screen.get_size()
-
-        # Calculate square size dynamically
-        square_size = min(width // self.COLS, height // (self.VISIBLE_ROWS + 1))  # +1 ensures space for half-cell margins
-        grid_width = square_size * self.COLS
-        grid_height = square_size * (self.VISIBLE_ROWS + 1)  # Expanded to include margins
+        return stats_box
 
-        # Center the self.grid in the window
-        margin_x = (width - grid_width) // 2
-        margin_y = (height - grid_height) // 2
-
-        # Fill entire self.screen with self.OUTSIDE_BACKGROUND
-        self.screen.fill(self.OUTSIDE_BACKGROUND)
-
-        # Draw extra half-cell margins at the top and bottom
-        top_margin_rect = pygame.Rect(margin_x, margin_y, grid_width, square_size * 0.5)
-        bottom_margin_rect = pygame.Rect(margin_x, margin_y + grid_height - square_size * 0.5, grid_width, square_size * 0.5)
-
-        pygame.draw.rect(self.screen, self.OUTSIDE_BACKGROUND, top_margin_rect)
-        pygame.draw.rect(self.screen, self.OUTSIDE_BACKGROUND, bottom_margin_rect)
-
-        # Draw self.grid background (only inside the main play area)
-        pygame.draw.rect(self.screen, self.BLACK, (margin_x, margin_y + square_size * 0.5, grid_width, grid_height - square_size))
-
-        # Get ghost piece position
-        ghost_piece = self.get_ghost_piece()
-        ghost_color = self.TETRIMINO_COLORS[self.current_piece_type]
-
-        # Shift row rendering by exactly 3.5 rows to create the half-cell margins
-        for row in range(4, self.ROWS):  # Start from row 4 (hide first 4 rows)
-            for col in range(self.COLS):
-                cell_value = self.grid[row, col]
-                color = self.TETRIMINO_COLORS[cell_value] if cell_value in self.TETRIMINO_COLORS else self.BLACK
-
-                # Correctly align each cell to create a half-cell margin
-                adjusted_row = row - 3.5  # Shifts everything down by half a cell
-                cell_rect = pygame.Rect(
-                    margin_x + col * square_size,
-                    margin_y + adjusted_row * square_size,
-                    square_size,
-                    square_size
-                )
-
-                pygame.draw.rect(self.screen, color, cell_rect)
-                if cell_value != "X":
-                    pygame.draw.rect(self.screen, self.BLACK, cell_rect, 1)
-                else:
-                    pygame.draw.rect(self.screen, self.GRID_LINES, cell_rect, 1)
-
-        # Draw ghost piece (hollow outline)
+    def draw_grid(self):
+        """Draws the visible part of the Tetris self.grid with half-cell margins, plus the side boxes.
+        Only what changed since the last frame is redrawn: rows changed by a lock, the cells under the old and new
+        active/ghost piece, the hold and queue boxes when they change, and the stats box. Changed regions are collected
+        in self.dirty_rects for present_frame(). Nothing is flipped here."""
+        cache = self.get_render_cache()
+        square_size = cache["square_size"]
+        tiles = cache["tiles"]
+
+        visible_grid = self.grid[4:]  # Hide the first 4 rows
+        side_state = (self.held_piece, self.hold_used, tuple(self.next_queue[:5]), self.bag_piece_count)
+
+        # Get ghost piece and active piece cells in the visible area
+        ghost_piece = [(r, c) for r, c in self.get_ghost_piece() if 4 <= r < self.ROWS]
+        active_piece = [(r, c) for r, c in self.current_piece if 4 <= r < self.ROWS]
+
+        if self.full_redraw or self.drawn_grid is None:
+            # Fill entire self.screen with self.OUTSIDE_BACKGROUND, then every cell and every box
+            self.screen.fill(self.OUTSIDE_BACKGROUND)
+            restore_cells = [(row, col) for row in range(4, self.ROWS) for col in range(self.COLS)]
+            self.dirty_rects = [self.screen.get_rect()]
+            self.drawn_side_state = None
+            self.full_redraw = False
+        else:
+            # Rows whose contents changed (locks, line clears) plus the cells the piece and ghost covered last frame
+            changed_rows = np.nonzero((visible_grid != self.drawn_grid).any(axis=1))[0] + 4
+            restore_cells = [(row, col) for row in changed_rows for col in range(self.COLS)] + self.drawn_overlay
+            for row in changed_rows:
+                x, y = self.cell_position(row, 0)
+                self.dirty_rects.append(pygame.Rect(x, y, cache["grid_width"], square_size))
+
+        # Repaint the board cells underneath, then the ghost and active piece on top
+        for r, c in restore_cells:
+            self.screen.blit(tiles[self.grid[r, c]], self.cell_position(r, c))
         for r, c in ghost_piece:
-            if 4 <= r < self.ROWS:  # Only draw ghost if in visible area
-                adjusted_row = r - 3.5
-                ghost_rect = pygame.Rect(
-                    margin_x + c * square_size,
-                    margin_y + adjusted_row * square_size,
-                    square_size,
-                    square_size
-                )
-                pygame.draw.rect(self.screen, ghost_color, ghost_rect, 2)
-
-        # Draw current falling piece
-        for r, c in self.current_piece:
-            if 4 <= r < self.ROWS:  # Only draw piece if in visible area
-                adjusted_row = r - 3.5
-                cell_rect = pygame.Rect(
-                    margin_x + c * square_size,
-                    margin_y + adjusted_row * square_size,
-                    square_size,
-                    square_size
-                )
-                pygame.draw.rect(self.screen, self.TETRIMINO_COLORS[self.current_piece_type], cell_rect)
-                pygame.draw.rect(self.screen, self.BLACK, cell_rect, 1)
-
-        self.draw_hold_box()
-        self.draw_next_box()
-        self.draw_stats_box()
-
-        next_box_y, next_box_height = self.draw_next_box()
-        self.draw_extended_next_queue(next_box_y, next_box_height)
-        pygame.display.flip()
+            self.screen.blit(cache["ghost_tiles"][self.current_piece_type], self.cell_position(r, c))
+        for r, c in active_piece:
+            self.screen.blit(tiles[self.current_piece_type], self.cell_position(r, c))
+
+        # The old and new piece/ghost cells are the only other parts of the board that changed
+        for r, c in set(self.drawn_overlay + ghost_piece + active_piece):
+            self.dirty_rects.append(pygame.Rect(self.cell_position(r, c), (square_size, square_size)))
+
+        self.drawn_grid = visible_grid.copy()
+        self.drawn_overlay = ghost_piece + active_piece
+
+        # Hold and queue boxes only change on spawn, hold and bag refills
+        if side_state != self.drawn_side_state:
+            self.dirty_rects.append(self.draw_hold_box())
+            self.dirty_rects.append(self.draw_next_box())
+            self.dirty_rects.append(self.draw_extended_next_queue())
+            self.drawn_side_state = side_state
+
+        # The timer changes every frame
+        self.dirty_rects.append(self.draw_stats_box())
+
+    def present_frame(self):
+        """Pushes the regions changed by draw_grid() to the display, or the whole window when nothing was tracked."""
+        if not self.dirty_rects:
+            pygame.display.flip()
+            return
+
+        # A subsurface screen (e.g. one tile of a shared window) reports rects in its own coordinates
+        offset_x, offset_y = self.screen.get_abs_offset()
+        pygame.display.update([rect.move(offset_x, offset_y) for rect in self.dirty_rects])
+        self.dirty_rects = []
 
     def draw_button(self, x, y, width, height, text, action=None, mode=None):
         """Draws a button and handles clicks."""
@@ -2056,8 +1397,7 @@ class TetrisGame:
                     action()
 
         pygame.draw.rect(self.screen, button_color, (x, y, width, height))
-        font = pygame.font.Font(None, 36)
-        text_surf = font.render(text, True, self.BLACK)
+        text_surf = self.get_render_cache()["button_font"].render(text, True, self.BLACK)
         text_rect = text_surf.get_rect(center=(x + width // 2, y + height // 2))
         self.screen.blit(text_surf, text_rect)
 
@@ -2077,7 +1417,12 @@ class TetrisGame:
 
         return checkbox_rect  # <-- just return the rectangle for click detection
 
-    def reset_game_state(self):
+    def reset_game_state(self, seed = None):
+        """Resets the game for a new round. A fresh bag seed is drawn unless one is given."""
+
+        # Reseed the bag RNG so the new game can be replayed from its seed
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
 
         # Reset self.grid and movement states
         self.grid = np.full((self.ROWS, self.COLS), "X")
@@ -2096,6 +1441,8 @@ class TetrisGame:
         # Reset self.score and stats
         self.score = 0
         self.most_recent_score = 0
+        self.most_recent_T_spin = False
+        self.most_recent_clear = 0
         self.total_pieces_placed = 0
         self.b2b = False
         self.clear_combo = 0
@@ -2121,6 +1468,7 @@ class TetrisGame:
         if self.clear_text_timer is not None:
             self.clear_text_timer.cancel()
         self.clear_text_timer = None
+        self.full_redraw = True # The menu or game over screen was drawn over the board
 
         # Reset game over flags
         self.game_over = False
@@ -2132,7 +1480,11 @@ class TetrisGame:
             self.next_queue.append(self.primary_bag.pop(0))
 
         # Re-initialize current piece
-        self.current_piece_type, self.current_piece, self.current_rotation = self.spawn_piece()
+        self.spawn_piece()
+
+        # Start a new game in the replay file
+        if self.replay_writer is not None:
+            self.replay_writer.start_game(self)
 
 
     def clone(self):
@@ -2146,10 +1498,9 @@ class TetrisGame:
         new_game.total_pieces_placed = self.total_pieces_placed
         new_game.game_over = self.game_over
 
-        # Current piece info (deepcopy only for this field)
-        new_game.current_piece = copy.deepcopy(self.current_piece)
+        # Current piece info
         new_game.current_piece_type = self.current_piece_type
-        new_game.current_rotation = self.current_rotation
+        new_game.piece_rotation, new_game.piece_row, new_game.piece_col = self.piece_rotation, self.piece_row, self.piece_col
 
         # Held and upcoming pieces
         new_game.held_piece = self.held_piece
@@ -2157,6 +1508,10 @@ class TetrisGame:
         new_game.primary_bag = list(self.primary_bag) if isinstance(self.primary_bag, (list, tuple)) else self.primary_bag
         new_game.secondary_bag = list(self.secondary_bag) if isinstance(self.secondary_bag, (list, tuple)) else self.secondary_bag
 
+        # Bag RNG, so the clone draws the same future bags
+        new_game.seed = self.seed
+        new_game.rng.setstate(self.rng.getstate())
+
         # Score multipliers
         new_game.b2b = self.b2b
         new_game.clear_combo = self.clear_combo
@@ -2219,6 +1574,7 @@ class TetrisGame:
                         print("Advanced Controls:", self.advanced_controls)
 
             pygame.display.update()
+            self.clock.tick(self.MENU_FPS)  # The menu is static, so there's no reason to redraw it more often than this
 
 
     def game_over_screen(self):
@@ -2293,6 +1649,7 @@ class TetrisGame:
                     exit()
 
             pygame.display.flip()
+            self.clock.tick(self.MENU_FPS)
 
     def game_state_to_dict(self):
         padded_rows = 40
@@ -2326,20 +1683,26 @@ class TetrisGame:
         }
 
     def main(self):
+        """Interactive game loop. Logic runs on a fixed LOGIC_TICK timestep and is decoupled from rendering,
+        which is capped at FPS with one flip per frame. The loop sleeps between frames instead of spinning."""
         running = True
         self.start_time = time.time()
+        self.logic_time = pygame.time.get_ticks()
+        accumulator = 0  # Real time (ms) not yet simulated
 
         while running:
             if self.game_over:
                 self.game_over_screen()
 
-            self.handle_movement()  # Handle left/right, DAS, and ARR
-            self.handle_soft_drop()  # Handle soft drop, DAS, and ARR
-            self.handle_gravity() # Handle gravity
+            # Sleep until the next frame is due, then bank the real time that passed.
+            # The clamp keeps a long stall (window drag, breakpoint) from fast-forwarding gravity afterwards.
+            accumulator += min(self.clock.tick(self.FPS), 250)
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
+                elif event.type == pygame.VIDEORESIZE:
+                    self.render_cache = None  # Rebuild fonts, layout and tiles for the new size
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_a:
                         self.move_left_pressed = True
@@ -2364,9 +1727,19 @@ class TetrisGame:
                     elif event.key == pygame.K_s:
                         self.soft_drop_pressed = False
 
+            # Advance the logic in fixed steps, so DAS/ARR and gravity don't depend on the frame rate
+            while accumulator >= self.LOGIC_TICK and not self.game_over:
+                self.logic_time += self.LOGIC_TICK
+                accumulator -= self.LOGIC_TICK
+
+                self.handle_movement()  # Handle left/right, DAS, and ARR
+                self.handle_soft_drop()  # Handle soft drop, DAS, and ARR
+                self.handle_gravity() # Handle gravity
+
             self.draw_grid()
-            pygame.display.flip()
+            self.present_frame()
 
+        self.logic_time = None
         pygame.quit()
 
     def tick(self, dt):
@@ -2389,6 +1762,7 @@ class TetrisGame:
         if self.RENDER:
             pygame.event.pump()
             self.draw_grid()
+            self.present_frame()
             
 
     def game_step(self, action_index):
@@ -0,0 +1,53 @@
+from game_class import TetrisGame
+
+# Headless versions of what the envs do in step(), without rendering, prints or sleeps.
+# Used by the benchmarks and by evaluators that play many games per candidate.
+
+THINKER_ACTIONS = {"Hold": 7, "Left": 1, "Right": 2, "Ccw": 3, "Cw": 4, "SoftDrop": 5, "SonicDrop": 8}
+
+
+def apply_drop_key(game, key):
+    """Plays a (dx, rotation, hold) key from get_all_viable_hard_drops the same way the envs do, ending in a hard drop."""
+    dx, rotation, hold = key
+
+    if hold:
+        game.game_step(7)
+    for _ in range([0, "L", 2, "R"].index(rotation)):
+        game.game_step(3)
+    for _ in range(abs(dx)):
+        game.game_step(1 if dx < 0 else 2)
+    game.game_step(6)
+
+
+def apply_input_sequence(game, inputs):
+    """Plays a thinker or reachability input sequence ("Hold", "Left", "Cw", ...) and hard drops, as BlitzHeuristicEnv.step does."""
+    for action in inputs:
+        game.game_step(THINKER_ACTIONS[action])
+    game.game_step(6)
+
+
+def new_game(mode, seed = None, max_pieces = None, lines = None):
+    """Returns a reset headless game. For Blitz, `max_pieces` replaces the 360-piece budget; for Sprint, `lines`
+    replaces the 40-line goal."""
+    game = TetrisGame(render=False, game_mode=mode)
+    game.reset_game_state(seed=seed)
+    if mode == "Blitz" and max_pieces is not None:
+        game.total_pieces_placed = max_pieces
+    if mode == "Sprint" and lines is not None:
+        game.lines_cleared = lines  # Counts down to 0 in Sprint
+    return game
+
+
+def play_heuristic_game(weights, mode = "Sprint", seed = None, max_pieces = 1000, lines = None):
+    """Plays one game with the four-weight heuristic agent and returns the finished game."""
+    game = new_game(mode, seed, max_pieces, lines)
+
+    for _ in range(max_pieces):
+        _, drop_heuristics = game.get_all_viable_hard_drops(weights)
+        if not drop_heuristics:
+            break
+        apply_drop_key(game, max(drop_heuristics.items(), key=lambda x: x[1])[0])
+        if game.game_over:
+            break
+
+    return game
@@ -2,6 +2,8 @@ import torch
 import time
 from sprint_env import SprintHeuristicEnv
 from debug_env import DebugHeuristicEnv
+from replay import ReplayWriter
+from placement_export import PlacementExporter, board_features
 
 ## Article's heuristic weights
 # weights = torch.tensor([-0.510066, 0.760666, -0.35663, -0.184483], dtype=torch.float32)
@@ -16,12 +18,23 @@ num_games = 10
 mode = "Sprint"
 results = []
 
+# Every game is appended to this replay file (bag seed + placements, see replay.py). Set to None to disable.
+replay_path = "heuristic_test.rpl"
+replay_writer = ReplayWriter(replay_path) if replay_path else None
+
+# One row per placement is streamed to columnar shards here (see placement_export.py). Set to None to disable.
+export_dir = "placement_data"
+exporter = PlacementExporter(export_dir) if export_dir else None
+
 for game_index in range(num_games):
     if mode == "Sprint":
         env = SprintHeuristicEnv()
     elif mode == "Debug":
         env = DebugHeuristicEnv()
-    
+
+    if replay_writer is not None:
+        replay_writer.attach(env.game)
+
     obs = env.reset()
     total_reward = 0.0
 
@@ -38,9 +51,16 @@ for game_index in range(num_games):
 
         best_key = max(drop_heuristics.items(), key=lambda x: x[1])[0]
         # print(f"Selected Key {best_key}.")
+        if exporter is not None:
+            features = board_features(env.game)
+            score_before = env.game.score
+
         obs, reward, done, _ = env.step(best_key)
         total_reward += reward
 
+        if exporter is not None:
+            exporter.add_placement(env.game, game_index, step, features, best_key, drop_heuristics, env.game.score - score_before)
+
         if done:
             break
 
@@ -53,6 +73,11 @@ for game_index in range(num_games):
 
     time.sleep(2)
 
+if replay_writer is not None:
+    replay_writer.close()
+if exporter is not None:
+    exporter.close()
+
 # Display the results
 import pandas as pd
 df = pd.DataFrame(results)
@@ -0,0 +1,262 @@
+import os
+import json
+import numpy as np
+
+# Demonstrations for imitation pretraining of LinearMLP live in three files per dataset prefix:
+#   <prefix>.obs.f16     memory-mapped (num_candidates, obs_dim) float16 candidate observations
+#   <prefix>.dec.i64     memory-mapped (num_decisions, 3) int64 rows of (first candidate, candidate count, chosen index)
+#   <prefix>.json        sizes and capacities
+# Observations are 0/1 one-hots plus the constant 0.5 position placeholder, all exact in float16.
+
+OBS_DIM = 536
+
+
+class DemonstrationRecorder:
+    """Appends (candidate observations, chosen candidate) decisions to fixed-width memory-mapped files."""
+
+    def __init__(self, prefix, obs_dim = OBS_DIM, initial_candidates = 1 << 18, initial_decisions = 1 << 14):
+        self.prefix = prefix
+        self.obs_dim = obs_dim
+
+        # Continue an existing dataset if there is one
+        if os.path.exists(prefix + ".json"):
+            with open(prefix + ".json") as f:
+                meta = json.load(f)
+            if meta["obs_dim"] != obs_dim:
+                raise ValueError(f"{prefix} holds {meta['obs_dim']}-dim observations, not {obs_dim}")
+            self.num_candidates, self.num_decisions = meta["num_candidates"], meta["num_decisions"]
+            self.candidate_capacity, self.decision_capacity = meta["candidate_capacity"], meta["decision_capacity"]
+        else:
+            self.num_candidates = self.num_decisions = 0
+            self.candidate_capacity, self.decision_capacity = initial_candidates, initial_decisions
+            for path, size in ((prefix + ".obs.f16", initial_candidates * obs_dim * 2), (prefix + ".dec.i64", initial_decisions * 3 * 8)):
+                with open(path, "wb") as f:
+                    f.truncate(size)
+
+        self.open_maps()
+
+    def open_maps(self):
+        self.obs = np.memmap(self.prefix + ".obs.f16", dtype=np.float16, mode="r+", shape=(self.candidate_capacity, self.obs_dim))
+        self.decisions = np.memmap(self.prefix + ".dec.i64", dtype=np.int64, mode="r+", shape=(self.decision_capacity, 3))
+
+    def grow(self, path, new_size):
+        """Resizes a backing file after closing the maps; the caller reopens them over the larger file."""
+        self.obs.flush()
+        self.decisions.flush()
+        del self.obs, self.decisions
+        with open(path, "r+b") as f:
+            f.truncate(new_size)
+
+    def add_decision(self, observations, chosen_index):
+        """Stores every candidate observation of one decision and which one the expert picked."""
+        count = len(observations)
+
+        while self.num_candidates + count > self.candidate_capacity:
+            self.candidate_capacity *= 2
+            self.grow(self.prefix + ".obs.f16", self.candidate_capacity * self.obs_dim * 2)
+            self.open_maps()
+        if self.num_decisions + 1 > self.decision_capacity:
+            self.decision_capacity *= 2
+            self.grow(self.prefix + ".dec.i64", self.decision_capacity * 3 * 8)
+            self.open_maps()
+
+        self.obs[self.num_candidates:self.num_candidates + count] = observations
+        self.decisions[self.num_decisions] = (self.num_candidates, count, chosen_index)
+        self.num_candidates += count
+        self.num_decisions += 1
+
+    def flush(self):
+        self.obs.flush()
+        self.decisions.flush()
+        with open(self.prefix + ".json", "w") as f:
+            json.dump({
+                "obs_dim": self.obs_dim,
+                "num_candidates": self.num_candidates,
+                "num_decisions": self.num_decisions,
+                "candidate_capacity": self.candidate_capacity,
+                "decision_capacity": self.decision_capacity
+            }, f)
+
+    def close(self):
+        self.flush()
+
+
+class DemonstrationDataset:
+    """Read-only view of a recorded dataset. Nothing is loaded into RAM until a minibatch touches it."""
+
+    def __init__(self, prefix):
+        with open(prefix + ".json") as f:
+            meta = json.load(f)
+        self.obs_dim = meta["obs_dim"]
+        self.obs = np.memmap(prefix + ".obs.f16", dtype=np.float16, mode="r", shape=(meta["candidate_capacity"], self.obs_dim))
+        self.decisions = np.memmap(prefix + ".dec.i64", dtype=np.int64, mode="r", shape=(meta["decision_capacity"], 3))[:meta["num_decisions"]]
+
+    def __len__(self):
+        return len(self.decisions)
+
+    def minibatches(self, batch_size, rng = None):
+        """Yields one shuffled epoch of (observations (B, C, D) float32, mask (B, C) bool, chosen (B,) int64) batches.
+        C is the largest candidate count in the batch; shorter decisions are padded and masked out."""
+
+        rng = rng if rng is not None else np.random.default_rng()
+        order = rng.permutation(len(self))
+
+        for start in range(0, len(order), batch_size):
+            batch_rows = self.decisions[np.sort(order[start:start + batch_size])]  # Sorted reads keep page-cache access sequential
+            widest = int(batch_rows[:, 1].max())
+
+            observations = np.zeros((len(batch_rows), widest, self.obs_dim), dtype=np.float32)
+            mask = np.zeros((len(batch_rows), widest), dtype=bool)
+            for i, (first, count, _) in enumerate(batch_rows):
+                observations[i, :count] = self.obs[first:first + count]
+                mask[i, :count] = True
+
+            yield observations, mask, batch_rows[:, 2].copy()
+
+
+def heuristic_expert(weights):
+    """Expert that picks the best-scoring hard drop under the four-weight heuristic."""
+    def choose(game, drop_dict):
+        return max(game.get_candidates(weights), key=lambda candidate: candidate.score).key  # Scored without building grids
+    choose.close = lambda: None  # Nothing to release; see thinker_expert
+    return choose
+
+
+def thinker_expert(weights, thinker_dir = "tetris_thinker"):
+    """Expert that asks tetris_thinker, with the 44 heuristic `weights` being imitated, for a move and maps it onto the
+    matching hard-drop candidate. Placements the hard-drop enumeration can't express (tucks, spins) return None and
+    are skipped. Uses the in-process library when it's built, otherwise `cargo run --quiet` with the move read from
+    its stdout, so a failed run raises instead of leaving a stale selected_actions.json to be read.
+    Call the returned expert's close() when done: it frees the library's thinker, or puts back the thinker files the
+    cargo path wrote over."""
+    from contextlib import ExitStack
+    from thinker_io import weights_to_json, run_quiet_thinker, restored_files, thinker_files
+    from thinker_ffi import Thinker, library_available
+
+    action_indices = {"Hold": 7, "Left": 1, "Right": 2, "Ccw": 3, "Cw": 4, "SonicDrop": 8}
+
+    resources = ExitStack()
+    if library_available():
+        thinker = resources.enter_context(Thinker(weights))
+        think = lambda game: thinker.think(game)[0]
+    else:
+        resources.enter_context(restored_files(thinker_files(thinker_dir)))
+        weights_to_json(f"{thinker_dir}/weights.json", weights)  # Once; every move below reads it
+        think = lambda game: run_quiet_thinker(game.game_state_to_dict(), thinker_dir=thinker_dir)["best"]["inputs"]
+
+    def choose(game, drop_dict):
+        sequence = think(game)
+
+        # Play the sequence on a copy and compare the landed piece against each candidate grid
+        preview = game.clone()
+        preview.hold_used = False
+        for action in sequence:
+            preview.game_step(action_indices[action])
+        preview.sonic_drop()
+        landed = np.copy(game.grid)
+        for r, c in preview.current_piece:
+            if r >= 0:
+                landed[r, c] = preview.current_piece_type
+
+        for key, grid in drop_dict.items():
+            if np.array_equal(grid, landed):
+                return key
+        return None
+
+    choose.close = resources.close
+    return choose
+
+
+def record_demonstrations(prefix, expert, num_games, mode = "Sprint", max_steps = 1000, fallback_weights = (-0.510066, 0.760666, -0.35663, -0.184483)):
+    """Plays `num_games` headless games with `expert` and records every decision it makes.
+    Moves the expert can't map to a candidate are played with the fallback heuristic and not recorded."""
+    from tetris_env import TetrisEnv
+
+    env = TetrisEnv(mode=mode, render_env=False)
+    recorder = DemonstrationRecorder(prefix)
+    fallback = heuristic_expert(fallback_weights)
+
+    for game_index in range(num_games):
+        env.reset()
+
+        for step in range(max_steps):
+            drop_dict, _ = env.game.get_all_viable_hard_drops()
+            if not drop_dict:
+                break
+
+            key = expert(env.game, drop_dict)
+            if key is not None:
+                keys = list(drop_dict.keys())
+                recorder.add_decision(env.get_candidate_observations(drop_dict.values()), keys.index(key))
+            else:
+                key = fallback(env.game, drop_dict)
+
+            _, _, done, _ = env.step(key)
+            if done:
+                break
+
+        recorder.flush()
+        print(f"[RECORD] Game {game_index + 1}/{num_games}: {recorder.num_decisions} decisions stored.")
+
+    recorder.close()
+
+
+def pretrain_policy(dataset, epochs = 5, batch_size = 64, lr = 1e-3, seed = 0):
+    """Imitation-trains LinearMLP with a softmax over each decision's candidates.
+    Returns the flat weight vector in the layout LinearMLP.forward and SNES expect."""
+    import torch
+    from train_sprint import LinearMLP
+
+    torch.manual_seed(seed)
+    rng = np.random.default_rng(seed)
+    policy = LinearMLP(input_dim=dataset.obs_dim, hidden_dim=64, output_dim=1)
+    optimizer = torch.optim.Adam(policy.model.parameters(), lr=lr)
+
+    for epoch in range(epochs):
+        total_loss, correct, seen = 0.0, 0, 0
+
+        for observations, mask, chosen in dataset.minibatches(batch_size, rng):
+            observations = torch.from_numpy(observations)
+            mask = torch.from_numpy(mask)
+            chosen = torch.from_numpy(chosen)
+
+            scores = policy.model(observations).squeeze(-1).masked_fill(~mask, float("-inf"))  # (B, C)
+            loss = torch.nn.functional.cross_entropy(scores, chosen)
+
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+
+            total_loss += loss.item() * len(chosen)
+            correct += (scores.argmax(dim=1) == chosen).sum().item()
+            seen += len(chosen)
+
+        print(f"[PRETRAIN] Epoch {epoch + 1}/{epochs}: loss {total_loss / seen:.4f}, expert agreement {correct / seen:.3f}")
+
+    return torch.nn.utils.parameters_to_vector(policy.model.parameters()).detach()
+
+
+if __name__ == "__main__":
+    import torch
+
+    dataset_prefix = "sprint_demos"
+    expert_name = "heuristic"  # "heuristic" or "thinker"
+    expert_games = 50
+    # Trained heuristic weights from heuristic_test.py
+    expert_weights = [-1.6576130390167236, 0.7060774564743042, -1.2531158924102783, -0.38837742805480957]
+    thinker_weights_path = "default_cold_weights.json"  # Weights the "thinker" expert plays with
+    pretrained_path = "sprint_pretrained.pt"  # Point train_sprint.py's pretrained_weights_path here
+
+    if expert_name == "heuristic":
+        expert = heuristic_expert(expert_weights)
+    else:
+        from thinker_io import weights_from_json
+        expert = thinker_expert(weights_from_json(thinker_weights_path))
+    try:
+        record_demonstrations(dataset_prefix, expert, expert_games)
+    finally:
+        expert.close()
+
+    flat_weights = pretrain_policy(DemonstrationDataset(dataset_prefix))
+    torch.save(flat_weights, pretrained_path)
+    print(f"[DONE] Pretrained weights saved to {pretrained_path}")
@@ -0,0 +1,129 @@
+import os
+import glob
+import numpy as np
+
+from replay import PIECE_CODES, ROTATION_CODES, T_SPIN_CODES
+
+# Parquet is used when pyarrow is installed; otherwise shards fall back to compressed .npz files.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+MAX_ALTERNATIVES = 80  # Upper bound on hard-drop candidates per decision (both pieces, every rotation and column)
+
+
+def board_features(game):
+    """Returns the pre-move features of a placement decision. Call before the move is made."""
+
+    occupied = game.grid != "X"
+    first_filled = np.where(occupied.any(axis=0), occupied.argmax(axis=0), game.ROWS)
+    heights = game.ROWS - first_filled
+
+    return {
+        "piece": PIECE_CODES.index(game.current_piece_type),
+        "held_piece": PIECE_CODES.index(game.held_piece) if game.held_piece is not None else -1,
+        "aggregate_height": int(heights.sum()),
+        "max_height": int(heights.max()),
+        "holes": game.count_holes(),
+        "bumpiness": game.calculate_bumpiness(),
+        "complete_lines": game.check_complete_lines(),
+        "column_heights": heights.astype(np.int8),
+        "b2b_before": game.b2b,
+        "combo_before": game.clear_combo,
+    }
+
+
+class PlacementExporter:
+    """Streams one row per placement into column-oriented shards of at most `shard_rows` rows."""
+
+    def __init__(self, directory, shard_rows = 50000, prefix = "placements"):
+        self.directory = directory
+        self.shard_rows = shard_rows
+        self.prefix = f"{prefix}-{os.getpid()}"  # Workers can share a directory without clobbering each other's shards
+        self.shard_index = 0
+        self.columns = {}
+        self.num_rows = 0
+        os.makedirs(directory, exist_ok=True)
+
+        # Continue numbering after any shards this prefix already wrote
+        while os.path.exists(self.shard_path(self.shard_index, ".npz")) or os.path.exists(self.shard_path(self.shard_index, ".parquet")):
+            self.shard_index += 1
+
+    def shard_path(self, index, extension):
+        return os.path.join(self.directory, f"{self.prefix}-{index:05d}{extension}")
+
+    def add_placement(self, game, game_id, step, features, move, heuristics, score_delta):
+        """Buffers a row. `features` comes from board_features() before the move; `game` is the post-move state."""
+
+        dx, rotation, hold = move
+        scores = np.full(MAX_ALTERNATIVES, np.nan, dtype=np.float32)
+        alternative_scores = [float(score) for score in heuristics.values()][:MAX_ALTERNATIVES]  # Scores may be torch scalars
+        scores[:len(alternative_scores)] = alternative_scores
+
+        row = dict(features)
+        row.update({
+            "game_id": game_id,
+            "seed": game.seed,
+            "step": step,
+            "dx": dx,
+            "rotation": ROTATION_CODES.index(rotation),
+            "hold": hold,
+            "chosen_score": float(heuristics[move]),
+            "best_score": max(alternative_scores),
+            "num_alternatives": len(heuristics),
+            "alternative_scores": scores,
+            "lines": game.most_recent_clear,
+            "T_spin": T_SPIN_CODES.index(game.most_recent_T_spin),
+            "b2b": game.b2b,
+            "combo": game.clear_combo,
+            "score_delta": score_delta,
+        })
+
+        for name, value in row.items():
+            self.columns.setdefault(name, []).append(value)
+        self.num_rows += 1
+
+        if self.num_rows >= self.shard_rows:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered rows as one shard."""
+        if self.num_rows == 0:
+            return
+
+        arrays = {name: np.asarray(values) for name, values in self.columns.items()}
+
+        if pa is not None:
+            # 2D columns (column heights, alternative scores) become fixed-size list columns
+            table = pa.table({name: (pa.array(list(array)) if array.ndim > 1 else pa.array(array)) for name, array in arrays.items()})
+            pq.write_table(table, self.shard_path(self.shard_index, ".parquet"))
+        else:
+            np.savez_compressed(self.shard_path(self.shard_index, ".npz"), **arrays)
+
+        self.shard_index += 1
+        self.columns = {}
+        self.num_rows = 0
+
+    def close(self):
+        self.flush()
+
+
+def load_placement_columns(directory, columns = None):
+    """Loads the requested columns (all by default) from every shard in `directory`, concatenated."""
+
+    loaded = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.npz")) + glob.glob(os.path.join(directory, "*.parquet"))):
+        if path.endswith(".npz"):
+            with np.load(path) as shard:
+                names = columns if columns is not None else shard.files
+                for name in names:
+                    loaded.setdefault(name, []).append(shard[name])  # Members are only decompressed when accessed
+        else:
+            table = pq.read_table(path, columns=columns)
+            for name in table.column_names:
+                loaded.setdefault(name, []).append(np.array(table.column(name).to_pylist()))
+
+    return {name: np.concatenate(parts) for name, parts in loaded.items()}
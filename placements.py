@@ -0,0 +1,202 @@
+from collections import namedtuple
+from collections.abc import Mapping
+
+import numpy as np
+
+import srs
+
+# Pure placement enumeration. Everything here reads an immutable GameState (TetrisGame.snapshot()) and never touches
+# a live game, so search code and worker threads can enumerate from the same root at the same time.
+
+# What enumeration needs to know about a game. grid is a read-only copy of TetrisGame.grid; (rotation, row, col) is the
+# active piece's position as described in srs.py; next_queue is a tuple.
+GameState = namedtuple("GameState", ["grid", "piece_type", "rotation", "row", "col", "held_piece", "hold_used", "next_queue"])
+
+# One hard-drop placement: the piece that lands, its rotation index, and the four cells it lands on (rows may be
+# negative above the matrix).
+HardDrop = namedtuple("HardDrop", ["piece_type", "rotation", "cells"])
+
+# A scored placement, without the resulting grid. features are the four TetrisGame.evaluate_heuristics inputs,
+# (aggregate height, complete lines, holes, bumpiness), measured on the grid with the piece locked in but before any
+# lines are cleared; lines_cleared is how many rows this placement completes. materialize_grid builds the grid itself.
+Candidate = namedtuple("Candidate", ["key", "piece_type", "rotation", "cells", "lines_cleared", "features", "score"])
+
+# Placement keys are (dx, rotation, hold): optionally hold, press counter-clockwise once per step in KEY_ROTATIONS up to
+# `rotation`, shift dx columns, then hard drop. That is how the envs and headless_play.apply_drop_key play them back.
+KEY_ROTATIONS = [0, "L", 2, "R"]
+
+# Rotations worth enumerating per piece; the others land on the same cells as one of these
+DISTINCT_ROTATIONS = {
+    0: "IJLOSTZ",
+    "L": "IJLSTZ",  # No duplicate O-piece checks
+    2: "JLT",  # No duplicate I-/S-/Z-piece checks
+    "R": "JLT",  # These three have four distinct rotational states.
+}
+
+MAX_SHIFT_LEFT, MAX_SHIFT_RIGHT = 4, 5  # Spawn columns leave at most this much room on each side
+
+
+def placement_holds(placement):
+    """Whether a placement is played from the hold slot. Read from the placement itself, never from its piece type
+    (holding into a piece of the same type is still a hold): its `hold` field if it has one, else a leading "Hold" in
+    its inputs (reachability.Reachable) or key (evaluate_reachable's Candidates), else the hold of a drop key."""
+    hold = getattr(placement, "hold", None)
+    if hold is not None:
+        return bool(hold)
+    inputs = getattr(placement, "inputs", None)
+    if inputs is None:
+        if len(placement.key) == 3 and not isinstance(placement.key[0], str):
+            return bool(placement.key[2])  # (dx, rotation, hold)
+        inputs = placement.key
+    return tuple(inputs[:1]) == ("Hold",)
+
+
+def drop_row(occupied, piece, rotation, row, col):
+    """Row the reference cell ends up on after a hard drop."""
+    while srs.is_valid_position(occupied, srs.piece_cells(piece, rotation, row + 1, col)):
+        row += 1
+    return row
+
+
+def add_piece_drops(placements, occupied, piece, rotation, row, col, hold):
+    """Adds every hard drop of `piece` starting at (rotation, row, col) to `placements`."""
+
+    for label in KEY_ROTATIONS:
+        if piece in DISTINCT_ROTATIONS[label]:
+
+            # Shift left, then right, one column at a time until something blocks the piece. Like move_piece, this only
+            # checks where the piece goes, so a piece spawned into the stack can still slide out of it.
+            for direction, limit in ((-1, MAX_SHIFT_LEFT), (1, MAX_SHIFT_RIGHT)):
+                for distance in range(1, limit + 1):
+                    shifted_col = col + direction * distance
+                    if not srs.is_valid_position(occupied, srs.piece_cells(piece, rotation, row, shifted_col)):
+                        break
+                    landed_row = drop_row(occupied, piece, rotation, row, shifted_col)
+                    placements[(direction * distance, label, hold)] = HardDrop(piece, rotation, tuple(srs.piece_cells(piece, rotation, landed_row, shifted_col)))
+
+            # Drop in place, unless the piece is stuck where it is
+            if srs.is_valid_position(occupied, srs.piece_cells(piece, rotation, row, col)):
+                landed_row = drop_row(occupied, piece, rotation, row, col)
+                placements[(0, label, hold)] = HardDrop(piece, rotation, tuple(srs.piece_cells(piece, rotation, landed_row, col)))
+
+        # Rotate counter-clockwise for the next label. Rotations accumulate (with kicks), like repeated key presses;
+        # a rotation that fails leaves the piece where it is, as it would in the game.
+        rotated = srs.rotate(occupied, piece, rotation, row, col, "L")
+        if rotated is not None:
+            rotation, row, col, _ = rotated
+
+
+def enumerate_placements(state):
+    """Returns {(dx, rotation, hold): HardDrop} for every hard drop of the active piece and, when holding is allowed,
+    of the piece holding would bring in (the held piece, or the next piece if the hold is empty)."""
+
+    occupied = state.grid != "X"
+    placements = {}
+
+    add_piece_drops(placements, occupied, state.piece_type, state.rotation, state.row, state.col, False)
+
+    # Do the same for the hold piece, so long as it isn't the same piece type as the active piece
+    if not state.hold_used and state.held_piece != state.piece_type:
+        hold_piece = state.held_piece if state.held_piece is not None else state.next_queue[0]
+        add_piece_drops(placements, occupied, hold_piece, 0, *srs.SPAWN_POSITIONS[hold_piece], True)
+
+    return placements
+
+
+# === Lazy candidates ===
+# Scoring works on per-column bitmasks (bit r set when row r is filled) rather than on grid copies: a placement only
+# changes the columns it lands in, so each candidate costs a few integer operations instead of a 24x10 array.
+
+BoardProfile = namedtuple("BoardProfile", ["column_masks", "heights", "column_holes", "row_counts", "complete_lines"])
+
+ROW_BITS = 1 << np.arange(srs.ROWS, dtype=np.int64)
+
+
+def board_profile(grid):
+    """Per-column masks, heights and holes, plus per-row fill counts, of a piece-letter grid."""
+    occupied = grid != "X"
+    column_masks = [int(mask) for mask in (occupied * ROW_BITS[:, None]).sum(axis=0)]
+    heights, column_holes = [], []
+    for mask in column_masks:
+        height = srs.ROWS - ((mask & -mask).bit_length() - 1) if mask else 0  # Lowest set bit is the topmost filled row
+        heights.append(height)
+        column_holes.append(height - mask.bit_count())  # Empty cells below the top of the column
+    row_counts = [int(count) for count in occupied.sum(axis=1)]
+    return BoardProfile(column_masks, heights, column_holes, row_counts, row_counts.count(srs.COLS))
+
+
+def candidate_features(profile, cells):
+    """(aggregate height, complete lines, holes, bumpiness) of the profiled grid with `cells` filled, and how many
+    rows the cells complete. Cells above the matrix are ignored, as they are when a grid is materialized."""
+    heights = list(profile.heights)
+    changed_masks = {}
+    row_additions = {}
+    for r, c in cells:
+        if r >= 0:
+            changed_masks[c] = changed_masks.get(c, profile.column_masks[c]) | (1 << r)
+            row_additions[r] = row_additions.get(r, 0) + 1
+
+    holes = sum(profile.column_holes)
+    for c, mask in changed_masks.items():
+        heights[c] = srs.ROWS - ((mask & -mask).bit_length() - 1)
+        holes += heights[c] - mask.bit_count() - profile.column_holes[c]
+
+    lines_cleared = sum(1 for r, added in row_additions.items() if profile.row_counts[r] < srs.COLS <= profile.row_counts[r] + added)
+    bumpiness = sum(abs(heights[i] - heights[i + 1]) for i in range(srs.COLS - 1))
+    return (sum(heights), profile.complete_lines + lines_cleared, holes, bumpiness), lines_cleared
+
+
+def weighted_score(features, weights):
+    """a * aggregate height + b * complete lines + c * holes + d * bumpiness, or 0.0 without weights."""
+    if weights is None:
+        return 0.0
+    a, b, c, d = weights
+    agg_height, completed, holes, bumpiness = features
+    return a * agg_height + b * completed + c * holes + d * bumpiness
+
+
+def evaluate_candidates(state, weights = None):
+    """Enumerates the placements of `state` and scores each one with the four-heuristic weights (a, b, c, d), like
+    TetrisGame.evaluate_heuristics would on the resulting grid. Returns a list of Candidates in enumeration order;
+    score is 0.0 when weights is None."""
+    profile = board_profile(state.grid)
+    candidates = []
+
+    for key, drop in enumerate_placements(state).items():
+        features, lines_cleared = candidate_features(profile, drop.cells)
+        candidates.append(Candidate(key, drop.piece_type, drop.rotation, drop.cells, lines_cleared, features, weighted_score(features, weights)))
+
+    return candidates
+
+
+def materialize_grid(grid, candidate):
+    """The grid a candidate leaves behind: a writable copy of `grid` with the piece filled in and no lines cleared."""
+    grid_copy = np.copy(grid)
+    for r, c in candidate.cells:
+        if r >= 0:
+            grid_copy[r, c] = candidate.piece_type
+    return grid_copy
+
+
+class CandidateGrids(Mapping):
+    """Read-only {key: resulting grid} view over a candidate list. Grids are built the first time a key is looked up,
+    so consumers that only use the keys (or one chosen grid) never pay for the rest."""
+
+    def __init__(self, grid, candidates):
+        self.grid = grid
+        self.candidates = {candidate.key: candidate for candidate in candidates}
+        self.grids = {}
+
+    def __getitem__(self, key):
+        if key not in self.grids:
+            self.grids[key] = materialize_grid(self.grid, self.candidates[key])
+        return self.grids[key]
+
+    def __iter__(self):
+        return iter(self.candidates)
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def __contains__(self, key):
+        return key in self.candidates
@@ -5,40 +5,12 @@ from gym import spaces
 from game_class import TetrisGame
 import json
 import subprocess
+from thinker_io import write_compact_field_json, unpack_game_actions
+from frame_capture import FrameRecorder
 
-def write_compact_field_json(filename, game_state):
-    # Manually extract and format the 'field' array
-    field = game_state.pop("field")  # Temporarily remove it from the dict
-
-    # Serialize the field with compact row formatting
-    field_str = '  "field": [\n'
-    for i, row in enumerate(field):
-        row_str = "    " + json.dumps(row)
-        if i != len(field) - 1:
-            row_str += ","
-        field_str += row_str + "\n"
-    field_str += "  ],"  # <--- Add comma here to separate from next key
-
-    # Serialize the rest of the dictionary as normal
-    partial_json = json.dumps(game_state, indent=2)
-
-    # Insert field block after the opening brace
-    lines = partial_json.splitlines()
-    lines.insert(1, field_str)
-    final_json = "\n".join(lines)
-
-    # Write to file
-    with open(filename, "w") as f:
-        f.write(final_json)
-
-def unpack_game_actions(filename):
-    with open(filename, "r") as f:
-        return json.load(f)
-
-
-def run_playtest():
+def run_playtest(render = True, recorder = None):
     # Initialize Game
-    game = TetrisGame(render=True, game_mode="Blitz")
+    game = TetrisGame(render=render, game_mode="Blitz")
     game.reset_game_state()
 
 
@@ -76,10 +48,16 @@ def run_playtest():
                     game.game_step(4)
                 case "SonicDrop":
                     game.game_step(8)
+
+            # Frames are only drawn when recording, once per input
+            if recorder is not None:
+                recorder.capture(game)
         
         time.sleep(0)
         
         game.game_step(6) # Always Hard Drop at the end of a sequence.
+        if recorder is not None:
+            recorder.capture(game)
 
         # time.sleep(1)
 
@@ -91,5 +69,16 @@ def run_playtest():
     with open("tetris_thinker/input.json", 'w') as file:
         pass  # Do nothing, just open and close the file to clear it
 
+# Playtest options
+render_window = True # Show the game window. Recording works with or without it.
+record_video = False # Record a frame after every input (see frame_capture.py).
+video_path = "playtest_frames.npz"
+
+recorder = FrameRecorder(video_path) if record_video else None
+
 for i in range(10):
-    run_playtest()
\ No newline at end of file
+    run_playtest(render_window, recorder)
+
+if recorder is not None:
+    recorder.close()
+    print(f"Recorded {recorder.num_frames} frames to {video_path}")
\ No newline at end of file
@@ -0,0 +1,86 @@
+import math
+import random
+from collections import namedtuple
+
+import numpy as np
+
+# Racing (successive halving) for noisy game fitness. Rather than one full game per candidate, every candidate plays a
+# few short seeded games; only the best fraction is promoted to the next rung, which plays more and longer games:
+#   rungs = [(2, 60), (4, 180), (8, 360)]     # (games per candidate, game length) per rung
+#   results = successive_halving(len(weight_sets), play_rung, rungs)
+#   evals = race_evals(results)               # One scalar per candidate for solution.set_evals
+# play_rung(candidates, seeds, length) plays every listed candidate on every seed at that length and returns the scores
+# as [candidate][seed]. Scores from different rungs should be on one scale (e.g. scaled to a full game's length).
+# Every candidate at a rung plays the same seeds, so they're compared on the same pieces.
+
+# A candidate's standing after the race: mean score and 95% confidence half-width over its games at the last rung it
+# reached, how many games that was, and which rung (0 for eliminated at the first)
+RaceResult = namedtuple("RaceResult", ["fitness", "confidence", "games", "rung"])
+
+DEFAULT_PROMOTE = 0.5  # Fraction of each rung that goes on to the next
+
+
+def mean_confidence(scores):
+    """(mean, 95% confidence half-width) of a list of scores. The half-width is inf for a single game."""
+    scores = np.asarray(scores, dtype=float)
+    if len(scores) < 2:
+        return float(scores.mean()), math.inf
+    return float(scores.mean()), float(1.96 * scores.std(ddof=1) / math.sqrt(len(scores)))
+
+
+def successive_halving(num_candidates, play_rung, rungs, promote = DEFAULT_PROMOTE, seeds = None, rng = random):
+    """Races `num_candidates` candidates through `rungs` and returns one RaceResult per candidate, in order.
+    Rung r draws rungs[r][0] fresh seeds from `rng`, or takes the first that many of `seeds` if given
+    (the same seeds every generation, e.g. so a fitness cache can hit)."""
+    results = [None] * num_candidates
+    alive = list(range(num_candidates))
+
+    for rung, (games, length) in enumerate(rungs):
+        if seeds is not None:
+            rung_seeds = list(seeds)[:games]
+        else:
+            rung_seeds = [rng.randrange(2**32) for _ in range(games)]
+
+        for candidate, scores in zip(alive, play_rung(alive, rung_seeds, length)):
+            fitness, confidence = mean_confidence(scores)
+            results[candidate] = RaceResult(fitness, confidence, len(scores), rung)
+
+        if rung == len(rungs) - 1:
+            break
+        keep = max(1, math.ceil(len(alive) * promote))
+        alive = sorted(alive, key=lambda candidate: results[candidate].fitness, reverse=True)[:keep]
+
+    return results
+
+
+def race_evals(results):
+    """One eval per candidate that ranks first by rung reached, then by fitness. Candidates keep their mean fitness
+    where that already ranks them below every candidate of a higher rung; a rung whose best would outrank a candidate
+    of a higher rung is shifted down just far enough that it doesn't."""
+    evals = [result.fitness for result in results]
+    floor = math.inf  # Lowest eval of any higher rung
+    for rung in sorted({result.rung for result in results}, reverse=True):
+        members = [i for i, result in enumerate(results) if result.rung == rung]
+        best = max(evals[i] for i in members)
+        if best >= floor:
+            for i in members:
+                evals[i] -= best - floor + 1
+        floor = min(floor, min(evals[i] for i in members))
+    return evals
+
+
+def games_played(results, rungs):
+    """Games the race cost, counted in full-length games (the last rung's length)."""
+    full_length = rungs[-1][1]
+    total = 0.0
+    for result in results:
+        total += sum(games * length for games, length in rungs[:result.rung + 1]) / full_length
+    return total
+
+
+def summarize(results, rungs):
+    """One-line race summary for training logs."""
+    best = max(results, key=lambda result: (result.rung, result.fitness))
+    finalists = sum(result.rung == len(rungs) - 1 for result in results)
+    return (f"{len(results)} candidates, {finalists} reached the last rung, cost {games_played(results, rungs):.1f} "
+            f"full games. Best: {best.fitness:.1f} ± {best.confidence:.1f} over {best.games} games.")
@@ -0,0 +1,209 @@
+from collections import deque, namedtuple
+
+import srs
+from placements import Candidate, board_profile, candidate_features, weighted_score
+
+# Full reachability search for the Python agents. Where placements.enumerate_placements only tries hard drops from
+# shifted spawn columns, this searches every (rotation, row, col) the active piece can get to with the game's own moves
+# and SRS kicks (shifts, rotations, one-row soft drops and sonic drops), so tucks, slides and T-spins show up too.
+# Like tetris_thinker's find_moves, each lock position comes with the shortest input sequence that reaches it:
+#   for placement in find_reachable_placements(game.snapshot()):
+#       ...
+#   apply_input_sequence(game, chosen.inputs)    # headless_play; plays the inputs and hard drops
+
+# Input names, as understood by headless_play.apply_input_sequence (which ends every sequence with a hard drop)
+INPUTS = ["Left", "Right", "Ccw", "Cw", "SoftDrop", "SonicDrop"]
+
+# One lock position: the piece, its rotation index and cells, the inputs that get it there and the T-spin it scores
+# (an entry of srs.T_SPIN_TYPES). Placements with the same cells and T-spin are only listed once.
+Reachable = namedtuple("Reachable", ["piece_type", "rotation", "cells", "inputs", "t_spin"])
+
+# T-spin qualification carried with each search state, mirroring qualified_for_T_spin and wall_kick_5_used
+NOT_QUALIFIED, ROTATED, ROTATED_KICK_5 = 0, 1, 2
+
+# Kick tests by piece, rotation index and direction (+1 clockwise, -1 counter-clockwise), as (d_row, d_col)
+KICK_TESTS = {
+    piece: {
+        (rotation, direction): [(kick_y, kick_x) for kick_x, kick_y in (srs.SRS_WALL_KICKS_I if piece == "I" else srs.SRS_WALL_KICKS)[(srs.ROTATION_STATES[rotation], srs.ROTATION_STATES[(rotation + direction) % 4])]]
+        for rotation in range(4) for direction in (1, -1)
+    }
+    for piece in srs.TETRIMINO_SHAPES
+}
+
+
+class ReachabilityMemo:
+    """Caches search results by piece, start position and the rows of the board the search actually read.
+    A search never looks below the deepest row the piece can get to, so boards that only differ further down
+    (covered holes, garbage) share one result. Cleared wholesale once it holds `max_entries` results."""
+
+    def __init__(self, max_entries = 4096):
+        self.max_entries = max_entries
+        self.entries = {}  # (piece, rotation, row, col) -> {deepest row read: {rows above and including it: locks}}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, start, rows):
+        for depth, results in self.entries.get(start, {}).items():
+            locks = results.get(tuple(rows[:depth + 1]))
+            if locks is not None:
+                self.hits += 1
+                return locks
+        self.misses += 1
+        return None
+
+    def store(self, start, rows, depth, locks):
+        if self.size >= self.max_entries:
+            self.entries.clear()
+            self.size = 0
+        self.entries.setdefault(start, {}).setdefault(depth, {})[tuple(rows[:depth + 1])] = locks
+        self.size += 1
+
+
+def search_piece(rows, occupancy, piece, rotation, row, col):
+    """Breadth-first search from one start position, or from each legal move out of it if it overlaps the stack.
+    Returns ([(rotation, cells, inputs, t_spin index)], deepest row read); the list is in order of input count, so
+    every lock position comes with a shortest sequence."""
+    offsets = srs.PIECE_OFFSETS[piece]
+    kick_tests = KICK_TESTS[piece]
+    deepest = -1
+
+    def fits(rotation, row, col):
+        nonlocal deepest
+        for dr, dc in offsets[rotation]:
+            r, c = row + dr, col + dc
+            if c < 0 or c >= srs.COLS or r >= srs.ROWS:
+                return False
+            if r >= 0:
+                if r > deepest:
+                    deepest = r
+                if rows[r] >> c & 1:
+                    return False
+        return True
+
+    # One-row soft drops only matter once the piece is down among the stack; above it, a sonic drop does the same job
+    stack_top = next((r for r, mask in enumerate(rows) if mask), srs.ROWS)
+    lowest_offset = [max(dr for dr, _ in cells) for cells in offsets]
+
+    def moves_from(rotation, row, col):
+        """(moves from this position in INPUTS order as (input, next node), whether the piece is resting on something)."""
+        moves = []
+        if fits(rotation, row, col - 1):
+            moves.append(("Left", (rotation, row, col - 1, NOT_QUALIFIED)))
+        if fits(rotation, row, col + 1):
+            moves.append(("Right", (rotation, row, col + 1, NOT_QUALIFIED)))
+        if piece != "O":
+            for name, direction in (("Ccw", -1), ("Cw", 1)):
+                tests = kick_tests[(rotation, direction)]
+                new_rotation = (rotation + direction) % 4
+                for i, (kick_row, kick_col) in enumerate(tests):
+                    if fits(new_rotation, row + kick_row, col + kick_col):
+                        moves.append((name, (new_rotation, row + kick_row, col + kick_col, ROTATED_KICK_5 if i == len(tests) - 1 else ROTATED)))
+                        break
+
+        if not fits(rotation, row + 1, col):
+            return moves, True
+        if row + lowest_offset[rotation] + 1 >= stack_top:
+            moves.append(("SoftDrop", (rotation, row + 1, col, NOT_QUALIFIED)))
+        landed = row + 1
+        while fits(rotation, landed + 1, col):
+            landed += 1
+        moves.append(("SonicDrop", (rotation, landed, col, NOT_QUALIFIED)))
+        return moves, False
+
+    start = (rotation, row, col, NOT_QUALIFIED)
+    parents = {start: None}
+    if fits(rotation, row, col):
+        frontier = deque([start])
+    else:
+        # A piece brought in by hold can spawn inside the stack without topping out. It can't lock there, but every
+        # move only checks where the piece ends up, so the search starts from each legal first move out of it instead.
+        frontier = deque()
+        for name, next_node in moves_from(rotation, row, col)[0]:
+            if next_node not in parents:
+                parents[next_node] = (start, name)
+                frontier.append(next_node)
+    locks = []
+    seen_locks = set()
+    spin_locks = []  # (index into locks, fifth kick used) for T placements whose last move was a rotation
+
+    while frontier:
+        node = frontier.popleft()
+        rotation, row, col, spin = node
+        moves, grounded = moves_from(rotation, row, col)
+
+        if grounded:
+            # Resting on something: hard dropping here locks the piece without moving it
+            cells = tuple(srs.piece_cells(piece, rotation, row, col))
+            lock_key = (frozenset(cells), spin if piece == "T" else NOT_QUALIFIED)
+            if lock_key not in seen_locks:
+                seen_locks.add(lock_key)
+                inputs = []
+                step = node
+                while parents[step] is not None:
+                    step, name = parents[step]
+                    inputs.append(name)
+                if piece == "T" and spin != NOT_QUALIFIED:
+                    spin_locks.append((len(locks), spin == ROTATED_KICK_5))
+                locks.append([rotation, cells, tuple(reversed(inputs)), 0])
+
+        for name, next_node in moves:
+            if next_node not in parents:
+                parents[next_node] = (node, name)
+                frontier.append(next_node)
+
+    # Score the T-spins of every qualifying T lock in one batch. A rotation that doesn't earn a T-spin locks the same
+    # as sliding in, so those entries collapse onto whichever sequence was shorter.
+    if spin_locks:
+        indices = [i for i, _ in spin_locks]
+        codes = srs.classify_T_spins(occupancy, [locks[i][1][srs.PIECE_PIVOTS["T"]] for i in indices], [locks[i][0] for i in indices], [kick_5 for _, kick_5 in spin_locks])
+        for i, code in zip(indices, codes):
+            locks[i][3] = int(code)
+
+        unique = {}
+        for lock in locks:
+            unique.setdefault((frozenset(lock[1]), lock[3]), lock)
+        locks = list(unique.values())
+
+    return [tuple(lock) for lock in locks], deepest
+
+
+def find_reachable_placements(state, memo = None):
+    """Every lock position reachable by the active piece of a placements.GameState and, when holding is allowed, by the
+    piece holding would bring in (those sequences start with "Hold"). Returns a list of Reachables.
+    Pass a ReachabilityMemo to reuse results across calls."""
+    occupied = state.grid != "X"
+    rows = srs.row_masks(occupied)
+    occupancy = srs.padded_occupancy(occupied)
+
+    starts = [(state.piece_type, state.rotation, state.row, state.col, ())]
+    if not state.hold_used and state.held_piece != state.piece_type:
+        hold_piece = state.held_piece if state.held_piece is not None else state.next_queue[0]
+        starts.append((hold_piece, 0, *srs.SPAWN_POSITIONS[hold_piece], ("Hold",)))
+
+    placements = []
+    for piece, rotation, row, col, prefix in starts:
+        start = (piece, rotation, row, col)
+        locks = memo.lookup(start, rows) if memo is not None else None
+        if locks is None:
+            locks, deepest = search_piece(rows, occupancy, piece, rotation, row, col)
+            if memo is not None:
+                memo.store(start, rows, deepest, locks)
+
+        for lock_rotation, cells, inputs, t_spin in locks:
+            placements.append(Reachable(piece, lock_rotation, cells, prefix + inputs, srs.T_SPIN_TYPES[t_spin]))
+
+    return placements
+
+
+def evaluate_reachable(state, weights = None, memo = None):
+    """find_reachable_placements scored like placements.evaluate_candidates. Each Candidate's key is its input
+    sequence, ready for headless_play.apply_input_sequence."""
+    profile = board_profile(state.grid)
+    candidates = []
+
+    for placement in find_reachable_placements(state, memo):
+        features, lines_cleared = candidate_features(profile, placement.cells)
+        candidates.append(Candidate(placement.inputs, placement.piece_type, placement.rotation, placement.cells, lines_cleared, features, weighted_score(features, weights)))
+
+    return candidates
@@ -0,0 +1,189 @@
+import struct
+import zlib
+from collections import namedtuple
+
+from game_class import TetrisGame
+
+# Replay files are a sequence of independently compressed game blocks, appended one per finished game:
+#   [u32 block length][zlib(game header + placement records)]
+# A game is fully described by its bag seed and the placements, so positions are rebuilt by re-simulation
+# instead of storing grids. A crash can at worst leave a truncated final block, which the reader skips.
+
+REPLAY_VERSION = 2
+
+# Codes used in the binary records. Order matters; append only.
+PIECE_CODES = ["I", "O", "T", "L", "J", "S", "Z"]
+ROTATION_CODES = [0, "R", 2, "L"]
+T_SPIN_CODES = [False, "Mini T-Spin", "T-Spin"]
+MODE_CODES = [None, "Sprint", "Blitz", "Test"]
+
+BLOCK_LENGTH = struct.Struct("<I")
+GAME_HEADER = struct.Struct("<BBQI")  # Version, game mode, bag seed, placement count
+# Piece | hold << 3 | rotation << 4 | T-spin << 6, column, row, lines, score delta of the lock, drop points before it
+PLACEMENT = struct.Struct("<BbbBIH")
+PLACEMENT_V1 = struct.Struct("<BbbBI")  # Version 1 had no drop points, so its games replay without them
+
+GameReplay = namedtuple("GameReplay", ["mode", "seed", "placements"])
+Placement = namedtuple("Placement", ["piece", "hold", "rotation", "col", "row", "T_spin", "lines", "score_delta", "drop_points"])
+
+_shape_table = None
+
+
+def piece_shape_table():
+    """Returns {(piece, rotation): [(row, col), ...]} with each shape's cells relative to its bounding box corner."""
+
+    global _shape_table
+    if _shape_table is not None:
+        return _shape_table
+
+    # Rotate every piece through its states on an empty board with the game's own rotation code
+    game = TetrisGame(render=False)
+    table = {}
+    for piece in PIECE_CODES:
+        game.current_piece_type = piece
+        game.current_piece = [(r + 10, c + 4) for r, c in game.TETRIMINO_SHAPES[piece][0]]
+        game.current_rotation = 0
+        for _ in ROTATION_CODES:
+            min_r = min(r for r, _ in game.current_piece)
+            min_c = min(c for _, c in game.current_piece)
+            table[(piece, game.current_rotation)] = [(r - min_r, c - min_c) for r, c in game.current_piece]
+            game.rotate_piece("R")
+
+    _shape_table = table
+    return table
+
+
+class ReplayWriter:
+    """Appends games to a compressed replay file. Attach it to a TetrisGame and every placement gets logged."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "ab")
+        self.header = None  # (mode, seed) of the game being recorded, None between games
+        self.records = bytearray()
+        self.count = 0
+        self.last_score = 0  # The game's score after its previous lock
+
+    def attach(self, game):
+        """Starts logging the game's placements from its next reset_game_state()."""
+        game.replay_writer = self
+
+    def start_game(self, game):
+        """Begins a new game record. Any unfinished game (e.g. a reset mid-game) is written out first."""
+        self.finish_game()
+        self.header = (MODE_CODES.index(game.game_mode), game.seed)
+        self.records = bytearray()
+        self.count = 0
+        self.last_score = game.score
+
+    def record_placement(self, game, score_delta):
+        """Packs the piece that is about to be replaced by the next spawn. `score_delta` is what the lock scored; the
+        rest of the score gained since the previous lock is drop points, recorded alongside it."""
+        if self.header is None:
+            return  # Attached mid-game; nothing to replay from
+
+        flags = (PIECE_CODES.index(game.current_piece_type)
+                 | (game.hold_used << 3)
+                 | (ROTATION_CODES.index(game.current_rotation) << 4)
+                 | (T_SPIN_CODES.index(game.most_recent_T_spin) << 6))
+        row = min(r for r, _ in game.current_piece)
+        col = min(c for _, c in game.current_piece)
+
+        drop_points = game.score - score_delta - self.last_score
+        self.last_score = game.score
+
+        self.records += PLACEMENT.pack(flags, col, row, game.most_recent_clear, score_delta, drop_points)
+        self.count += 1
+
+    def finish_game(self):
+        """Compresses the current game into one block and appends it to the file."""
+        if self.header is None:
+            return
+
+        mode, seed = self.header
+        block = zlib.compress(GAME_HEADER.pack(REPLAY_VERSION, mode, seed, self.count) + bytes(self.records))
+        self.file.write(BLOCK_LENGTH.pack(len(block)) + block)
+        self.file.flush()
+
+        self.header = None
+        self.records = bytearray()
+        self.count = 0
+
+    def close(self):
+        self.finish_game()
+        self.file.close()
+
+
+def read_replays(path):
+    """Yields a GameReplay for every complete game in the file."""
+
+    with open(path, "rb") as f:
+        while True:
+            length_bytes = f.read(BLOCK_LENGTH.size)
+            if len(length_bytes) < BLOCK_LENGTH.size:
+                return
+            (length,) = BLOCK_LENGTH.unpack(length_bytes)
+            block = f.read(length)
+            if len(block) < length:
+                return  # Truncated final block from an interrupted run
+
+            data = zlib.decompress(block)
+            version, mode, seed, count = GAME_HEADER.unpack_from(data, 0)
+            if version not in (1, REPLAY_VERSION):
+                raise ValueError(f"Unsupported replay version {version}")
+            record = PLACEMENT if version == REPLAY_VERSION else PLACEMENT_V1
+
+            placements = []
+            for flags, col, row, lines, score_delta, *drop_points in record.iter_unpack(data[GAME_HEADER.size:GAME_HEADER.size + count * record.size]):
+                placements.append(Placement(
+                    piece=PIECE_CODES[flags & 0b111],
+                    hold=bool((flags >> 3) & 1),
+                    rotation=ROTATION_CODES[(flags >> 4) & 0b11],
+                    col=col,
+                    row=row,
+                    T_spin=T_SPIN_CODES[(flags >> 6) & 0b11],
+                    lines=lines,
+                    score_delta=score_delta,
+                    drop_points=drop_points[0] if drop_points else 0
+                ))
+
+            yield GameReplay(MODE_CODES[mode], seed, placements)
+
+
+def apply_replay_placement(game, placement):
+    """Puts the recorded piece at its final position and locks it, reproducing the original T-spin status and awarding
+    the drop points the original earned on the way down."""
+
+    if placement.hold:
+        game.hold_piece()
+
+    if game.current_piece_type != placement.piece:
+        raise ValueError(f"Replay diverged: expected {placement.piece}, game has {game.current_piece_type}")
+
+    shape = piece_shape_table()[(placement.piece, placement.rotation)]
+    game.current_piece = [(placement.row + r, placement.col + c) for r, c in shape]
+    game.current_rotation = placement.rotation
+
+    # detect_T_spin re-derives mini vs. full from the corners; the fifth-kick override is the only thing it can't see
+    game.qualified_for_T_spin = placement.T_spin is not False
+    game.wall_kick_5_used = placement.T_spin == "T-Spin"
+
+    game.score += placement.drop_points
+    game.lock_piece()
+
+
+def replay_game(replay, upto = None, verify = True):
+    """Re-simulates a GameReplay and returns a headless TetrisGame positioned after `upto` placements (all by default)."""
+
+    game = TetrisGame(render=False, game_mode=replay.mode)
+    game.reset_game_state(seed=replay.seed)
+
+    placements = replay.placements if upto is None else replay.placements[:upto]
+    for index, placement in enumerate(placements):
+        score_before = game.score + placement.drop_points
+        apply_replay_placement(game, placement)
+
+        if verify and game.score - score_before != placement.score_delta:
+            raise ValueError(f"Replay diverged at placement {index}: score delta {game.score - score_before}, recorded {placement.score_delta}")
+
+    return game
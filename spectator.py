@@ -0,0 +1,146 @@
+import os
+import math
+import time
+import queue
+import multiprocessing
+import numpy as np
+
+from replay import PIECE_CODES
+
+# Spectator mode: simulation workers publish compact snapshots of their games to a bounded queue, and a separate
+# renderer process draws the latest snapshot of each game, tiled in a grid of boards, at its own frame rate.
+# Publishing never blocks. Snapshots above the rate cap are skipped, and snapshots that don't fit in the queue are dropped.
+#   queue, process = start_spectator(num_boards=4)
+#   env.game.spectator = SpectatorPublisher(queue, game_id=os.getpid())
+
+GRID_CODES = {"X": 0, **{piece: i + 1 for i, piece in enumerate(PIECE_CODES)}}
+GRID_PIECES = np.array(["X"] + PIECE_CODES)
+
+
+def grid_codes(grid):
+    """uint8 copy of a piece-letter grid (0 = empty), a quarter of the size of the letter array."""
+    codes = np.zeros(grid.shape, dtype=np.uint8)
+    for piece, code in GRID_CODES.items():
+        if code:
+            codes[grid == piece] = code
+    return codes
+
+
+def game_snapshot(game):
+    """Compact, picklable copy of everything the board renderer draws."""
+    return {
+        "mode": game.game_mode,
+        "grid": grid_codes(game.grid),
+        "piece": game.current_piece_type,
+        "cells": [tuple(cell) for cell in game.current_piece],
+        "held": game.held_piece,
+        "hold_used": game.hold_used,
+        "next": list(game.next_queue[:5]),
+        "bag_piece_count": game.bag_piece_count,
+        "score": game.score,
+        "lines": game.lines_cleared,
+        "pieces": game.total_pieces_placed,
+        "clear_text": game.clear_text,
+        "clear_text_color": game.clear_text_color,
+        "elapsed": time.time() - game.start_time if game.start_time else 0.0,
+    }
+
+
+def apply_snapshot(game, snapshot):
+    """Loads a snapshot into a non-simulating TetrisGame so its draw functions can render it."""
+    game.game_mode = snapshot["mode"]
+    game.grid = GRID_PIECES[snapshot["grid"]]
+    game.current_piece_type = snapshot["piece"]
+    game.current_piece = [list(cell) for cell in snapshot["cells"]]
+    game.held_piece = snapshot["held"]
+    game.hold_used = snapshot["hold_used"]
+    game.next_queue = snapshot["next"]
+    game.bag_piece_count = snapshot["bag_piece_count"]
+    game.score = snapshot["score"]
+    game.lines_cleared = snapshot["lines"]
+    game.total_pieces_placed = snapshot["pieces"]
+    game.clear_text = snapshot["clear_text"]
+    game.clear_text_color = snapshot["clear_text_color"]
+    game.start_time = time.time() - snapshot["elapsed"]
+
+
+class SpectatorPublisher:
+    """Attached to a game as `game.spectator`; lock_piece calls publish() after every placement."""
+
+    def __init__(self, snapshot_queue, game_id = None, max_rate_hz = 30):
+        self.queue = snapshot_queue
+        self.game_id = game_id if game_id is not None else os.getpid()
+        self.min_interval = 1.0 / max_rate_hz
+        self.last_publish = 0.0
+        self.dropped = 0  # Snapshots the renderer was too slow to take
+
+    def publish(self, game):
+        now = time.perf_counter()
+        if now - self.last_publish < self.min_interval:
+            return  # Over the rate cap; the renderer only ever shows the latest state anyway
+        self.last_publish = now
+
+        try:
+            self.queue.put_nowait((self.game_id, game_snapshot(game)))
+        except queue.Full:
+            self.dropped += 1
+
+
+def run_spectator(snapshot_queue, num_boards = 4, fps = 30, board_size = (400, 350)):
+    """Renderer process body. Boards are assigned to game ids in the order they first publish; extra games are ignored."""
+    import pygame
+    from game_class import TetrisGame
+
+    pygame.init()
+    columns = math.ceil(math.sqrt(num_boards))
+    rows = math.ceil(num_boards / columns)
+    window = pygame.display.set_mode((columns * board_size[0], rows * board_size[1]))
+    pygame.display.set_caption("Tetris Spectator")
+    clock = pygame.time.Clock()
+
+    # One drawing-only game per board, each drawing into its own tile of the window
+    boards = []
+    for i in range(num_boards):
+        board = TetrisGame(render=False)
+        board.screen = window.subsurface(pygame.Rect((i % columns) * board_size[0], (i // columns) * board_size[1], *board_size))
+        boards.append(board)
+
+    slots = {}  # game_id -> board index
+    latest = {}  # game_id -> newest snapshot not drawn yet
+    running = True
+
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+        # Drain everything that arrived since the last frame, keeping only the newest snapshot per game
+        while True:
+            try:
+                game_id, snapshot = snapshot_queue.get_nowait()
+            except queue.Empty:
+                break
+            if game_id not in slots and len(slots) < num_boards:
+                slots[game_id] = len(slots)
+            if game_id in slots:
+                latest[game_id] = snapshot
+
+        for game_id, snapshot in latest.items():
+            board = boards[slots[game_id]]
+            apply_snapshot(board, snapshot)
+            board.draw_grid()
+            board.present_frame()
+        latest.clear()
+
+        clock.tick(fps)
+
+    pygame.quit()
+
+
+def start_spectator(num_boards = 4, fps = 30, max_queued = 64):
+    """Starts the renderer in its own process and returns (queue, process). Hand the queue to SpectatorPublishers."""
+    context = multiprocessing.get_context("spawn")  # The renderer gets its own pygame, independent of the workers'
+    snapshot_queue = context.Queue(maxsize=max_queued)
+    process = context.Process(target=run_spectator, args=(snapshot_queue, num_boards, fps), daemon=True)
+    process.start()
+    return snapshot_queue, process
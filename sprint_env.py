@@ -5,10 +5,10 @@ from gym import spaces
 from game_class import TetrisGame
 
 class SprintHeuristicEnv(gym.Env):
-    def __init__(self):
+    def __init__(self, render_env = True):
         super().__init__()
 
-        self.game = TetrisGame(render=True, game_mode="Sprint")
+        self.game = TetrisGame(render=render_env, game_mode="Sprint")
         self.last_lines_cleared = 0
         self.reset_tracker = 0
 
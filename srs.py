@@ -0,0 +1,201 @@
+import numpy as np
+
+# Piece geometry and SRS rotation data shared by TetrisGame and the pure placement code in placements.py.
+# Positions are (row, col) with rows counting down from the top of the 24-row matrix, as in TetrisGame.grid.
+#
+# A piece's position is (rotation index, row, col), where (row, col) is a reference cell:
+#   - every piece but I: the pivot mino (PIECE_PIVOTS), which rotation keeps fixed before kicks are applied;
+#   - I: the top-left corner of its 4x4 SRS box.
+# Kicks move the reference cell by (kick_y, kick_x), exactly as TetrisGame.rotate_piece moves every mino.
+
+ROWS, COLS = 24, 10  # Play matrix dimensions
+
+ROTATION_STATES = [0, "R", 2, "L"]  # Clockwise order; positions store the index into this list
+
+# Shape definitions with SRS spawn orientations
+TETRIMINO_SHAPES = {
+    "Z": [[(0, -1), (0, 0), (1, 0), (1, 1)]],
+    "S": [[(1, -1), (1, 0), (0, 0), (0, 1)]],
+    "L": [[(1, -1), (1, 0), (1, 1), (0, 1)]],
+    "J": [[(1, -1), (1, 0), (1, 1), (0, -1)]],
+    "O": [[(0, 0), (0, 1), (1, 0), (1, 1)]],
+    "T": [[(1, -1), (1, 0), (1, 1), (0, 0)]],
+    "I": [[(0, 0), (0, 1), (0, 2), (0, 3)]]
+}
+
+PIECE_PIVOTS = {
+    "L": 1,  # Middle of three-segment row
+    "J": 1,  # Middle of three-segment row
+    "T": 1,  # Middle of three-segment row
+    "S": 1,  # Lower of vertical two-stack
+    "Z": 2,  # Lower of vertical two-stack
+    "I": 1,  # Center horizontally, bottom-most square vertically
+    "O": 0  # True center, does not move
+}
+
+# SRS Wall Kick Data (J, L, S, T, Z), as (kick_x, kick_y)
+SRS_WALL_KICKS = {
+    (0, "R"): [(0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)],  # 0 → R
+    ("R", 0): [(0, 0), (1, 0), (1, 1), (0, -2), (1, -2)],  # R → 0
+    ("R", 2): [(0, 0), (1, 0), (1, 1), (0, -2), (1, -2)],  # R → 2
+    (2, "R"): [(0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)],  # 2 → R
+    (2, "L"): [(0, 0), (1, 0), (1, -1), (0, 2), (1, 2)],  # 2 → L
+    ("L", 2): [(0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)],  # L → 2
+    ("L", 0): [(0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)],  # L → 0
+    (0, "L"): [(0, 0), (1, 0), (1, -1), (0, 2), (1, 2)],  # 0 → L
+}
+
+# SRS Wall Kick Data for I-Piece (Different from other pieces)
+SRS_WALL_KICKS_I = {
+    (0, "R"): [(0, 0), (-2, 0), (1, 0), (-2, 1), (1, -2)],
+    ("R", 0): [(0, 0), (2, 0), (-1, 0), (2, -1), (-1, 2)],
+    ("R", 2): [(0, 0), (-1, 0), (2, 0), (-1, -2), (2, 1)],
+    (2, "R"): [(0, 0), (1, 0), (-2, 0), (1, 2), (-2, -1)],
+    (2, "L"): [(0, 0), (2, 0), (-1, 0), (2, -1), (-1, 2)],
+    ("L", 2): [(0, 0), (-2, 0), (1, 0), (-2, 1), (1, -2)],
+    ("L", 0): [(0, 0), (1, 0), (-2, 0), (1, 2), (-2, -1)],
+    (0, "L"): [(0, 0), (-1, 0), (2, 0), (-1, -2), (2, 1)],
+}
+
+# T-spin corner offsets (row, col) from the T's pivot for each rotation state: two front corners (the side the
+# T points toward) followed by two back corners. Indexed like ROTATION_STATES.
+T_SPIN_CORNERS = np.array([
+    [(-1, -1), (-1, 1), (1, -1), (1, 1)],  # 0: points up
+    [(-1, 1), (1, 1), (-1, -1), (1, -1)],  # R: points right
+    [(1, 1), (1, -1), (-1, 1), (-1, -1)],  # 2: points down
+    [(1, -1), (-1, -1), (1, 1), (-1, 1)],  # L: points left
+])
+T_SPIN_TYPES = [False, "Mini T-Spin", "T-Spin"]  # What classify_T_spins' codes mean
+
+
+def build_piece_offsets():
+    """Mino offsets from the reference cell for every piece and rotation index, in the same mino order
+    TetrisGame keeps current_piece in."""
+    offsets = {}
+    for piece, shapes in TETRIMINO_SHAPES.items():
+        if piece == "I":
+            # Rows 1/2 of the box when horizontal, columns 2/1 when vertical
+            offsets[piece] = [
+                [(1, 0), (1, 1), (1, 2), (1, 3)],
+                [(0, 2), (1, 2), (2, 2), (3, 2)],
+                [(2, 0), (2, 1), (2, 2), (2, 3)],
+                [(0, 1), (1, 1), (2, 1), (3, 1)],
+            ]
+            continue
+
+        pivot_r, pivot_c = shapes[0][PIECE_PIVOTS[piece]]
+        rotations = [[(r - pivot_r, c - pivot_c) for r, c in shapes[0]]]
+        if piece == "O":
+            rotations *= 4  # The O never rotates
+        else:
+            for _ in range(3):
+                rotations.append([(dc, -dr) for dr, dc in rotations[-1]])  # Clockwise, as in rotate_piece
+        offsets[piece] = rotations
+    return offsets
+
+
+PIECE_OFFSETS = build_piece_offsets()
+
+# Reference cell of a freshly spawned piece (spawn_piece puts the spawn shape at +2 rows, +4 columns; +3 for the I)
+SPAWN_POSITIONS = {
+    piece: (1, 3) if piece == "I" else (shape[0][PIECE_PIVOTS[piece]][0] + 2, shape[0][PIECE_PIVOTS[piece]][1] + 4)
+    for piece, shape in TETRIMINO_SHAPES.items()
+}
+
+
+def piece_cells(piece, rotation, row, col):
+    """The four (row, col) cells of a piece at a position."""
+    return [(row + dr, col + dc) for dr, dc in PIECE_OFFSETS[piece][rotation]]
+
+
+def piece_reference(piece, rotation, cells):
+    """Inverse of piece_cells: the reference cell of a piece whose minos are `cells`."""
+    if piece != "I":
+        return tuple(cells[PIECE_PIVOTS[piece]])
+    offsets = PIECE_OFFSETS["I"][rotation]
+    return (min(r for r, _ in cells) - min(dr for dr, _ in offsets), min(c for _, c in cells) - min(dc for _, dc in offsets))
+
+
+def locate_piece(piece, cells, preferred_rotation = 0):
+    """Inverse of piece_cells for cells in any order: (rotation, row, col) of a piece covering exactly `cells`.
+    Rotations that share a shape (I, S and Z pairs, every O rotation) resolve to preferred_rotation when it fits."""
+    cells = {tuple(cell) for cell in cells}
+    min_r = min(r for r, _ in cells)
+    min_c = min(c for _, c in cells)
+    for rotation in [preferred_rotation] + [r for r in range(4) if r != preferred_rotation]:
+        offsets = PIECE_OFFSETS[piece][rotation]
+        row = min_r - min(dr for dr, _ in offsets)
+        col = min_c - min(dc for _, dc in offsets)
+        if set(piece_cells(piece, rotation, row, col)) == cells:
+            return rotation, row, col
+    raise ValueError(f"{sorted(cells)} is not a {piece} piece")
+
+
+def row_masks(occupied):
+    """One integer per row of a boolean occupancy grid, with bit c set when column c is filled."""
+    return [int(mask) for mask in (occupied * (1 << np.arange(COLS, dtype=np.int64))).sum(axis=1)]
+
+
+def fits(masks, piece, rotation, row, col):
+    """is_valid_position against row_masks, straight from the offset table."""
+    for dr, dc in PIECE_OFFSETS[piece][rotation]:
+        r, c = row + dr, col + dc
+        if c < 0 or c >= COLS or r >= ROWS:
+            return False
+        if r >= 0 and masks[r] >> c & 1:
+            return False
+    return True
+
+
+def is_valid_position(occupied, cells):
+    """Same rule as TetrisGame.is_valid_position on a boolean occupancy grid: inside the walls, above the floor,
+    and not overlapping a filled cell (cells above the top of the matrix are always free)."""
+    for r, c in cells:
+        if c < 0 or c >= COLS or r >= ROWS:
+            return False
+        if r >= 0 and occupied[r, c]:
+            return False
+    return True
+
+
+def rotate(occupied, piece, rotation, row, col, direction):
+    """Pure version of TetrisGame.rotate_piece. Returns (rotation, row, col, kick_index) after the first kick test
+    that fits, or None if the rotation fails. O pieces return their position unchanged, like the game."""
+    if piece == "O":
+        return rotation, row, col, 0
+
+    new_rotation = (rotation + (1 if direction == "R" else -1)) % 4
+    kick_data = SRS_WALL_KICKS_I if piece == "I" else SRS_WALL_KICKS
+    kick_tests = kick_data.get((ROTATION_STATES[rotation], ROTATION_STATES[new_rotation]), [(0, 0)])
+
+    for i, (kick_x, kick_y) in enumerate(kick_tests):
+        if is_valid_position(occupied, piece_cells(piece, new_rotation, row + kick_y, col + kick_x)):
+            return new_rotation, row + kick_y, col + kick_x, i
+    return None
+
+
+def padded_occupancy(occupied):
+    """Boolean occupancy with a one-cell border: walls and floor count as filled, the top as empty.
+    Cell (r, c) of `occupied` is at (r + 1, c + 1)."""
+    occupancy = np.ones((ROWS + 2, COLS + 2), dtype=bool)
+    occupancy[0, :] = False
+    occupancy[1:-1, 1:-1] = occupied
+    return occupancy
+
+
+def classify_T_spins(occupancy, pivots, rotations, wall_kick_5 = False):
+    """Batched T-spin check for T placements on a padded_occupancy board. pivots is (N, 2) pivot (row, col) positions,
+    rotations is N rotation indices and wall_kick_5 is a bool or N bools. Returns an int8 array of indices into
+    T_SPIN_TYPES: 0 none, 1 mini, 2 full. Assumes every candidate qualifies (its last move was a rotation)."""
+    pivots = np.asarray(pivots, dtype=np.int64).reshape(-1, 2)
+    corners = T_SPIN_CORNERS[np.asarray(rotations, dtype=np.int64)]  # (N, 4, 2)
+
+    # Corner rows above the top of the board clip onto the (empty) top border
+    rows = np.clip(pivots[:, None, 0] + corners[:, :, 0] + 1, 0, ROWS + 1)
+    cols = pivots[:, None, 1] + corners[:, :, 1] + 1
+    filled = occupancy[rows, cols]  # (N, 4)
+    front, back = filled[:, :2], filled[:, 2:]
+
+    full = (front.all(axis=1) & back.any(axis=1)) | np.asarray(wall_kick_5, dtype=bool)  # Fifth kick is always a full T-spin
+    mini = ~full & back.all(axis=1) & front.any(axis=1)
+    return np.where(full, 2, np.where(mini, 1, 0)).astype(np.int8)
@@ -5,11 +5,11 @@ from gym import spaces
 from game_class import TetrisGame
 
 class TetrisEnv(gym.Env):
-    def __init__(self, mode="Blitz"):
+    def __init__(self, mode="Blitz", render_env=True):
         super().__init__()
 
         self.mode = mode
-        self.game = TetrisGame(render = True, game_mode = mode)
+        self.game = TetrisGame(render = render_env, game_mode = mode)
         self.last_score = 0
         self.last_pieces_placed = 0
         self.last_lines_cleared = 0
@@ -37,11 +37,19 @@ class TetrisEnv(gym.Env):
 
     def step(self, action_tuple):
         """
-        Executes the planned sequence to reach (dx, rotation), drops the piece,
-        and returns (observation, reward, done, info) per Gym format.
+        Executes the planned sequence to reach (dx, rotation) or a (dx, rotation, hold)
+        key from get_all_viable_hard_drops, drops the piece, and returns
+        (observation, reward, done, info) per Gym format.
         """
         self.steps += 1
-        dx, rotation = action_tuple
+        if len(action_tuple) == 3:
+            dx, rotation, hold = action_tuple
+        else:
+            (dx, rotation), hold = action_tuple, False
+
+        # --- Hold (placement keys hold before rotating) ---
+        if hold:
+            self.game.game_step(7)
 
         # --- Rotation ---
         match rotation:
@@ -187,5 +195,19 @@ class TetrisEnv(gym.Env):
 
         return observation
 
+    def get_candidate_observations(self, placement_grids):
+        """Stacks one observation per candidate resulting grid, all sharing the current piece, hold, queue and grid."""
+        return np.stack([
+            self.get_observation(
+                grid=future_grid,
+                piece_type=self.game.current_piece_type,
+                rotation=self.game.current_rotation,
+                hold=self.game.held_piece,
+                next_queue=self.game.next_queue,
+                current_grid=self.game.grid
+            )
+            for future_grid in placement_grids
+        ])
+
 
 
@@ -0,0 +1,78 @@
+//! Moves generated per second by `find_moves` with fresh buffers on every call (how it used to run) against one
+//! `MoveGenContext` reused for every call (how the thinker now runs). The two alternate for `REPEATS` timed runs each and
+//! the best rate of each is reported, so warm-up and noise from other processes don't land on one side.
+//!
+//!     cargo run --release --example movegen_bench
+
+use std::time::Instant;
+
+use enumset::EnumSet;
+use libtetris::{find_moves, Board, FallingPiece, MoveGenContext, MovementMode, Piece, SpawnRule};
+use rand::prelude::*;
+
+const BOARDS: usize = 200;
+const ROUNDS: usize = 20;
+const REPEATS: usize = 5;
+
+/// A random stack up to `max_height` rows tall, with one empty cell in every row so none are full.
+fn random_board(rng: &mut StdRng, max_height: usize) -> Board {
+    let heights: Vec<usize> = (0..10).map(|_| rng.gen_range(0, max_height + 1)).collect();
+    let mut field = [[false; 10]; 40];
+    for (y, row) in field.iter_mut().enumerate() {
+        let gap = rng.gen_range(0, 10);
+        for (x, cell) in row.iter_mut().enumerate() {
+            *cell = y < heights[x] && x != gap;
+        }
+    }
+    Board::new_with_state(field, EnumSet::all(), None, false, 0)
+}
+
+/// Every piece spawned on `BOARDS` random boards: the move generation jobs both runs share.
+fn jobs(seed: u64, max_height: usize) -> Vec<(Board, FallingPiece)> {
+    let mut rng = StdRng::seed_from_u64(seed);
+    let mut jobs = Vec::new();
+    for _ in 0..BOARDS {
+        let board = random_board(&mut rng, max_height);
+        for piece in EnumSet::<Piece>::all() {
+            if let Some(spawned) = SpawnRule::Row19Or20.spawn(piece, &board) {
+                jobs.push((board.clone(), spawned));
+            }
+        }
+    }
+    jobs
+}
+
+/// Runs every job `ROUNDS` times and returns (moves generated, moves per second).
+fn bench(jobs: &[(Board, FallingPiece)], mut generate: impl FnMut(&Board, FallingPiece) -> usize) -> (usize, f64) {
+    let started = Instant::now();
+    let mut moves = 0;
+    for _ in 0..ROUNDS {
+        for (board, spawned) in jobs {
+            moves += generate(board, *spawned);
+        }
+    }
+    (moves, moves as f64 / started.elapsed().as_secs_f64())
+}
+
+fn main() {
+    for &(name, max_height) in &[("low stacks (0G fast path)", 12), ("tall stacks (full search)", 18)] {
+        let jobs = jobs(1, max_height);
+
+        let mut context = MoveGenContext::new();
+        let (mut before, mut after) = (0.0f64, 0.0f64);
+        let mut before_moves = 0;
+        for _ in 0..REPEATS {
+            let (moves, rate) = bench(&jobs, |board, spawned| find_moves(board, spawned, MovementMode::ZeroG).len());
+            before_moves = moves;
+            before = before.max(rate);
+            let (after_moves, rate) =
+                bench(&jobs, |board, spawned| context.find_moves(board, spawned, MovementMode::ZeroG).len());
+            assert_eq!(before_moves, after_moves, "reusing the context changed the placements found");
+            after = after.max(rate);
+        }
+
+        println!("{}: {} placements per run", name, before_moves / ROUNDS);
+        println!("  fresh buffers per call: {:>12.0} moves/sec (best of {})", before, REPEATS);
+        println!("  reused MoveGenContext:  {:>12.0} moves/sec ({:.2}x)", after, after / before);
+    }
+}
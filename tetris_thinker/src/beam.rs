@@ -0,0 +1,152 @@
+use std::cmp::Reverse;
+use std::time::{Duration, Instant};
+
+use serde::{Deserialize, Serialize};
+
+use crate::evaluate::Standard;
+use crate::think::{candidates_with, evaluate, Candidate};
+use crate::{Board, MoveGenContext, Piece};
+
+/// How far ahead to search. depth 1 is the plain one-piece choice `think` makes.
+#[derive(Clone, Debug, Serialize, Deserialize)]
+#[serde(default)]
+pub struct BeamConfig {
+    /// Pieces placed per line: the current piece, then the next queue (with hold at every ply).
+    pub depth: usize,
+    /// Boards kept per depth.
+    pub width: usize,
+    /// Placements evaluated per move before the search stops deepening.
+    pub max_nodes: usize,
+    /// Wall-clock budget per move in milliseconds; 0 for none.
+    pub time_limit_ms: u64,
+}
+
+impl Default for BeamConfig {
+    fn default() -> Self {
+        BeamConfig {
+            depth: 1,
+            width: 16,
+            max_nodes: 100_000,
+            time_limit_ms: 0,
+        }
+    }
+}
+
+/// One line of play in the beam.
+#[derive(Clone)]
+struct Node {
+    /// Index of the first placement of this line among the root candidates.
+    root: usize,
+    /// Board after the line's latest placement, with that placement's pieces taken off the queue.
+    board: Board,
+    /// Piece to place next, or None once the known queue runs out.
+    next: Option<Piece>,
+    /// `reward` summed over every placement in the line.
+    reward: i32,
+    /// reward plus the latest board's `transient`: what the line is ranked by.
+    value: i32,
+}
+
+/// The board a candidate leaves behind with the queue moved on to the following piece, and that piece.
+/// Candidates don't touch the queue, so holding into an empty hold takes one more piece off it here.
+fn advance(before: &Board, candidate: &Candidate) -> (Board, Option<Piece>) {
+    let mut board = candidate.board.clone();
+    if candidate.used_hold && before.hold_piece.is_none() {
+        board.advance_queue();
+    }
+    let next = board.advance_queue();
+    (board, next)
+}
+
+fn prune(nodes: &mut Vec<Node>, width: usize) {
+    nodes.sort_by_key(|node| Reverse(node.value)); // Stable, so ties keep generation order
+    nodes.truncate(width.max(1));
+}
+
+/// Index of the root candidate (from `candidates(board, ..)`) that starts the best line, and that line's value.
+///
+/// Each ply expands every board in the beam with every placement of its next piece (and the hold alternative),
+/// accumulating `reward` along the line and ranking lines by accumulated reward plus the last board's `transient`.
+/// The best `width` lines go on to the next ply; a line with no known piece left goes on unchanged. If the node or
+/// time budget runs out partway through a ply, that ply is dropped and the decision is made on the last complete one.
+/// With depth 1 this picks what `think::choose` picks. Moves for the deeper plies are generated with `context`.
+pub fn best_root(
+    context: &mut MoveGenContext,
+    board: &Board,
+    roots: &[Candidate],
+    config: &Standard,
+    beam: &BeamConfig,
+) -> Option<(usize, i32)> {
+    let started = Instant::now();
+    let time_limit = Duration::from_millis(beam.time_limit_ms);
+    let out_of_budget = |nodes: usize| {
+        nodes >= beam.max_nodes || (beam.time_limit_ms > 0 && started.elapsed() >= time_limit)
+    };
+
+    let mut lines: Vec<Node> = roots
+        .iter()
+        .enumerate()
+        .map(|(root, candidate)| {
+            let (transient, reward) = evaluate(config, candidate);
+            let (board, next) = advance(board, candidate);
+            Node { root, board, next, reward, value: reward + transient }
+        })
+        .collect();
+    let mut nodes = lines.len();
+
+    for _ in 1..beam.depth {
+        prune(&mut lines, beam.width);
+        if out_of_budget(nodes) {
+            break;
+        }
+
+        let mut children = Vec::new();
+        let mut complete = true;
+        for line in &lines {
+            let piece = match line.next {
+                Some(piece) => piece,
+                None => {
+                    // The known queue ran out on this line (a hold near its end takes a piece early). Carry it into
+                    // the next ply as it is rather than losing it.
+                    children.push(line.clone());
+                    continue;
+                }
+            };
+            for candidate in candidates_with(context, &line.board, piece) {
+                let (transient, reward) = evaluate(config, &candidate);
+                let (board, next) = advance(&line.board, &candidate);
+                let reward = line.reward + reward;
+                children.push(Node { root: line.root, board, next, reward, value: reward + transient });
+                nodes += 1;
+            }
+            if out_of_budget(nodes) {
+                complete = false;
+                break;
+            }
+        }
+
+        if !complete || children.is_empty() {
+            break;
+        }
+        lines = children;
+    }
+
+    // Last maximum wins, matching think::choose when there is only one ply
+    lines
+        .iter()
+        .max_by_key(|line| (line.value, line.root))
+        .map(|line| (line.root, line.value))
+}
+
+/// `think` with lookahead: the candidate for `piece` that starts the best line, and that line's value.
+pub fn search(
+    context: &mut MoveGenContext,
+    board: &Board,
+    piece: Piece,
+    config: &Standard,
+    beam: &BeamConfig,
+) -> Option<(Candidate, i32)> {
+    let mut roots = candidates_with(context, board, piece);
+    let (index, value) = best_root(context, board, &roots, config, beam)?;
+    Some((roots.swap_remove(index), value))
+}
@@ -91,6 +91,58 @@ impl Default for Standard {
 }
 
 impl Standard {
+    /// Length of the flat weight vector taken by `from_weights`.
+    pub const WEIGHT_COUNT: usize = 44;
+
+    /// Builds a config from the flat weight vector the Python trainers evolve, in the order
+    /// `thinker_io.weights_to_json` writes it. Settings that aren't weights keep their defaults,
+    /// as they do when weights.json leaves them out. Returns None if the length is wrong.
+    pub fn from_weights(weights: &[i32]) -> Option<Self> {
+        if weights.len() != Self::WEIGHT_COUNT {
+            return None;
+        }
+        let mut tslot = [0; 4];
+        tslot.copy_from_slice(&weights[14..18]);
+        let mut well_column = [0; 10];
+        well_column.copy_from_slice(&weights[20..30]);
+
+        Some(Standard {
+            back_to_back: weights[0],
+            bumpiness: weights[1],
+            bumpiness_sq: weights[2],
+            row_transitions: weights[3],
+            height: weights[4],
+            top_half: weights[5],
+            top_quarter: weights[6],
+            jeopardy: weights[7],
+            cavity_cells: weights[8],
+            cavity_cells_sq: weights[9],
+            overhang_cells: weights[10],
+            overhang_cells_sq: weights[11],
+            covered_cells: weights[12],
+            covered_cells_sq: weights[13],
+            tslot,
+            well_depth: weights[18],
+            max_well_depth: weights[19],
+            well_column,
+            move_time: weights[30],
+            wasted_t: weights[31],
+            b2b_clear: weights[32],
+            clear1: weights[33],
+            clear2: weights[34],
+            clear3: weights[35],
+            clear4: weights[36],
+            tspin1: weights[37],
+            tspin2: weights[38],
+            tspin3: weights[39],
+            mini_tspin1: weights[40],
+            mini_tspin2: weights[41],
+            perfect_clear: weights[42],
+            combo_garbage: weights[43],
+            ..Standard::default()
+        })
+    }
+
     pub fn fast_config() -> Self {
         Standard {
             back_to_back: 10,
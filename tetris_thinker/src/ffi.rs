@@ -0,0 +1,177 @@
+//! C ABI for running the thinker in-process, so Python can load the cdylib with ctypes (see thinker_ffi.py)
+//! instead of writing input.json and starting a new process for every piece.
+//!
+//! Pieces are passed as codes in `Piece` order: 0 I, 1 O, 2 T, 3 L, 4 J, 5 S, 6 Z, with -1 for none.
+//! The field is 40 u16 rows, bottom row first, with bit x set when column x is filled.
+//! Chosen inputs come back as codes: 0 Hold, 1 Left, 2 Right, 3 Ccw, 4 Cw, 5 SonicDrop.
+
+use std::panic::{catch_unwind, AssertUnwindSafe};
+
+use enumset::EnumSet;
+
+use crate::evaluate::Standard;
+use crate::beam::{search, BeamConfig};
+use crate::{Board, MoveGenContext, Piece, PieceMovement};
+
+pub const PIECE_CODES: [Piece; 7] = [Piece::I, Piece::O, Piece::T, Piece::L, Piece::J, Piece::S, Piece::Z];
+
+pub const INPUT_HOLD: u8 = 0;
+
+/// Status codes returned by `thinker_think` in place of an input count.
+pub const THINK_NO_MOVE: i32 = -1;
+pub const THINK_BAD_ARGUMENT: i32 = -2;
+pub const THINK_BUFFER_TOO_SMALL: i32 = -3;
+pub const THINK_PANICKED: i32 = -4;
+
+/// A loaded weight set. Opaque to C. Holds move generation buffers reused by every `thinker_think` call, so one
+/// thinker must not be used from two threads at once.
+pub struct Thinker {
+    config: Standard,
+    beam: BeamConfig,
+    moves: MoveGenContext,
+}
+
+pub fn piece_from_code(code: i32) -> Option<Piece> {
+    if code < 0 {
+        return None;
+    }
+    PIECE_CODES.get(code as usize).copied()
+}
+
+pub fn movement_code(movement: PieceMovement) -> u8 {
+    match movement {
+        PieceMovement::Left => 1,
+        PieceMovement::Right => 2,
+        PieceMovement::Ccw => 3,
+        PieceMovement::Cw => 4,
+        PieceMovement::SonicDrop => 5,
+    }
+}
+
+/// Builds a board from packed rows and the rest of the game state.
+pub fn board_from_rows(rows: &[u16], bag: EnumSet<Piece>, hold: Option<Piece>, b2b: bool, combo: u32) -> Board {
+    let mut field = [[false; 10]; 40];
+    for (y, row) in rows.iter().enumerate().take(40) {
+        for x in 0..10 {
+            field[y][x] = row >> x & 1 != 0;
+        }
+    }
+    Board::new_with_state(field, bag, hold, b2b, combo)
+}
+
+/// Creates a thinker from `len` weights in `thinker_io.weights_to_json` order. Returns null if `len` isn't
+/// `Standard::WEIGHT_COUNT`. Free it with `thinker_free`.
+#[no_mangle]
+pub unsafe extern "C" fn thinker_create(weights: *const i32, len: usize) -> *mut Thinker {
+    if weights.is_null() {
+        return std::ptr::null_mut();
+    }
+    let weights = std::slice::from_raw_parts(weights, len);
+    match Standard::from_weights(weights) {
+        Some(config) => Box::into_raw(Box::new(Thinker {
+            config,
+            beam: BeamConfig::default(),
+            moves: MoveGenContext::new(),
+        })),
+        None => std::ptr::null_mut(),
+    }
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn thinker_free(thinker: *mut Thinker) {
+    if !thinker.is_null() {
+        drop(Box::from_raw(thinker));
+    }
+}
+
+/// Sets how far ahead `thinker_think` searches (see beam.rs). A new thinker uses depth 1: the one-piece choice.
+/// `time_ms` of 0 means no time limit. Returns 0, or THINK_BAD_ARGUMENT for a null thinker or a depth or width of 0.
+#[no_mangle]
+pub unsafe extern "C" fn thinker_set_search(
+    thinker: *mut Thinker,
+    depth: u32,
+    width: u32,
+    max_nodes: u64,
+    time_ms: u64,
+) -> i32 {
+    if thinker.is_null() || depth == 0 || width == 0 {
+        return THINK_BAD_ARGUMENT;
+    }
+    (*thinker).beam = BeamConfig {
+        depth: depth as usize,
+        width: width as usize,
+        max_nodes: max_nodes as usize,
+        time_limit_ms: time_ms,
+    };
+    0
+}
+
+/// Chooses a move, exactly as the JSON entry point would for the same state.
+///
+/// `field` points to 40 rows; `next` to `next_len` piece codes; `bag` has bit n set for each piece code n still in
+/// the 7-bag. Writes the chosen input codes (Hold first, if used; the final hard drop is implicit) to `out_inputs`
+/// and the evaluation to `out_score`, and returns how many inputs were written, or a negative THINK_* status.
+#[no_mangle]
+pub unsafe extern "C" fn thinker_think(
+    thinker: *mut Thinker,
+    field: *const u16,
+    piece: i32,
+    next: *const i32,
+    next_len: usize,
+    hold: i32,
+    bag: u8,
+    b2b: bool,
+    combo: u32,
+    out_inputs: *mut u8,
+    out_capacity: usize,
+    out_score: *mut i32,
+) -> i32 {
+    if thinker.is_null() || field.is_null() || out_inputs.is_null() || (next.is_null() && next_len > 0) {
+        return THINK_BAD_ARGUMENT;
+    }
+    let current = match piece_from_code(piece) {
+        Some(current) => current,
+        None => return THINK_BAD_ARGUMENT,
+    };
+    let rows = std::slice::from_raw_parts(field, 40);
+    let next: &[i32] = if next_len > 0 { std::slice::from_raw_parts(next, next_len) } else { &[] };
+    let out = std::slice::from_raw_parts_mut(out_inputs, out_capacity);
+    let thinker = &mut *thinker;
+
+    // Never unwind into the caller
+    let result = catch_unwind(AssertUnwindSafe(|| {
+        let bag: EnumSet<Piece> = (0..7).filter(|&n| bag >> n & 1 != 0).filter_map(piece_from_code).collect();
+        let mut board = board_from_rows(rows, bag, piece_from_code(hold), b2b, combo);
+        for &code in next {
+            match piece_from_code(code) {
+                Some(p) => board.add_next_piece(p),
+                None => return THINK_BAD_ARGUMENT,
+            }
+        }
+
+        let (best, score) = match search(&mut thinker.moves, &board, current, &thinker.config, &thinker.beam) {
+            Some(best) => best,
+            None => return THINK_NO_MOVE,
+        };
+
+        let movements = &best.placement.inputs.movements;
+        let count = movements.len() + best.used_hold as usize;
+        if count > out.len() {
+            return THINK_BUFFER_TOO_SMALL;
+        }
+        let mut i = 0;
+        if best.used_hold {
+            out[0] = INPUT_HOLD;
+            i = 1;
+        }
+        for &movement in movements {
+            out[i] = movement_code(movement);
+            i += 1;
+        }
+        if !out_score.is_null() {
+            *out_score = score;
+        }
+        count as i32
+    }));
+    result.unwrap_or(THINK_PANICKED)
+}
@@ -4,6 +4,10 @@ mod moves;
 mod piece;
 pub mod evaluate;
 pub mod chooser;
+pub mod think;
+pub mod beam;
+pub mod simulate;
+pub mod ffi;
 
 pub use crate::moves::{find_moves, MovementMode};
 
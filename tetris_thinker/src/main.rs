@@ -1,8 +1,7 @@
-use libtetris::{
-    chooser::ScoredBoard, evaluate::Standard, find_moves, Board, MovementMode, Piece, Row, SpawnRule
-};
+use libtetris::{beam, evaluate::Standard, simulate, think, Board, MoveGenContext, Piece, Row};
 use enumset::EnumSet;
 use serde::Deserialize;
+use std::io::{BufRead, Read, Write};
 
 #[derive(Deserialize)]
 struct Input {
@@ -27,6 +26,134 @@ struct Output {
     used_hold: bool,
 }
 
+// One candidate in `--quiet` output
+#[derive(serde::Serialize)]
+struct RankedOutput {
+    piece: Piece,
+    x: i32,
+    y: i32,
+    rotation: u8,
+    inputs: Vec<String>,     // As in selected_actions.json: "Hold" first when used
+    tspin: String,
+    lines_cleared: usize,
+    placement_kind: String,
+    b2b: bool,
+    combo: Option<u32>,
+    perfect_clear: bool,
+    transient: i32,          // evaluate_board's split: board shape now...
+    reward: i32,             // ...and what this placement earned
+    score: i32,              // transient + reward
+}
+
+// `--quiet` output: one compact JSON line
+#[derive(serde::Serialize)]
+struct QuietOutput {
+    best: RankedOutput,
+    candidates: Vec<RankedOutput>,  // The `--top-k` best, best first; empty without --top-k
+}
+
+fn ranked_output(candidate: &think::Candidate, (transient, reward): (i32, i32)) -> RankedOutput {
+    let location = candidate.placement.location;
+    RankedOutput {
+        piece: candidate.piece,
+        x: location.x,
+        y: location.y,
+        rotation: location.kind.1 as u8,
+        inputs: candidate.input_names(),
+        tspin: format!("{:?}", location.tspin),
+        lines_cleared: candidate.lock.cleared_lines.len(),
+        placement_kind: format!("{:?}", candidate.lock.placement_kind),
+        b2b: candidate.lock.b2b,
+        combo: candidate.lock.combo,
+        perfect_clear: candidate.lock.perfect_clear,
+        transient,
+        reward,
+        score: transient + reward,
+    }
+}
+
+/// Value following `name` on the command line, if present.
+fn flag_value(args: &[String], name: &str) -> Option<String> {
+    args.iter().position(|arg| arg == name).and_then(|i| args.get(i + 1).cloned())
+}
+
+/// Beam search settings from `--depth`, `--beam-width`, `--max-nodes` and `--time-ms`; unset flags keep the defaults.
+fn beam_config(args: &[String]) -> beam::BeamConfig {
+    let number = |name: &str| flag_value(args, name).map(|value| value.parse::<u64>().expect("search flags take a number"));
+    let defaults = beam::BeamConfig::default();
+    beam::BeamConfig {
+        depth: number("--depth").map_or(defaults.depth, |n| n as usize),
+        width: number("--beam-width").map_or(defaults.width, |n| n as usize),
+        max_nodes: number("--max-nodes").map_or(defaults.max_nodes, |n| n as usize),
+        time_limit_ms: number("--time-ms").unwrap_or(defaults.time_limit_ms),
+    }
+}
+
+// `--simulate` job, read as JSON from stdin
+#[derive(Deserialize)]
+struct SimulationJob {
+    weights: Vec<i32>,       // 44 weights, in thinker_io.weights_to_json order
+    seed: u64,               // TetrisGame bag seed
+    #[serde(default = "default_piece_budget")]
+    pieces: u32,             // Blitz piece budget
+    #[serde(default)]
+    record: bool,            // Include every placement in the output
+    #[serde(default)]
+    search: beam::BeamConfig, // Lookahead per move; depth 1 by default
+}
+
+// `--batch` job: every weight set plays every seed
+#[derive(Deserialize)]
+struct BatchJob {
+    weights: Vec<Vec<i32>>,  // One 44-weight vector per population member
+    seeds: Vec<u64>,         // Shared by every weight set
+    #[serde(default = "default_piece_budget")]
+    pieces: u32,
+    #[serde(default)]
+    threads: Option<usize>,  // Defaults to every available core
+    #[serde(default)]
+    search: beam::BeamConfig,
+}
+
+#[derive(serde::Serialize)]
+struct BatchOutput {
+    fitness: Vec<Vec<i64>>,                          // Scores, weight sets × seeds
+    results: Vec<Vec<simulate::SimulationResult>>,   // Full stats, same shape
+}
+
+fn default_piece_budget() -> u32 {
+    360
+}
+
+fn read_stdin() -> String {
+    let mut data = String::new();
+    std::io::stdin().read_to_string(&mut data).expect("failed to read stdin");
+    data
+}
+
+fn run_simulation() {
+    let job: SimulationJob = serde_json::from_str(&read_stdin()).expect("invalid simulation job");
+    let config = Standard::from_weights(&job.weights).expect("expected 44 weights");
+    let result = simulate::simulate_blitz(&config, &job.search, job.seed, job.pieces, job.record);
+    println!("{}", serde_json::to_string(&result).unwrap());
+}
+
+fn run_batch() {
+    let job: BatchJob = serde_json::from_str(&read_stdin()).expect("invalid batch job");
+    let configs: Vec<Standard> = job
+        .weights
+        .iter()
+        .map(|weights| Standard::from_weights(weights).expect("expected 44 weights per set"))
+        .collect();
+    let threads = job
+        .threads
+        .unwrap_or_else(|| std::thread::available_parallelism().map_or(1, |n| n.get()));
+
+    let results = simulate::simulate_batch(&configs, &job.search, &job.seeds, job.pieces, threads);
+    let fitness = results.iter().map(|row| row.iter().map(|result| result.score).collect()).collect();
+    println!("{}", serde_json::to_string(&BatchOutput { fitness, results }).unwrap());
+}
+
 fn parse_piece(s: &str) -> Piece {
     match s {
         "I" => Piece::I,
@@ -51,10 +178,8 @@ fn print_board<R: Row>(board: &Board<R>) {
     println!();
 }
 
-fn main() {
-    let input_data = std::fs::read_to_string("input.json").expect("failed to read input.json");
-    let input: Input = serde_json::from_str(&input_data).expect("invalid JSON");
-
+/// The board and current piece an input.json-style game state describes.
+fn board_from_input(input: &Input) -> (Board, Piece) {
     let mut field = [[false; 10]; 40];
     for (y, row) in input.field.iter().enumerate().take(40) {
         for (x, val) in row.iter().enumerate().take(10) {
@@ -71,107 +196,181 @@ fn main() {
         board.add_next_piece(p);
     }
 
-    let current_piece = parse_piece(&input.piece);
-    let mut spawn_candidates = vec![(current_piece, board.clone(), false)];
+    (board, parse_piece(&input.piece))
+}
 
-    match board.hold_piece {
-        Some(hold_piece_type) if hold_piece_type != current_piece => {
-            let mut swapped_board = board.clone();
-            swapped_board.hold_piece = Some(current_piece);
-            if let Some(_) = SpawnRule::Row19Or20.spawn(hold_piece_type, &swapped_board) {
-                spawn_candidates.push((hold_piece_type, swapped_board, true));
-            }
-        },
-        None => {
-            if let Some(first_next_str) = input.next.first() {
-                let new_current = parse_piece(first_next_str);
-                let mut swapped_board = board.clone();
-                swapped_board.hold_piece = Some(current_piece);
-                if SpawnRule::Row19Or20.spawn(new_current, &swapped_board).is_some() {
-                    spawn_candidates.push((new_current, swapped_board, true));
+// One `--serve` request line: new weights (and search settings) for the moves that follow, or a game state
+#[derive(Deserialize)]
+#[serde(untagged)]
+enum ServeRequest {
+    Configure {
+        weights: Vec<i32>,
+        #[serde(default)]
+        search: beam::BeamConfig,
+    },
+    Think(Input),
+}
+
+// `--serve` reply to a game state. A configure request is answered with `{"inputs": [], "score": 0}`.
+#[derive(serde::Serialize)]
+struct ServeReply {
+    inputs: Vec<String>,     // As in selected_actions.json: "Hold" first when used
+    score: i32,
+}
+
+/// `--serve`: a resident thinker. Reads one JSON request per stdin line and writes one JSON reply line per request,
+/// so a caller (thinker_pool.py) can keep the process for a whole game, or many, without a process start or file
+/// round trip per move. A state that has no move, or a line that doesn't parse, gets `null` (the error goes to
+/// stderr). Exits when stdin closes.
+fn run_server() {
+    let mut config = Standard::default();
+    let mut search = beam::BeamConfig::default();
+    let mut context = MoveGenContext::new();
+    let stdout = std::io::stdout();
+    let mut out = stdout.lock();
+
+    for line in std::io::stdin().lock().lines() {
+        let line = line.expect("failed to read stdin");
+        if line.trim().is_empty() {
+            continue;
+        }
+
+        let reply = match serde_json::from_str::<ServeRequest>(&line) {
+            Ok(ServeRequest::Configure { weights, search: new_search }) => match Standard::from_weights(&weights) {
+                Some(new_config) => {
+                    config = new_config;
+                    search = new_search;
+                    Some(ServeReply { inputs: Vec::new(), score: 0 })
+                }
+                None => {
+                    eprintln!("expected 44 weights, got {}", weights.len());
+                    None
                 }
+            },
+            Ok(ServeRequest::Think(input)) => {
+                let (board, piece) = board_from_input(&input);
+                beam::search(&mut context, &board, piece, &config, &search)
+                    .map(|(best, score)| ServeReply { inputs: best.input_names(), score })
             }
-        },        
-        _ => {},
+            Err(error) => {
+                eprintln!("invalid request: {}", error);
+                None
+            }
+        };
+
+        serde_json::to_writer(&mut out, &reply).unwrap();
+        out.write_all(b"\n").unwrap();
+        out.flush().unwrap();
     }
+}
+
+fn main() {
+    let args: Vec<String> = std::env::args().collect();
+
+    // `--simulate`: play a whole Blitz game internally instead of choosing one move (see simulate.rs)
+    if args.iter().any(|arg| arg == "--simulate") {
+        run_simulation();
+        return;
+    }
+    // `--batch`: score a whole population over a shared set of seeds in one run
+    if args.iter().any(|arg| arg == "--batch") {
+        run_batch();
+        return;
+    }
+
+    // `--serve`: stay resident and answer one game state per stdin line (see run_server)
+    if args.iter().any(|arg| arg == "--serve") {
+        run_server();
+        return;
+    }
+
+    let input_data = std::fs::read_to_string("input.json").expect("failed to read input.json");
+    let input: Input = serde_json::from_str(&input_data).expect("invalid JSON");
+    let (board, current_piece) = board_from_input(&input);
+
     // Reads in weights from `weights.json`. If certain weights are missing, defaults to what's in `evaluate.rs`.
     let config: Standard = {
         let weight_data = std::fs::read_to_string("weights.json").expect("failed to read weights.json");
         serde_json::from_str(&weight_data).expect("invalid weights.json")
     };
-    let mut scored_candidates = Vec::new();
+
+    // `--quiet`: no boards or per-candidate output, just one compact JSON line (plus `--top-k N` ranked candidates)
+    let quiet = args.iter().any(|arg| arg == "--quiet");
+    let top_k: usize = flag_value(&args, "--top-k").map_or(0, |k| k.parse().expect("--top-k takes a number"));
+
+    // `--depth N` looks N pieces ahead through the next queue (beam.rs); the default of 1 is the plain one-piece choice
+    let search = beam_config(&args);
+
+    // Candidate generation and scoring are shared with the in-process entry point (ffi.rs)
+    let mut context = MoveGenContext::new();
+    let candidates = think::candidates_with(&mut context, &board, current_piece);
+    let (best_index, best_score) =
+        beam::best_root(&mut context, &board, &candidates, &config, &search).expect("No valid boards generated");
+    let best = &candidates[best_index];
+
+    if quiet {
+        let output = QuietOutput {
+            best: ranked_output(best, think::evaluate(&config, best)),
+            candidates: think::top_k(&candidates, &config, top_k)
+                .into_iter()
+                .map(|(candidate, evaluation)| ranked_output(candidate, evaluation))
+                .collect(),
+        };
+        println!("{}", serde_json::to_string(&output).unwrap());
+        std::fs::write("selected_actions.json", serde_json::to_string(&output.best.inputs).unwrap())
+            .expect("Failed to write selected_actions.json");
+        return;
+    }
+
     let mut all_outputs = Vec::new();
 
-    for (spawn_piece_type, board_variant, used_hold) in spawn_candidates {
-        let spawn_piece = SpawnRule::Row19Or20
-            .spawn(spawn_piece_type, &board_variant)
-            .expect("Failed to spawn piece");
-
-        let placements = find_moves(&board_variant, spawn_piece, MovementMode::ZeroG);
-
-        for p in &placements {
-            let mut new_board = board_variant.clone();
-            let lock_result = new_board.lock_piece(p.location);
-
-            print_board(&new_board);
-            println!(
-                "x: {}, y: {}, rotation: {}, tspin: {}, lines cleared: {}, cleared rows: {:?}\n",
-                p.location.x,
-                p.location.y,
-                p.location.kind.1 as u8,
-                format!("{:?}", p.location.tspin),
-                lock_result.cleared_lines.len(),
-                lock_result.cleared_lines
-            );
-
-            let output = Output {
-                x: p.location.x,
-                y: p.location.y,
-                rotation: p.location.kind.1 as u8,
-                inputs: p.inputs.movements.iter().map(|m| format!("{:?}", m)).collect(),
-                tspin: format!("{:?}", p.location.tspin),
-                lines_cleared: lock_result.cleared_lines.len(),
-                cleared_rows: lock_result.cleared_lines.to_vec(),
-                used_hold,
-            };
-
-            scored_candidates.push(((new_board, lock_result.clone(), 0, spawn_piece_type), output.clone()));
-            all_outputs.push(output);
-        }
+    for candidate in &candidates {
+        let p = &candidate.placement;
+        let lock_result = &candidate.lock;
+
+        print_board(&candidate.board);
+        println!(
+            "x: {}, y: {}, rotation: {}, tspin: {}, lines cleared: {}, cleared rows: {:?}\n",
+            p.location.x,
+            p.location.y,
+            p.location.kind.1 as u8,
+            format!("{:?}", p.location.tspin),
+            lock_result.cleared_lines.len(),
+            lock_result.cleared_lines
+        );
+
+        all_outputs.push(Output {
+            x: p.location.x,
+            y: p.location.y,
+            rotation: p.location.kind.1 as u8,
+            inputs: p.inputs.movements.iter().map(|m| format!("{:?}", m)).collect(),
+            tspin: format!("{:?}", p.location.tspin),
+            lines_cleared: lock_result.cleared_lines.len(),
+            cleared_rows: lock_result.cleared_lines.to_vec(),
+            used_hold: candidate.used_hold,
+        });
     }
 
     println!("{}", serde_json::to_string_pretty(&all_outputs).unwrap());
 
-    let (best_board, mut best_output) = scored_candidates
-        .into_iter()
-        .map(|((board, lock, mt, piece), output)| {
-            let (transient, reward) = config.evaluate_board(&board, &lock, mt, piece);
-            let score = transient + reward;
-            (ScoredBoard { board, lock, score }, output)
-        })
-        .max_by_key(|(sb, _)| sb.score)
-        .expect("No valid boards generated");
-
-    if best_output.used_hold {
-        best_output.inputs.insert(0, "Hold".to_string());
-    }
+    let best_inputs = best.input_names();
 
     println!("\nBEST MOVE:");
-    print_board(&best_board.board);
+    print_board(&best.board);
     println!(
         "score: {}, lines cleared: {}, placement kind: {:?} (b2b: {}, combo: {:?}, used hold: {})",
-        best_board.score,
-        best_board.lock.cleared_lines.len(),
-        best_board.lock.placement_kind,
-        best_board.lock.b2b,
-        best_board.lock.combo,
-        best_output.used_hold
+        best_score,
+        best.lock.cleared_lines.len(),
+        best.lock.placement_kind,
+        best.lock.b2b,
+        best.lock.combo,
+        best.used_hold
     );
-    println!("inputs for best move: {:?}", best_output.inputs);
+    println!("inputs for best move: {:?}", best_inputs);
 
     std::fs::write(
         "selected_actions.json",
-        serde_json::to_string_pretty(&best_output.inputs).unwrap(),
+        serde_json::to_string_pretty(&best_inputs).unwrap(),
     )
     .expect("Failed to write selected_actions.json");
 }
@@ -2,6 +2,7 @@ use std::cmp::Ordering;
 use std::collections::{BinaryHeap, HashMap, HashSet};
 
 use arrayvec::ArrayVec;
+use enum_map::EnumMap;
 use serde::{Deserialize, Serialize};
 
 use crate::{Board, FallingPiece, Piece, PieceMovement, PieceState, RotationState, TspinStatus};
@@ -54,161 +55,149 @@ impl PartialOrd for Placement {
     }
 }
 
-pub fn find_moves(board: &Board, mut spawned: FallingPiece, mode: MovementMode) -> Vec<Placement> {
-    let mut locks = HashMap::with_capacity(128);
-    let mut checked = HashSet::with_capacity(128);
-    let mut check_queue = Vec::with_capacity(64);
-    let fast_mode;
+/// Scratch space for `find_moves`, kept between calls so repeated move generation (a long-lived thinker, or
+/// every board of a beam search) reuses its hash tables and queue instead of allocating new ones each time.
+/// The 0G start positions for each piece are also built once, on first use, and kept.
+#[derive(Default)]
+pub struct MoveGenContext {
+    locks: HashMap<FallingPiece, Placement>,
+    checked: HashSet<FallingPiece>,
+    check_queue: Vec<Placement>,
+    starts: EnumMap<Piece, Vec<(FallingPiece, InputList)>>,
+}
 
-    if board.column_heights().iter().all(|&v| v < 16) {
-        // We know that we can reach any column and rotation state without bumping into the terrain
-        // at 0G here, so we can just grab those starting positions.
-        let starts = match mode {
-            MovementMode::TwentyG => vec![(
-                spawned,
-                InputList {
-                    movements: ArrayVec::new(),
-                    time: 0,
-                },
-            )],
-            _ => zero_g_starts(spawned.kind.0),
-        };
-        // Fast mode prevents checking a lot of stack movement that is unlikely (but still could)
-        // to lead to new placements. Use ZeroGComplete to get these missed positions.
-        fast_mode = mode == MovementMode::ZeroG;
-        for (mut place, mut inputs) in starts {
-            let orig_y = place.y;
-            place.sonic_drop(board);
-            if !fast_mode {
-                checked.insert(place);
-            }
-            lock_check(place, &mut locks, inputs.clone());
-            if mode != MovementMode::HardDropOnly {
-                // Initialize stack movement starting positions.
-                inputs.movements.push(PieceMovement::SonicDrop);
-                if mode != MovementMode::TwentyG {
-                    inputs.time += 2 * (orig_y - place.y) as u32;
-                }
-                check_queue.push(Placement {
-                    inputs,
-                    location: place,
-                });
-            }
-        }
-    } else {
-        fast_mode = false;
-        let mut movements = ArrayVec::new();
-        if mode == MovementMode::TwentyG {
-            spawned.sonic_drop(board);
-            movements.push(PieceMovement::SonicDrop);
+impl MoveGenContext {
+    pub fn new() -> Self {
+        MoveGenContext {
+            locks: HashMap::with_capacity(128),
+            checked: HashSet::with_capacity(128),
+            check_queue: Vec::with_capacity(64),
+            starts: EnumMap::default(),
         }
-        checked.insert(spawned);
-        check_queue.push(Placement {
-            inputs: InputList { movements, time: 0 },
-            location: spawned,
-        });
     }
 
-    let mut check_queue = BinaryHeap::from(check_queue);
+    /// Same as the free `find_moves`, reusing this context's allocations.
+    pub fn find_moves(&mut self, board: &Board, mut spawned: FallingPiece, mode: MovementMode) -> Vec<Placement> {
+        let MoveGenContext {
+            locks,
+            checked,
+            check_queue,
+            starts,
+        } = self;
+        locks.clear();
+        checked.clear();
+        check_queue.clear();
+        let fast_mode;
 
-    while let Some(placement) = check_queue.pop() {
-        let moves = placement.inputs;
-        let position = placement.location;
-        if !moves.movements.is_full() {
-            attempt(
-                board,
-                &moves,
-                position,
-                &mut checked,
-                &mut check_queue,
-                mode,
-                fast_mode,
-                PieceMovement::Left,
-                false,
-            );
-            attempt(
-                board,
-                &moves,
-                position,
-                &mut checked,
-                &mut check_queue,
-                mode,
-                fast_mode,
-                PieceMovement::Right,
-                false,
-            );
+        if board.column_heights().iter().all(|&v| v < 16) {
+            // We know that we can reach any column and rotation state without bumping into the terrain
+            // at 0G here, so we can just grab those starting positions.
+            let twenty_g_start;
+            let starts: &[(FallingPiece, InputList)] = match mode {
+                MovementMode::TwentyG => {
+                    twenty_g_start = [(
+                        spawned,
+                        InputList {
+                            movements: ArrayVec::new(),
+                            time: 0,
+                        },
+                    )];
+                    &twenty_g_start
+                }
+                _ => {
+                    let piece_starts = &mut starts[spawned.kind.0];
+                    if piece_starts.is_empty() {
+                        *piece_starts = zero_g_starts(spawned.kind.0);
+                    }
+                    piece_starts
+                }
+            };
+            // Fast mode prevents checking a lot of stack movement that is unlikely (but still could)
+            // to lead to new placements. Use ZeroGComplete to get these missed positions.
+            fast_mode = mode == MovementMode::ZeroG;
+            for (place, inputs) in starts {
+                let (mut place, mut inputs) = (*place, inputs.clone());
+                let orig_y = place.y;
+                place.sonic_drop(board);
+                if !fast_mode {
+                    checked.insert(place);
+                }
+                lock_check(place, locks, inputs.clone());
+                if mode != MovementMode::HardDropOnly {
+                    // Initialize stack movement starting positions.
+                    inputs.movements.push(PieceMovement::SonicDrop);
+                    if mode != MovementMode::TwentyG {
+                        inputs.time += 2 * (orig_y - place.y) as u32;
+                    }
+                    check_queue.push(Placement {
+                        inputs,
+                        location: place,
+                    });
+                }
+            }
+        } else {
+            fast_mode = false;
+            let mut movements = ArrayVec::new();
+            if mode == MovementMode::TwentyG {
+                spawned.sonic_drop(board);
+                movements.push(PieceMovement::SonicDrop);
+            }
+            checked.insert(spawned);
+            check_queue.push(Placement {
+                inputs: InputList { movements, time: 0 },
+                location: spawned,
+            });
+        }
 
-            if position.kind.0 != Piece::O {
-                attempt(
-                    board,
-                    &moves,
-                    position,
-                    &mut checked,
-                    &mut check_queue,
-                    mode,
-                    fast_mode,
-                    PieceMovement::Cw,
-                    false,
-                );
+        // Heapify the starting positions all at once, as before, so equal-cost paths come out in the same order.
+        // The heap hands its (now empty) buffer back afterwards.
+        let mut heap = BinaryHeap::from(std::mem::take(check_queue));
 
-                attempt(
-                    board,
-                    &moves,
-                    position,
-                    &mut checked,
-                    &mut check_queue,
-                    mode,
-                    fast_mode,
-                    PieceMovement::Ccw,
-                    false,
-                );
-            }
+        while let Some(placement) = heap.pop() {
+            let moves = placement.inputs;
+            let position = placement.location;
+            if !moves.movements.is_full() {
+                let mut try_input = |input, repeat| {
+                    attempt(board, &moves, position, checked, &mut heap, mode, fast_mode, input, repeat);
+                };
+                try_input(PieceMovement::Left, false);
+                try_input(PieceMovement::Right, false);
 
-            if mode == MovementMode::ZeroG {
-                attempt(
-                    board,
-                    &moves,
-                    position,
-                    &mut checked,
-                    &mut check_queue,
-                    mode,
-                    fast_mode,
-                    PieceMovement::Left,
-                    true,
-                );
+                if position.kind.0 != Piece::O {
+                    try_input(PieceMovement::Cw, false);
+                    try_input(PieceMovement::Ccw, false);
+                }
 
-                attempt(
-                    board,
-                    &moves,
-                    position,
-                    &mut checked,
-                    &mut check_queue,
-                    mode,
-                    fast_mode,
-                    PieceMovement::Right,
-                    true,
-                );
+                if mode == MovementMode::ZeroG {
+                    try_input(PieceMovement::Left, true);
+                    try_input(PieceMovement::Right, true);
+                }
+
+                try_input(PieceMovement::SonicDrop, false);
             }
 
-            attempt(
-                board,
-                &moves,
-                position,
-                &mut checked,
-                &mut check_queue,
-                mode,
-                fast_mode,
-                PieceMovement::SonicDrop,
-                false,
-            );
+            let mut position = position;
+            position.sonic_drop(board);
+            lock_check(position, locks, moves);
         }
 
-        let mut position = position;
-        position.sonic_drop(board);
-        lock_check(position, &mut locks, moves);
+        *check_queue = heap.into_vec();
+
+        // HashMap order is seeded per process. Sort it away so equal-scoring placements are broken the same way by
+        // every entry point (cargo run, --serve, the library) and every run.
+        let mut placements: Vec<Placement> = locks.drain().map(|(_, v)| v).collect();
+        placements.sort_unstable_by_key(|p| {
+            let location = p.location;
+            (location.kind.1 as u8, location.x, location.y, location.tspin as u8)
+        });
+        placements
     }
+}
 
-    locks.into_iter().map(|(_, v)| v).collect()
+/// Every placement reachable from `spawned` on `board`, each with its fastest input sequence.
+/// Use a `MoveGenContext` instead when generating moves over and over.
+pub fn find_moves(board: &Board, spawned: FallingPiece, mode: MovementMode) -> Vec<Placement> {
+    MoveGenContext::new().find_moves(board, spawned, mode)
 }
 
 fn lock_check(piece: FallingPiece, locks: &mut HashMap<FallingPiece, Placement>, moves: InputList) {
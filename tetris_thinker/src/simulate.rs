@@ -0,0 +1,406 @@
+use std::collections::VecDeque;
+use std::sync::atomic::{AtomicUsize, Ordering};
+use std::sync::Mutex;
+
+use enumset::EnumSet;
+use serde::{Deserialize, Serialize};
+
+use crate::evaluate::Standard;
+use crate::beam::{search, BeamConfig};
+use crate::{Board, CellColor, MoveGenContext, FallingPiece, Piece, PieceState, RotationState, TspinStatus};
+
+// Whole Blitz games played inside the thinker, for fitness evaluation without a round trip per piece.
+// The game follows TetrisGame: the same 7-bag sequence for a seed, a 5-piece queue, TetrisGame.score_clear's
+// scoring, a piece budget, and topping out when the next piece can't spawn. Every turn the thinker sees the board
+// the JSON path would build from game_state_to_dict(), so it picks the moves it would pick playing the Python game.
+// Drop points aren't scored (TetrisGame.apply_placement leaves them out too).
+
+/// Height of TetrisGame's matrix. Cells locked above it are lost, as they are in the Python game.
+pub const MATRIX_ROWS: i32 = 24;
+/// Pieces shown in the next queue.
+pub const QUEUE_LENGTH: usize = 5;
+
+/// TetrisGame's full_bag order, which is also `Piece` order.
+const FULL_BAG: [Piece; 7] = [Piece::I, Piece::O, Piece::T, Piece::L, Piece::J, Piece::S, Piece::Z];
+
+/// CPython's `random.Random` (MT19937, seeded from an int), as far as `sample` needs it.
+pub struct PythonRandom {
+    mt: [u32; 624],
+    index: usize,
+}
+
+impl PythonRandom {
+    pub fn new(seed: u64) -> Self {
+        // random.seed(int) feeds the seed's 32-bit words, least significant first, to init_by_array
+        let key: Vec<u32> = if seed >> 32 == 0 {
+            vec![seed as u32]
+        } else {
+            vec![seed as u32, (seed >> 32) as u32]
+        };
+
+        let mut mt = [0u32; 624];
+        mt[0] = 19650218;
+        for i in 1..624 {
+            mt[i] = 1812433253u32
+                .wrapping_mul(mt[i - 1] ^ (mt[i - 1] >> 30))
+                .wrapping_add(i as u32);
+        }
+
+        let mut i = 1;
+        let mut j = 0;
+        for _ in 0..624usize.max(key.len()) {
+            mt[i] = (mt[i] ^ (mt[i - 1] ^ (mt[i - 1] >> 30)).wrapping_mul(1664525))
+                .wrapping_add(key[j])
+                .wrapping_add(j as u32);
+            i += 1;
+            j += 1;
+            if i >= 624 {
+                mt[0] = mt[623];
+                i = 1;
+            }
+            if j >= key.len() {
+                j = 0;
+            }
+        }
+        for _ in 0..623 {
+            mt[i] = (mt[i] ^ (mt[i - 1] ^ (mt[i - 1] >> 30)).wrapping_mul(1566083941))
+                .wrapping_sub(i as u32);
+            i += 1;
+            if i >= 624 {
+                mt[0] = mt[623];
+                i = 1;
+            }
+        }
+        mt[0] = 0x80000000;
+
+        PythonRandom { mt, index: 624 }
+    }
+
+    pub fn next_u32(&mut self) -> u32 {
+        if self.index >= 624 {
+            for k in 0..624 {
+                let y = (self.mt[k] & 0x80000000) | (self.mt[(k + 1) % 624] & 0x7fffffff);
+                self.mt[k] = self.mt[(k + 397) % 624] ^ (y >> 1) ^ (if y & 1 != 0 { 0x9908b0df } else { 0 });
+            }
+            self.index = 0;
+        }
+        let mut y = self.mt[self.index];
+        self.index += 1;
+        y ^= y >> 11;
+        y ^= (y << 7) & 0x9d2c5680;
+        y ^= (y << 15) & 0xefc60000;
+        y ^= y >> 18;
+        y
+    }
+
+    /// `_randbelow`: getrandbits(n.bit_length()) until the result is below n.
+    pub fn below(&mut self, n: u32) -> u32 {
+        let bits = 32 - n.leading_zeros();
+        loop {
+            let r = self.next_u32() >> (32 - bits);
+            if r < n {
+                return r;
+            }
+        }
+    }
+
+    /// `random.sample(full_bag, 7)`, the shuffle TetrisGame.refill_bag uses.
+    pub fn shuffled_bag(&mut self) -> [Piece; 7] {
+        let mut pool = FULL_BAG;
+        let mut bag = FULL_BAG;
+        for i in 0..7 {
+            let j = self.below(7 - i as u32) as usize;
+            bag[i] = pool[j];
+            pool[j] = pool[6 - i];
+        }
+        bag
+    }
+}
+
+/// The pieces of a seeded TetrisGame in the order they enter the next queue. refill_bag keeps two bags ahead,
+/// but they are drawn in the order they are used, so one bag at a time gives the same sequence.
+pub struct PieceSequence {
+    rng: PythonRandom,
+    bag: [Piece; 7],
+    position: usize,
+}
+
+impl PieceSequence {
+    pub fn new(seed: u64) -> Self {
+        PieceSequence {
+            rng: PythonRandom::new(seed),
+            bag: FULL_BAG,
+            position: 7,
+        }
+    }
+
+    pub fn next(&mut self) -> Piece {
+        if self.position == 7 {
+            self.bag = self.rng.shuffled_bag();
+            self.position = 0;
+        }
+        self.position += 1;
+        self.bag[self.position - 1]
+    }
+
+    /// Pieces of the current bag not yet in the queue (TetrisGame.primary_bag).
+    pub fn remaining(&self) -> EnumSet<Piece> {
+        self.bag[self.position..].iter().copied().collect()
+    }
+}
+
+/// TetrisGame.score_clear: the points added to the score for one lock and the B2B state afterwards.
+pub fn score_clear(num_cleared: usize, tspin: TspinStatus, perfect_clear: bool, has_b2b: bool, combo: u32) -> (i64, bool) {
+    use TspinStatus::*;
+
+    // (value before multipliers, B2B afterwards, flat B2B bonus replacing the 1.5x multiplier)
+    let (value, b2b, unique_b2b) = match (num_cleared, tspin, perfect_clear) {
+        (0, Mini, _) => (100, has_b2b, 0),
+        (0, Full, _) => (400, has_b2b, 0),
+        (0, None, _) => (0, has_b2b, 0),
+        (1, _, true) => (900, false, 0),
+        (1, None, false) => (100, false, 0),
+        (1, Mini, false) => (200, true, 0),
+        (1, Full, false) => (800, true, 0),
+        (2, _, true) => (1500, false, 0),
+        (2, None, false) => (300, false, 0),
+        (2, Mini, false) => (400, true, 0),
+        (2, Full, false) => (1200, true, 0),
+        (3, None, false) => (500, false, 0),
+        (3, _, false) => (1600, true, 0),
+        (3, None, true) => (2300, false, 0),
+        (3, _, true) => (3400, true, 800),
+        (4, _, false) => (800, true, 0),
+        (4, _, true) => (2800, true, 1200),
+        _ => (0, has_b2b, 0),
+    };
+
+    let points = if !has_b2b || !b2b {
+        value
+    } else if unique_b2b == 0 {
+        value * 3 / 2 // Every value is a multiple of 100, so this is exact
+    } else {
+        value + unique_b2b
+    };
+    (points + 50 * combo as i64, b2b)
+}
+
+/// One placement of a simulated game, in TetrisGame terms: cells are (row, col) in the 24-row grid
+/// (rows above it are negative), and `hold` means hold was pressed before placing.
+#[derive(Clone, Debug, Serialize, Deserialize)]
+pub struct SimulatedPlacement {
+    pub piece: Piece,
+    pub cells: [(i32, i32); 4],
+    pub tspin: TspinStatus,
+    pub hold: bool,
+    pub inputs: Vec<String>,
+}
+
+#[derive(Copy, Clone, Debug, Eq, PartialEq, Serialize, Deserialize)]
+pub enum GameEnd {
+    /// Every piece of the budget was placed.
+    Budget,
+    /// The next piece couldn't spawn.
+    ToppedOut,
+    /// The thinker found no placement for the current piece.
+    NoMove,
+}
+
+#[derive(Clone, Debug, Serialize, Deserialize)]
+pub struct SimulationResult {
+    pub seed: u64,
+    pub score: i64,
+    pub lines: u32,
+    pub pieces: u32,
+    pub singles: u32,
+    pub doubles: u32,
+    pub triples: u32,
+    pub tetrises: u32,
+    pub tspins: u32,
+    pub mini_tspins: u32,
+    pub perfect_clears: u32,
+    pub b2b_clears: u32,
+    pub max_combo: u32,
+    pub end: GameEnd,
+    /// Filled in when the simulation is asked to record placements.
+    pub placements: Vec<SimulatedPlacement>,
+}
+
+/// Where TetrisGame.spawn_piece puts a piece: the thinker's north orientation at x 4, one row higher for the I.
+fn python_spawn(piece: Piece) -> FallingPiece {
+    FallingPiece {
+        kind: PieceState(piece, RotationState::North),
+        x: 4,
+        y: if piece == Piece::I { 21 } else { 20 },
+        tspin: TspinStatus::None,
+    }
+}
+
+fn spawn_fits(field: &[[bool; 10]; 40], piece: Piece) -> bool {
+    python_spawn(piece).cells().iter().all(|&(x, y)| !field[y as usize][x as usize])
+}
+
+/// Plays one Blitz game of at most `piece_budget` pieces from the bag seeded with `seed`, choosing each move with
+/// `beam` lookahead (depth 1 plays exactly as `think` does).
+pub fn simulate_blitz(config: &Standard, beam: &BeamConfig, seed: u64, piece_budget: u32, record: bool) -> SimulationResult {
+    let mut sequence = PieceSequence::new(seed);
+    let mut field = [[false; 10]; 40];
+    let mut queue: VecDeque<Piece> = (0..QUEUE_LENGTH).map(|_| sequence.next()).collect();
+    let mut current = queue.pop_front().unwrap();
+    queue.push_back(sequence.next());
+    let mut hold: Option<Piece> = None;
+    let mut b2b = false;
+    let mut combo = 0;
+    let mut context = MoveGenContext::new(); // Move generation buffers, reused for every turn of the game
+
+    let mut result = SimulationResult {
+        seed,
+        score: 0,
+        lines: 0,
+        pieces: 0,
+        singles: 0,
+        doubles: 0,
+        triples: 0,
+        tetrises: 0,
+        tspins: 0,
+        mini_tspins: 0,
+        perfect_clears: 0,
+        b2b_clears: 0,
+        max_combo: 0,
+        end: GameEnd::Budget,
+        placements: Vec::new(),
+    };
+
+    while result.pieces < piece_budget {
+        // The board the JSON path would build from this state
+        let mut board = Board::new_with_state(field, sequence.remaining(), hold, b2b, combo);
+        for &piece in &queue {
+            board.add_next_piece(piece);
+        }
+
+        let (best, _) = match search(&mut context, &board, current, config, beam) {
+            Some(best) => best,
+            None => {
+                result.end = GameEnd::NoMove;
+                break;
+            }
+        };
+
+        let inputs = if record { best.input_names() } else { Vec::new() };
+
+        // Holding with an empty hold brings the next piece out of the queue
+        if best.used_hold {
+            if hold.is_none() {
+                queue.pop_front();
+                queue.push_back(sequence.next());
+            }
+            hold = Some(current);
+        }
+
+        // The thinker's board already has the piece locked and its lines cleared. Rows that came down from above
+        // the matrix only hold cells TetrisGame would have dropped.
+        let mut locked = best.board;
+        let num_cleared = best.lock.cleared_lines.len();
+        for y in MATRIX_ROWS - num_cleared as i32..40 {
+            for x in 0..10 {
+                if locked.occupied(x, y) {
+                    locked.set_cell_color(x, y, CellColor::Empty);
+                }
+            }
+        }
+        field = locked.get_field();
+        let perfect_clear = num_cleared > 0 && locked.column_heights().iter().all(|&h| h == 0);
+
+        // Score it like TetrisGame.apply_placement
+        let tspin = if best.piece == Piece::T { best.placement.location.tspin } else { TspinStatus::None };
+        if num_cleared == 0 {
+            combo = 0;
+        }
+        let has_b2b = b2b;
+        let (points, new_b2b) = score_clear(num_cleared, tspin, perfect_clear, has_b2b, combo);
+        result.score += points;
+        b2b = new_b2b;
+        if num_cleared > 0 {
+            combo += 1;
+            result.max_combo = result.max_combo.max(combo - 1);
+            if has_b2b && b2b {
+                result.b2b_clears += 1;
+            }
+        }
+
+        result.lines += num_cleared as u32;
+        result.pieces += 1;
+        match num_cleared {
+            1 => result.singles += 1,
+            2 => result.doubles += 1,
+            3 => result.triples += 1,
+            4 => result.tetrises += 1,
+            _ => {}
+        }
+        match tspin {
+            TspinStatus::Full => result.tspins += 1,
+            TspinStatus::Mini => result.mini_tspins += 1,
+            TspinStatus::None => {}
+        }
+        if perfect_clear {
+            result.perfect_clears += 1;
+        }
+
+        if record {
+            let mut cells = best.placement.location.cells();
+            for cell in cells.iter_mut() {
+                *cell = (MATRIX_ROWS - 1 - cell.1, cell.0);
+            }
+            result.placements.push(SimulatedPlacement {
+                piece: best.piece,
+                cells,
+                tspin,
+                hold: best.used_hold,
+                inputs,
+            });
+        }
+
+        // Next piece, as spawn_piece brings it in
+        current = queue.pop_front().unwrap();
+        queue.push_back(sequence.next());
+        if result.pieces < piece_budget && !spawn_fits(&field, current) {
+            result.end = GameEnd::ToppedOut;
+            break;
+        }
+    }
+
+    result
+}
+
+/// Plays every (weight set, seed) game, spread over `threads` OS threads, and returns the results as a
+/// configs × seeds matrix. Threads take the next unplayed game as they finish one, so long and short games balance out.
+pub fn simulate_batch(
+    configs: &[Standard],
+    beam: &BeamConfig,
+    seeds: &[u64],
+    piece_budget: u32,
+    threads: usize,
+) -> Vec<Vec<SimulationResult>> {
+    let games = configs.len() * seeds.len();
+    let next_game = AtomicUsize::new(0);
+    let finished: Mutex<Vec<Option<SimulationResult>>> = Mutex::new(vec![None; games]);
+
+    std::thread::scope(|scope| {
+        for _ in 0..threads.max(1).min(games) {
+            scope.spawn(|| loop {
+                let game = next_game.fetch_add(1, Ordering::Relaxed);
+                if game >= games {
+                    break;
+                }
+                let result = simulate_blitz(&configs[game / seeds.len()], beam, seeds[game % seeds.len()], piece_budget, false);
+                finished.lock().unwrap()[game] = Some(result);
+            });
+        }
+    });
+
+    let mut finished = finished.into_inner().unwrap().into_iter().map(|result| result.unwrap());
+    configs
+        .iter()
+        .map(|_| (0..seeds.len()).map(|_| finished.next().unwrap()).collect())
+        .collect()
+}
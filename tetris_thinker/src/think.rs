@@ -0,0 +1,103 @@
+use crate::evaluate::Standard;
+use crate::{Board, LockResult, MoveGenContext, MovementMode, Piece, Placement, SpawnRule};
+
+/// One placement the thinker can make this turn, with the board and lock result it leaves behind.
+#[derive(Clone, Debug)]
+pub struct Candidate {
+    pub piece: Piece,
+    pub placement: Placement,
+    pub used_hold: bool,
+    pub board: Board,
+    pub lock: LockResult,
+}
+
+impl Candidate {
+    /// The inputs that play this placement, as the Python side names them ("Hold" first when it's used).
+    /// The hard drop that locks the piece is left implicit.
+    pub fn input_names(&self) -> Vec<String> {
+        let mut names = Vec::with_capacity(self.placement.inputs.movements.len() + 1);
+        if self.used_hold {
+            names.push("Hold".to_string());
+        }
+        names.extend(self.placement.inputs.movements.iter().map(|m| format!("{:?}", m)));
+        names
+    }
+}
+
+/// Every placement of `piece` on `board`, followed by every placement of the piece holding would bring in
+/// (the hold piece, or the first next piece if the hold is empty) when that is a different piece that can spawn.
+pub fn candidates(board: &Board, piece: Piece) -> Vec<Candidate> {
+    candidates_with(&mut MoveGenContext::new(), board, piece)
+}
+
+/// `candidates`, generating moves with `context` so its allocations carry over from call to call.
+pub fn candidates_with(context: &mut MoveGenContext, board: &Board, piece: Piece) -> Vec<Candidate> {
+    let mut spawn_candidates = vec![(piece, board.clone(), false)];
+
+    let hold_swap = match board.hold_piece {
+        Some(hold_piece) if hold_piece != piece => Some(hold_piece),
+        None => board.get_next_piece().ok(),
+        _ => None,
+    };
+    if let Some(swapped_piece) = hold_swap {
+        let mut swapped_board = board.clone();
+        swapped_board.hold_piece = Some(piece);
+        if SpawnRule::Row19Or20.spawn(swapped_piece, &swapped_board).is_some() {
+            spawn_candidates.push((swapped_piece, swapped_board, true));
+        }
+    }
+
+    let mut candidates = Vec::new();
+    for (spawn_piece_type, board_variant, used_hold) in spawn_candidates {
+        let spawned = match SpawnRule::Row19Or20.spawn(spawn_piece_type, &board_variant) {
+            Some(spawned) => spawned,
+            None => continue,
+        };
+
+        for placement in context.find_moves(&board_variant, spawned, MovementMode::ZeroG) {
+            let mut new_board = board_variant.clone();
+            let lock = new_board.lock_piece(placement.location);
+            candidates.push(Candidate {
+                piece: spawn_piece_type,
+                placement,
+                used_hold,
+                board: new_board,
+                lock,
+            });
+        }
+    }
+    candidates
+}
+
+/// `Standard::evaluate_board` of a candidate's resulting board: (transient, reward).
+pub fn evaluate(config: &Standard, candidate: &Candidate) -> (i32, i32) {
+    config.evaluate_board(&candidate.board, &candidate.lock, 0, candidate.piece)
+}
+
+/// Evaluation of a candidate's resulting board (transient + reward), the score the thinker maximizes.
+pub fn score(config: &Standard, candidate: &Candidate) -> i32 {
+    let (transient, reward) = evaluate(config, candidate);
+    transient + reward
+}
+
+/// The `k` best candidates with their (transient, reward) evaluations, best first.
+pub fn top_k<'a>(candidates: &'a [Candidate], config: &Standard, k: usize) -> Vec<(&'a Candidate, (i32, i32))> {
+    let mut ranked: Vec<_> = candidates.iter().map(|candidate| (candidate, evaluate(config, candidate))).collect();
+    ranked.sort_by_key(|&(_, (transient, reward))| std::cmp::Reverse(transient + reward));
+    ranked.truncate(k);
+    ranked
+}
+
+/// The best-scoring candidate and its score. Ties go to the later candidate, as they always have in main.rs.
+pub fn choose<'a>(candidates: &'a [Candidate], config: &Standard) -> Option<(&'a Candidate, i32)> {
+    candidates
+        .iter()
+        .map(|candidate| (candidate, score(config, candidate)))
+        .max_by_key(|&(_, score)| score)
+}
+
+/// Picks a move for `piece` on `board`: the candidate with the best evaluation under `config`.
+pub fn think(board: &Board, piece: Piece, config: &Standard) -> Option<(Candidate, i32)> {
+    let candidates = candidates(board, piece);
+    choose(&candidates, config).map(|(best, score)| (best.clone(), score))
+}
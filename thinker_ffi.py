@@ -0,0 +1,157 @@
+import os
+import sys
+import ctypes
+
+import srs
+
+# In-process tetris_thinker. The crate also builds as a shared library (cdylib) with a small C ABI (src/ffi.rs), which
+# this loads with ctypes: no input.json, no weights.json and no `cargo run` per piece. Build it once with
+#   cargo build --release        (in tetris_thinker/)
+# then:
+#   thinker = Thinker(weights)             # The 44-entry list weights_to_json takes
+#   inputs, score = thinker.think(game)    # inputs as unpack_game_actions returns them ("Hold" first, if used)
+#   Thinker(weights, search={"depth": 3})  # Look 3 pieces ahead through the next queue (src/beam.rs)
+
+PIECES = ["I", "O", "T", "L", "J", "S", "Z"]  # Piece codes in ffi.rs
+PIECE_CODES = {piece: code for code, piece in enumerate(PIECES)}
+INPUT_NAMES = ["Hold", "Left", "Right", "Ccw", "Cw", "SonicDrop"]  # Input codes in ffi.rs
+
+NUM_WEIGHTS = 44
+FIELD_ROWS = 40  # The thinker's field height; rows above the 24-row matrix are always empty
+MAX_INPUTS = 64  # find_moves caps sequences at 32 movements, plus the hold
+
+# Beam search settings (BeamConfig in src/beam.rs). Depth 1 is the plain one-piece choice; time_limit_ms 0 is no limit.
+DEFAULT_SEARCH = {"depth": 1, "width": 16, "max_nodes": 100_000, "time_limit_ms": 0}
+
+# thinker_think's negative return values
+THINK_ERRORS = {-1: "no placement available", -2: "bad argument", -3: "input buffer too small", -4: "thinker panicked"}
+
+# The cdylib is named after the crate ("libtetris"), with the platform's prefix and extension
+LIBRARY_NAMES = {"win32": "libtetris.dll", "darwin": "liblibtetris.dylib"}
+LIBRARY_NAME = LIBRARY_NAMES.get(sys.platform, "liblibtetris.so")
+THINKER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tetris_thinker")
+
+_library = None
+
+
+def library_path(profile = "release"):
+    """Where cargo puts the shared library for a build profile."""
+    return os.path.join(THINKER_DIR, "target", profile, LIBRARY_NAME)
+
+
+def load_library(path = None):
+    """Loads the thinker library once per process (release build by default) and declares its C signatures.
+    Raises OSError if it hasn't been built."""
+    global _library
+    if _library is not None and path is None:
+        return _library
+
+    library = ctypes.CDLL(path or library_path())
+    library.thinker_create.argtypes = [ctypes.POINTER(ctypes.c_int32), ctypes.c_size_t]
+    library.thinker_create.restype = ctypes.c_void_p
+    library.thinker_free.argtypes = [ctypes.c_void_p]
+    library.thinker_free.restype = None
+    library.thinker_set_search.argtypes = [ctypes.c_void_p, ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint64, ctypes.c_uint64]
+    library.thinker_set_search.restype = ctypes.c_int32
+    library.thinker_think.argtypes = [
+        ctypes.c_void_p,                    # thinker
+        ctypes.POINTER(ctypes.c_uint16),    # field, 40 rows bottom first
+        ctypes.c_int32,                     # piece
+        ctypes.POINTER(ctypes.c_int32),     # next queue
+        ctypes.c_size_t,                    # next queue length
+        ctypes.c_int32,                     # hold (-1 for none)
+        ctypes.c_uint8,                     # remaining bag, one bit per piece code
+        ctypes.c_bool,                      # b2b
+        ctypes.c_uint32,                    # combo
+        ctypes.POINTER(ctypes.c_uint8),     # out: input codes
+        ctypes.c_size_t,                    # out: capacity
+        ctypes.POINTER(ctypes.c_int32),     # out: score
+    ]
+    library.thinker_think.restype = ctypes.c_int32
+
+    if path is None:
+        _library = library
+    return library
+
+
+def library_available(path = None):
+    """True if the shared library has been built and loads."""
+    try:
+        load_library(path)
+        return True
+    except OSError:
+        return False
+
+
+def pack_field(grid):
+    """Packs a TetrisGame grid the way game_state_to_dict lays out its field (bottom row first, 40 rows),
+    as one u16 per row with bit c set when column c is filled."""
+    field = (ctypes.c_uint16 * FIELD_ROWS)()
+    for y, mask in enumerate(reversed(srs.row_masks(grid != "X"))):
+        field[y] = mask
+    return field
+
+
+class Thinker:
+    """One weight set loaded into the thinker library. Reuse it for every move of an episode.
+    `search` overrides DEFAULT_SEARCH keys to look further ahead."""
+
+    def __init__(self, weights, path = None, search = None):
+        if len(weights) != NUM_WEIGHTS:
+            raise ValueError(f"Expected {NUM_WEIGHTS} weights, got {len(weights)}")
+        self.library = load_library(path)
+        self.handle = self.library.thinker_create((ctypes.c_int32 * NUM_WEIGHTS)(*(int(w) for w in weights)), NUM_WEIGHTS)
+        if not self.handle:
+            raise RuntimeError("thinker_create rejected the weights")
+        if search:
+            self.set_search(**search)
+
+        # Reused across calls
+        self.inputs = (ctypes.c_uint8 * MAX_INPUTS)()
+        self.score = ctypes.c_int32()
+
+    def set_search(self, depth = 1, width = 16, max_nodes = 100_000, time_limit_ms = 0):
+        """Sets the lookahead for later think() calls (see DEFAULT_SEARCH)."""
+        if self.library.thinker_set_search(self.handle, depth, width, max_nodes, time_limit_ms) != 0:
+            raise ValueError("depth and width must be at least 1")
+
+    def think(self, game):
+        """Chooses a move for the current state of a TetrisGame, as a `cargo run` on its game_state_to_dict() would.
+        Returns (inputs, score): the input names to play before the hard drop, and the thinker's evaluation."""
+        next_queue = (ctypes.c_int32 * len(game.next_queue))(*(PIECE_CODES[piece] for piece in game.next_queue))
+        bag = 0
+        for piece in game.primary_bag:
+            bag |= 1 << PIECE_CODES[piece]
+
+        count = self.library.thinker_think(
+            self.handle,
+            pack_field(game.grid),
+            PIECE_CODES[game.current_piece_type],
+            next_queue,
+            len(next_queue),
+            PIECE_CODES[game.held_piece] if game.held_piece is not None else -1,
+            bag,
+            bool(game.b2b),
+            int(game.clear_combo),
+            self.inputs,
+            MAX_INPUTS,
+            ctypes.byref(self.score),
+        )
+        if count < 0:
+            raise RuntimeError(f"thinker_think failed: {THINK_ERRORS.get(count, count)}")
+
+        return [INPUT_NAMES[code] for code in self.inputs[:count]], self.score.value
+
+    def close(self):
+        if self.handle:
+            self.library.thinker_free(self.handle)
+            self.handle = None
+
+    def __del__(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
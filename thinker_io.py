@@ -0,0 +1,139 @@
+import os
+import json
+import subprocess
+from contextlib import contextmanager
+
+# File I/O shared by everything that drives tetris_thinker through input.json / weights.json / selected_actions.json.
+
+def weights_to_json(filename, weight_list):
+
+    weight_dict = {
+    "back_to_back": weight_list[0],
+    "bumpiness": weight_list[1],
+    "bumpiness_sq": weight_list[2],
+    "row_transitions": weight_list[3],
+    "height": weight_list[4],
+    "top_half": weight_list[5],
+    "top_quarter": weight_list[6],
+    "jeopardy": weight_list[7],
+    "cavity_cells": weight_list[8],
+    "cavity_cells_sq": weight_list[9], 
+    "overhang_cells": weight_list[10], 
+    "overhang_cells_sq": weight_list[11], 
+    "covered_cells": weight_list[12],
+    "covered_cells_sq": weight_list[13],
+    "tslot": weight_list[14:18], 
+    "well_depth": weight_list[18],
+    "max_well_depth": weight_list[19],
+    "well_column": weight_list[20:30],
+
+    "move_time": weight_list[30],
+    "wasted_t": weight_list[31],
+    "b2b_clear": weight_list[32],
+    "clear1": weight_list[33],
+    "clear2": weight_list[34],
+    "clear3": weight_list[35],
+    "clear4": weight_list[36],
+    "tspin1": weight_list[37],
+    "tspin2": weight_list[38],
+    "tspin3": weight_list[39], 
+    "mini_tspin1": weight_list[40],
+    "mini_tspin2": weight_list[41],
+    "perfect_clear": weight_list[42],
+    "combo_garbage": weight_list[43]
+    }
+    
+    formatted_json = json.dumps(weight_dict, indent = 2)
+
+    with open(filename, "w") as f:
+        f.write(formatted_json)
+
+def weights_from_json(filename):
+    """Inverse of weights_to_json: the flat 44-entry weight list from a weights.json-style file."""
+    with open(filename) as f:
+        saved = json.load(f)
+
+    names = ["back_to_back", "bumpiness", "bumpiness_sq", "row_transitions", "height", "top_half", "top_quarter",
+             "jeopardy", "cavity_cells", "cavity_cells_sq", "overhang_cells", "overhang_cells_sq", "covered_cells",
+             "covered_cells_sq", "tslot", "well_depth", "max_well_depth", "well_column", "move_time", "wasted_t",
+             "b2b_clear", "clear1", "clear2", "clear3", "clear4", "tspin1", "tspin2", "tspin3", "mini_tspin1",
+             "mini_tspin2", "perfect_clear", "combo_garbage"]
+    weight_list = []
+    for name in names:
+        if isinstance(saved[name], list):  # tslot and well_column
+            weight_list.extend(saved[name])
+        else:
+            weight_list.append(saved[name])
+    return weight_list
+
+def write_compact_field_json(filename, game_state):
+    # Manually extract and format the 'field' array
+    field = game_state.pop("field")  # Temporarily remove it from the dict
+
+    # Serialize the field with compact row formatting
+    field_str = '  "field": [\n'
+    for i, row in enumerate(field):
+        row_str = "    " + json.dumps(row)
+        if i != len(field) - 1:
+            row_str += ","
+        field_str += row_str + "\n"
+    field_str += "  ],"  # <--- Add comma here to separate from next key
+
+    # Serialize the rest of the dictionary as normal
+    partial_json = json.dumps(game_state, indent=2)
+
+    # Insert field block after the opening brace
+    lines = partial_json.splitlines()
+    lines.insert(1, field_str)
+    final_json = "\n".join(lines)
+
+    # Write to file
+    with open(filename, "w") as f:
+        f.write(final_json)
+
+def unpack_game_actions(filename):
+    with open(filename, "r") as f:
+        return json.load(f)
+
+# Command-line flags for each beam search setting (thinker_ffi.DEFAULT_SEARCH keys)
+SEARCH_FLAGS = {"depth": "--depth", "width": "--beam-width", "max_nodes": "--max-nodes", "time_limit_ms": "--time-ms"}
+
+
+def run_quiet_thinker(game_state, top_k = 0, thinker_dir = "tetris_thinker", search = None):
+    """Writes game_state (game_state_to_dict()) to input.json and runs the thinker with --quiet, using the weights.json
+    already in place. Returns its output: {"best": {...}, "candidates": [...]}, where each entry has the move's inputs
+    ("Hold" first, if used), where it lands, and its evaluation (transient, reward, score). candidates holds the top_k
+    best placements, best first, for lookahead on the Python side. `search` (e.g. {"depth": 3}) has the thinker look
+    ahead through the next queue itself; "best" is then the first placement of the best line."""
+    write_compact_field_json(f"{thinker_dir}/input.json", game_state)
+    command = ["cargo", "run", "--quiet", "--", "--quiet"]
+    if top_k:
+        command += ["--top-k", str(top_k)]
+    for key, value in (search or {}).items():
+        command += [SEARCH_FLAGS[key], str(value)]
+    completed = subprocess.run(command, cwd=thinker_dir, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout)
+
+
+def thinker_files(thinker_dir = "tetris_thinker"):
+    """The files in thinker_dir that driving the thinker through JSON writes over."""
+    return [f"{thinker_dir}/{name}" for name in ("weights.json", "input.json", "selected_actions.json")]
+
+
+@contextmanager
+def restored_files(paths):
+    """Puts the listed files back as they were (contents, or absence) when the block exits."""
+    saved = {}
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                saved[path] = f.read()
+    try:
+        yield
+    finally:
+        for path in paths:
+            if path in saved:
+                with open(path, "wb") as f:
+                    f.write(saved[path])
+            elif os.path.exists(path):
+                os.remove(path)
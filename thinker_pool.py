@@ -0,0 +1,183 @@
+import os
+import json
+import math
+import asyncio
+import argparse
+import multiprocessing
+
+import numpy as np
+
+from thinker_ffi import THINKER_DIR
+from thinker_sim import thinker_command, search_job
+from thinker_io import weights_from_json
+from headless_play import new_game, apply_input_sequence
+
+# Many Blitz games at once, each driving its own resident thinker. `libtetris --serve` keeps running and answers one
+# game state per stdin line, so a game never waits on a process start or on input.json. An asyncio loop plays the
+# Python side of its games in turn while their thinkers compute. The Python side of a move (input replay, line clears,
+# the state dict) costs about as much as a shallow search, so one loop only keeps a few thinkers busy: the games are
+# sharded across worker processes, each with its own loop and its own slice of the thinkers:
+#   fitness = evaluate_population(weight_sets, seeds=[1, 2, 3])    # fitness[i][j]: score of weight set i on seed j
+#   python thinker_pool.py --seeds 8 --processes 8                  # Mean score of one weights file over 8 seeds
+# Unlike thinker_sim's --batch, the games are played by TetrisGame itself, so scores include drop points.
+
+THINKERS_PER_WORKER = 4  # Resident thinkers one event loop is given by default
+GAME_ATTEMPTS = 2  # A game whose thinker fails is replayed on a fresh thinker before the evaluation gives up
+
+
+class ThinkerProcess:
+    """One `libtetris --serve` subprocess. Games take turns owning it, one game at a time."""
+
+    def __init__(self, process):
+        self.process = process
+
+    @classmethod
+    async def start(cls):
+        process = await asyncio.create_subprocess_exec(
+            *thinker_command("--serve"),
+            cwd=THINKER_DIR,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        return cls(process)
+
+    async def request(self, message):
+        """Sends one request line and waits for the reply line."""
+        self.process.stdin.write((json.dumps(message) + "\n").encode())
+        await self.process.stdin.drain()
+        line = await self.process.stdout.readline()
+        if not line:
+            raise RuntimeError(f"tetris_thinker --serve exited with code {await self.process.wait()}")
+        return json.loads(line)
+
+    async def configure(self, weights, search = None):
+        """Loads a 44-entry weight list (and search settings) for the moves that follow."""
+        reply = await self.request({"weights": [int(round(w)) for w in weights], "search": search_job(search)})
+        if reply is None:
+            raise ValueError("tetris_thinker rejected the weights")
+
+    async def think(self, game):
+        """Inputs for the current state of a TetrisGame, or None if the thinker found no move."""
+        reply = await self.request(game.game_state_to_dict())
+        return None if reply is None else reply["inputs"]
+
+    async def close(self):
+        self.process.stdin.close()
+        await self.process.wait()
+
+    async def kill(self):
+        """Stops the process whatever it's in the middle of."""
+        if self.process.returncode is None:
+            self.process.kill()
+        await self.process.wait()
+
+
+async def play_blitz(thinker, weights, seed, pieces = 360, search = None):
+    """Plays one headless Blitz game with `thinker` choosing every move. Returns the finished game."""
+    await thinker.configure(weights, search)
+    game = new_game("Blitz", seed, pieces)
+
+    while not game.game_over:
+        inputs = await thinker.think(game)
+        if inputs is None:
+            break
+        apply_input_sequence(game, inputs)
+
+    return game
+
+
+async def evaluate_population_async(weight_sets, seeds, pieces = 360, processes = None, search = None, games = None):
+    """Plays every weight set on every seed across `processes` resident thinkers (default: one per core), all from
+    this thread's event loop. Returns the scores as a [weight set][seed] list. `games` limits it to those
+    (weight set, seed) index pairs; the rest are left None."""
+    processes = processes or os.cpu_count() or 1
+    if games is None:
+        games = [(i, j) for i in range(len(weight_sets)) for j in range(len(seeds))]
+    fitness = [[None] * len(seeds) for _ in weight_sets]
+    if not games:
+        return fitness
+
+    # Idle thinkers. A game takes one for its whole length and hands it back only if the game ended cleanly.
+    idle = asyncio.Queue()
+    thinkers = await asyncio.gather(*(ThinkerProcess.start() for _ in range(min(processes, len(games)))))
+    for thinker in thinkers:
+        idle.put_nowait(thinker)
+
+    async def replace(thinker):
+        """Kills a thinker that failed mid-game (dead, or out of step with its replies) and pools a fresh one."""
+        thinkers.remove(thinker)
+        await thinker.kill()
+        replacement = await ThinkerProcess.start()
+        thinkers.append(replacement)
+        idle.put_nowait(replacement)
+
+    async def run_game(i, j):
+        for attempt in range(GAME_ATTEMPTS):
+            thinker = await idle.get()
+            try:
+                game = await play_blitz(thinker, weight_sets[i], seeds[j], pieces, search)
+            except Exception as error:
+                await replace(thinker)
+                if attempt == GAME_ATTEMPTS - 1:
+                    raise
+                print(f"[POOL] Thinker failed on weight set {i}, seed {seeds[j]} ({error}). Replaying on a fresh one.")
+                continue
+            idle.put_nowait(thinker)
+            fitness[i][j] = game.score
+            return
+
+    tasks = [asyncio.ensure_future(run_game(i, j)) for i, j in games]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:  # After a failure, stop the other games before their thinkers are closed
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for thinker in thinkers:
+            await thinker.close()
+
+    return fitness
+
+
+def play_shard(weight_sets, seeds, games, pieces, processes, search):
+    """Worker process entry point: plays its share of the games on its own event loop and thinkers."""
+    return asyncio.run(evaluate_population_async(weight_sets, seeds, pieces, processes, search, games))
+
+
+def evaluate_population(weight_sets, seeds, pieces = 360, processes = None, search = None, workers = None):
+    """Plays every weight set on every seed and returns the scores as a [weight set][seed] list. The games are dealt
+    round-robin to `workers` processes (default: one per THINKERS_PER_WORKER thinkers), which split the `processes`
+    thinkers between them. With one worker the games run in this process."""
+    processes = processes or os.cpu_count() or 1
+    games = [(i, j) for i in range(len(weight_sets)) for j in range(len(seeds))]
+    workers = max(1, min(workers or math.ceil(processes / THINKERS_PER_WORKER), processes, len(games)))
+    if workers == 1:
+        return asyncio.run(evaluate_population_async(weight_sets, seeds, pieces, processes, search))
+
+    shard_games = [games[k::workers] for k in range(workers)]
+    shard_thinkers = [processes // workers + (k < processes % workers) for k in range(workers)]
+    context = multiprocessing.get_context("spawn")  # Fresh interpreters: no forked event loop or subprocess pipes
+    with context.Pool(workers) as pool:
+        shard_fitness = pool.starmap(play_shard, [
+            (weight_sets, seeds, shard_games[k], pieces, shard_thinkers[k], search) for k in range(workers)
+        ])
+
+    fitness = [[None] * len(seeds) for _ in weight_sets]
+    for games, shard in zip(shard_games, shard_fitness):
+        for i, j in games:
+            fitness[i][j] = shard[i][j]
+    return fitness
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Blitz games concurrently against a pool of resident thinkers.")
+    parser.add_argument("--weights", default="default_cold_weights.json", help="weights.json-style file.")
+    parser.add_argument("--seeds", type=int, default=8, help="Games to play, on seeds 0..N-1.")
+    parser.add_argument("--pieces", type=int, default=360)
+    parser.add_argument("--processes", type=int, default=None, help="Thinker processes (default: one per core).")
+    parser.add_argument("--workers", type=int, default=None, help=f"Python game processes (default: one per {THINKERS_PER_WORKER} thinkers).")
+    args = parser.parse_args()
+
+    fitness = evaluate_population([weights_from_json(args.weights)], list(range(args.seeds)), args.pieces, args.processes, workers=args.workers)
+    print(f"[POOL] Scores: {fitness[0]}")
+    print(f"[POOL] Mean score over {args.seeds} seeds: {np.mean(fitness[0]):.1f}")
@@ -0,0 +1,152 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+from collections import namedtuple
+
+from thinker_ffi import THINKER_DIR, DEFAULT_SEARCH
+from thinker_io import weights_from_json
+from headless_play import new_game
+
+# Whole-game fitness runs inside tetris_thinker. `libtetris --simulate` reads a job from stdin, plays a full Blitz game
+# with its own find_moves and lock_piece (same bag sequence per seed, same scoring as TetrisGame.score_clear) and
+# prints the final score and stats as JSON:
+#   result = simulate_blitz(weights, seed=3)          # {"score": ..., "lines": ..., "tspins": ..., "end": "Budget", ...}
+#   python thinker_sim.py --seed 3 --check            # Replay the game through TetrisGame and compare scores
+# `libtetris --batch` plays a whole population (every weight set on every seed) across OS threads in one run:
+#   fitness, results = simulate_batch(weight_sets, seeds=[1, 2, 3])    # fitness[i][j]: score of weight set i on seed j
+#   python thinker_sim.py --check-batch --seeds 6 --threads 4             # Batch scores against one game at a time
+# Both take `search` (DEFAULT_SEARCH keys, e.g. {"depth": 3}) to look ahead through the next queue on every move.
+# Scores leave out drop points, as TetrisGame.apply_placement does.
+
+BINARY_NAME = "libtetris.exe" if sys.platform == "win32" else "libtetris"
+
+# tspin values in the thinker's output, as TetrisGame.T_SPIN_TYPES
+T_SPINS = {"None": False, "Mini": "Mini T-Spin", "Full": "T-Spin"}
+
+# A recorded placement, in the shape TetrisGame.apply_placement takes
+SimulatedPlacement = namedtuple("SimulatedPlacement", ["piece_type", "cells", "t_spin", "hold", "inputs"])
+
+
+def thinker_command(flag, profile = "release"):
+    """The built thinker binary with `flag`, or `cargo run` if it hasn't been built."""
+    binary = os.path.join(THINKER_DIR, "target", profile, BINARY_NAME)
+    if os.path.exists(binary):
+        return [binary, flag]
+    return ["cargo", "run", "--release", "--quiet", "--", flag]
+
+
+def run_thinker(flag, job):
+    """Runs the thinker once with a JSON job on stdin and returns its JSON output."""
+    completed = subprocess.run(thinker_command(flag), cwd=THINKER_DIR, input=json.dumps(job), capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"tetris_thinker {flag} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout)
+
+
+def search_job(search):
+    """DEFAULT_SEARCH with the keys of `search` (or None) filled in, as the job's "search" field."""
+    return {**DEFAULT_SEARCH, **(search or {})}
+
+
+def simulate_blitz(weights, seed, pieces = 360, record = False, search = None):
+    """Plays one Blitz game inside the thinker. `weights` is the 44-entry list weights_to_json takes. Returns the
+    result dict; with record=True, result["placements"] lists every placement for replay_simulation."""
+    job = {
+        "weights": [int(round(w)) for w in weights],
+        "seed": int(seed),
+        "pieces": int(pieces),
+        "record": record,
+        "search": search_job(search),
+    }
+    return run_thinker("--simulate", job)
+
+
+def simulate_batch(weight_sets, seeds, pieces = 360, threads = None, search = None):
+    """Plays every weight set on every seed inside the thinker. `threads` defaults to every core.
+    Returns (fitness, results): scores and full result dicts, both indexed [weight set][seed]."""
+    job = {
+        "weights": [[int(round(w)) for w in weights] for weights in weight_sets],
+        "seeds": [int(seed) for seed in seeds],
+        "pieces": int(pieces),
+        "threads": threads,
+        "search": search_job(search),
+    }
+    output = run_thinker("--batch", job)
+    return output["fitness"], output["results"]
+
+
+def simulated_placements(result):
+    """The recorded placements of a simulation result as SimulatedPlacements."""
+    return [
+        SimulatedPlacement(p["piece"], [tuple(cell) for cell in p["cells"]], T_SPINS[p["tspin"]], p["hold"], p["inputs"])
+        for p in result["placements"]
+    ]
+
+
+def replay_simulation(result, pieces = 360):
+    """Plays a recorded simulation through a headless TetrisGame with the same seed and returns the game."""
+    game = new_game("Blitz", result["seed"], max_pieces=pieces)
+    for placement in simulated_placements(result):
+        if game.game_over:
+            break
+        game.apply_placement(placement)
+    return game
+
+
+def cross_check(weights, seed, pieces = 360, search = None):
+    """Simulates a game in the thinker, replays it through TetrisGame and compares the two.
+    Returns (matches, thinker result, replayed game)."""
+    result = simulate_blitz(weights, seed, pieces, record=True, search=search)
+    game = replay_simulation(result, pieces)
+    placed = pieces - game.total_pieces_placed
+    matches = game.score == result["score"] and game.lines_cleared == result["lines"] and placed == result["pieces"]
+    return matches, result, game
+
+
+def check_batch(weight_sets, seeds, pieces = 360, threads = 2, search = None):
+    """Plays a population through simulate_batch on `threads` threads and again one game at a time through
+    simulate_blitz. Returns (matches, batch fitness, one-at-a-time fitness)."""
+    fitness, _ = simulate_batch(weight_sets, seeds, pieces, threads, search)
+    single = [[simulate_blitz(weights, seed, pieces, search=search)["score"] for seed in seeds] for weights in weight_sets]
+    return fitness == single, fitness, single
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play a Blitz game inside tetris_thinker and check it against TetrisGame.")
+    parser.add_argument("--weights", default="default_cold_weights.json", help="weights.json-style file.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--seeds", type=int, default=1, help="With --check or --check-batch, check seeds --seed..--seed+N-1.")
+    parser.add_argument("--pieces", type=int, default=360)
+    parser.add_argument("--depth", type=int, default=1, help="Pieces to look ahead through the next queue.")
+    parser.add_argument("--beam-width", type=int, default=16, help="Boards kept per depth.")
+    parser.add_argument("--check", action="store_true", help="Replay the game through TetrisGame and compare scores.")
+    parser.add_argument("--check-batch", action="store_true", help="Play the seeds through --batch and one game at a time, and compare scores.")
+    parser.add_argument("--threads", type=int, default=2, help="Threads for --check-batch.")
+    args = parser.parse_args()
+
+    weights = weights_from_json(args.weights)
+    search = {"depth": args.depth, "width": args.beam_width}
+    if args.check:
+        mismatches = 0
+        for seed in range(args.seed, args.seed + args.seeds):
+            matches, result, game = cross_check(weights, seed, args.pieces, search)
+            mismatches += not matches
+            print(f"[SEED {seed}]")
+            print(f"[THINKER] score {result['score']}, {result['lines']} lines, {result['pieces']} pieces ({result['end']})")
+            print(f"[PYTHON]  score {game.score}, {game.lines_cleared} lines, {args.pieces - game.total_pieces_placed} pieces")
+            print("[CHECK] Match." if matches else "[CHECK] MISMATCH.")
+        if args.seeds > 1:
+            print(f"[CHECK] {args.seeds - mismatches}/{args.seeds} seeds match.")
+        sys.exit(0 if mismatches == 0 else 1)
+    elif args.check_batch:
+        seeds = list(range(args.seed, args.seed + args.seeds))
+        matches, fitness, single = check_batch([weights], seeds, args.pieces, args.threads, search)
+        print(f"[BATCH]  {args.threads} threads: {fitness[0]}")
+        print(f"[SINGLE] {single[0]}")
+        print("[CHECK] Match." if matches else "[CHECK] MISMATCH.")
+        sys.exit(0 if matches else 1)
+    else:
+        result = simulate_blitz(weights, args.seed, args.pieces, search=search)
+        print(json.dumps(result, indent=2))
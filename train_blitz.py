@@ -3,7 +3,9 @@ import torch.nn as nn
 import torch.optim as optim
 import gym
 import numpy as np
+import argparse
 from blitz_env import BlitzEnv
+from checkpoint import AsyncCheckpointer, load_checkpoint, rng_state
 
 # Define a simple feedforward model
 class PolicyNetwork(nn.Module):
@@ -26,6 +28,11 @@ num_episodes = 1000
 learning_rate = 0.005
 gamma = 0.99
 max_actions = 75  # Upper bound on how many actions to allow (theoretical max should be 70, but using 75 for a buffer).
+checkpoint_path, checkpoint_every = "blitz_checkpoint.pt", 10  # Written in the background every N episodes; `--resume` continues from it.
+
+parser = argparse.ArgumentParser(description="Train the Blitz policy network with REINFORCE.")
+parser.add_argument("--resume", action="store_true", help=f"Continue from {checkpoint_path}.")
+args = parser.parse_args()
 
 # Initialize environment and model
 env = BlitzEnv()
@@ -35,7 +42,16 @@ input_dim = dummy_obs.shape[0]
 model = PolicyNetwork(input_dim, max_actions)
 optimizer = optim.Adam(model.parameters(), lr=learning_rate)
 
-for episode in range(num_episodes):
+# Resume the model, optimizer and episode count ("generation" in the checkpoint) from the last checkpoint
+start_episode = 0
+resumed = load_checkpoint(checkpoint_path) if args.resume else None
+if resumed is not None:
+    model.load_state_dict(resumed["model"])
+    optimizer.load_state_dict(resumed["optimizer"])
+    start_episode = resumed["generation"]
+checkpointer = AsyncCheckpointer(checkpoint_path, every=checkpoint_every)
+
+for episode in range(start_episode, num_episodes):
     obs = env.reset()
     done = False
     episode_rewards = []
@@ -87,3 +103,8 @@ for episode in range(num_episodes):
     optimizer.step()
 
     print(f"Episode {episode + 1}: Total Reward = {sum(episode_rewards):.2f}")
+
+    if (episode + 1) % checkpoint_every == 0 or episode + 1 == num_episodes:
+        checkpointer.save({"generation": episode + 1, "model": model.state_dict(), "optimizer": optimizer.state_dict(), "rng": rng_state()})
+
+checkpointer.close()
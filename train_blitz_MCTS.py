@@ -5,6 +5,8 @@ import numpy as np
 from blitz_env import BlitzEnv
 import math
 import random
+import argparse
+from checkpoint import AsyncCheckpointer, load_checkpoint, rng_state
 
 # === Model ===
 class ActionScoringModel(nn.Module):
@@ -180,7 +182,9 @@ class MCTS:
         return actions, probs
 
 # === Training Loop ===
-def main():
+checkpoint_path, checkpoint_every = "blitz_mcts_checkpoint.pt", 10  # Written in the background every N episodes
+
+def main(resume=False):
     env = BlitzEnv()
     obs = env.reset()
     obs_dim = obs.shape[0]
@@ -192,8 +196,17 @@ def main():
 
     mcts = MCTS(model, n_simulations=25)
 
+    # Resume the model, optimizer and episode count ("generation" in the checkpoint) from the last checkpoint
+    start_episode = 0
+    resumed = load_checkpoint(checkpoint_path) if resume else None
+    if resumed is not None:
+        model.load_state_dict(resumed["model"])
+        optimizer.load_state_dict(resumed["optimizer"])
+        start_episode = resumed["generation"]
+    checkpointer = AsyncCheckpointer(checkpoint_path, every=checkpoint_every)
+
     num_episodes = 100
-    for episode in range(num_episodes):
+    for episode in range(start_episode, num_episodes):
         obs = env.reset()
         done = False
         total_reward = 0
@@ -213,5 +226,13 @@ def main():
 
         print(f"Episode {episode+1}: Total Score = {total_reward:.2f}")
 
+        if (episode + 1) % checkpoint_every == 0 or episode + 1 == num_episodes:
+            checkpointer.save({"generation": episode + 1, "model": model.state_dict(), "optimizer": optimizer.state_dict(), "rng": rng_state()})
+
+    checkpointer.close()
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Train the Blitz action-scoring model with MCTS self-play.")
+    parser.add_argument("--resume", action="store_true", help=f"Continue from {checkpoint_path}.")
+    args = parser.parse_args()
+    main(resume=args.resume)
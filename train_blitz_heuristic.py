@@ -1,120 +1,116 @@
 import torch
 import json
-import subprocess
-from evotorch import Problem, Solution
+import random
+from evotorch import Problem, Solution, SolutionBatch
 from evotorch.algorithms import SNES
 from evotorch.logging import StdOutLogger
 from blitz_heuristic_env import BlitzHeuristicEnv
+from thinker_io import weights_to_json, run_quiet_thinker
+from thinker_ffi import Thinker, library_available
+from thinker_sim import simulate_batch, search_job
+from thinker_pool import evaluate_population
+from fitness_cache import FitnessCache
+from racing import successive_halving, race_evals, summarize
+from checkpoint import AsyncCheckpointer, load_checkpoint, snes_init, remaining_generations
+import argparse
+from spectator import SpectatorPublisher, start_spectator
 import numpy as np
 
-def weights_to_json(filename, weight_list):
-
-    weight_dict = {
-    "back_to_back": weight_list[0],
-    "bumpiness": weight_list[1],
-    "bumpiness_sq": weight_list[2],
-    "row_transitions": weight_list[3],
-    "height": weight_list[4],
-    "top_half": weight_list[5],
-    "top_quarter": weight_list[6],
-    "jeopardy": weight_list[7],
-    "cavity_cells": weight_list[8],
-    "cavity_cells_sq": weight_list[9], 
-    "overhang_cells": weight_list[10], 
-    "overhang_cells_sq": weight_list[11], 
-    "covered_cells": weight_list[12],
-    "covered_cells_sq": weight_list[13],
-    "tslot": weight_list[14:18], 
-    "well_depth": weight_list[18],
-    "max_well_depth": weight_list[19],
-    "well_column": weight_list[20:30],
-
-    "move_time": weight_list[30],
-    "wasted_t": weight_list[31],
-    "b2b_clear": weight_list[32],
-    "clear1": weight_list[33],
-    "clear2": weight_list[34],
-    "clear3": weight_list[35],
-    "clear4": weight_list[36],
-    "tspin1": weight_list[37],
-    "tspin2": weight_list[38],
-    "tspin3": weight_list[39], 
-    "mini_tspin1": weight_list[40],
-    "mini_tspin2": weight_list[41],
-    "perfect_clear": weight_list[42],
-    "combo_garbage": weight_list[43]
-    }
-    
-    formatted_json = json.dumps(weight_dict, indent = 2)
-
-    with open(filename, "w") as f:
-        f.write(formatted_json)
-
-def write_compact_field_json(filename, game_state):
-    # Manually extract and format the 'field' array
-    field = game_state.pop("field")  # Temporarily remove it from the dict
-
-    # Serialize the field with compact row formatting
-    field_str = '  "field": [\n'
-    for i, row in enumerate(field):
-        row_str = "    " + json.dumps(row)
-        if i != len(field) - 1:
-            row_str += ","
-        field_str += row_str + "\n"
-    field_str += "  ],"  # <--- Add comma here to separate from next key
-
-    # Serialize the rest of the dictionary as normal
-    partial_json = json.dumps(game_state, indent=2)
-
-    # Insert field block after the opening brace
-    lines = partial_json.splitlines()
-    lines.insert(1, field_str)
-    final_json = "\n".join(lines)
-
-    # Write to file
-    with open(filename, "w") as f:
-        f.write(final_json)
-
-def unpack_game_actions(filename):
-    with open(filename, "r") as f:
-        return json.load(f)
-
 use_established_weights = True
 
 # Define the now less-than-lightweight problem
 class HeuristicTetrisProblem(Problem):
-    def __init__(self, lower_bound = -100, upper_bound = 100, render_env = False):
+    def __init__(self, lower_bound = -100, upper_bound = 100, render_env = False, spectator_queue = None, use_thinker_library = False, use_thinker_simulation = False, simulation_seeds = 4, simulation_threads = None, thinker_search = None, use_thinker_pool = False, pool_processes = None, fitness_cache = None, fixed_seeds = None, racing_rungs = None):
         super().__init__(
             objective_sense="max",
             solution_length=44,  # 44 weights (technically 32 since two of them are lists).
             initial_bounds=(lower_bound, upper_bound)
         )
         self.env = BlitzHeuristicEnv(render_env)
+        self.use_thinker_library = use_thinker_library
+        self.use_thinker_simulation = use_thinker_simulation
+        self.simulation_seeds = simulation_seeds # Bag seeds per generation, shared by the whole population
+        self.simulation_threads = simulation_threads # None uses every core
+        self.thinker_search = thinker_search # Beam search settings for every move, e.g. {"depth": 3}. None is depth 1.
+        self.use_thinker_pool = use_thinker_pool
+        self.pool_processes = pool_processes # Resident thinker processes; None for one per core
+        self.fitness_cache = fitness_cache # FitnessCache for simulated/pooled generations, or None
+        self.fixed_seeds = fixed_seeds # Seeds played every generation, or None for fresh ones each generation
+        self.racing_rungs = racing_rungs # [(games, pieces), ...] to race candidates (racing.py), or None for one rung of full games
+
+        # Optional spectator: the game publishes snapshots to a renderer process instead of drawing itself
+        if spectator_queue is not None:
+            self.env.game.spectator = SpectatorPublisher(spectator_queue)
+
+    def _play_games(self, weight_sets, seeds, pieces = 360):
+        """Scores of every weight set on every seed as [weight set][seed], from the thinker's simulation or the pool."""
+        if self.use_thinker_simulation:
+            evaluator = "simulate"
+            evaluate_fn = lambda weights, seeds: simulate_batch(weights, seeds, pieces, threads=self.simulation_threads, search=self.thinker_search)[0]
+        else:
+            evaluator = "pool"
+            evaluate_fn = lambda weights, seeds: evaluate_population(weights, seeds, pieces, processes=self.pool_processes, search=self.thinker_search)
+
+        # Rounded weights that were already played on these seeds (this run or an earlier one) are looked up, not replayed
+        if self.fitness_cache is None:
+            return evaluate_fn(weight_sets, seeds)
+        fitness = self.fitness_cache.evaluate(weight_sets, seeds, evaluate_fn, evaluator=evaluator, pieces=pieces, search=search_job(self.thinker_search))
+        print(f"[Fitness cache] {self.fitness_cache.hits} hits, {self.fitness_cache.misses} misses, {len(self.fitness_cache)} entries.")
+        return fitness
+
+    def _evaluate_batch(self, batch: SolutionBatch):
+        # Whole games inside the thinker: the population plays the same fresh seeds, all in one call per generation.
+        # Fitness is the mean score over the seeds; simulated scores leave out drop points.
+        # With the thinker pool, TetrisGame plays the same games instead, many at once against resident thinkers.
+        if not (self.use_thinker_simulation or self.use_thinker_pool):
+            return super()._evaluate_batch(batch)
+
+        weight_sets = np.round(batch.values.cpu().numpy()).astype(np.int32).tolist()
+        label = "Simulated" if self.use_thinker_simulation else "Pooled"
+
+        # Racing: short games for everyone, more and longer ones for the best (see racing.py). Scores are scaled to a
+        # 360-piece game so rungs compare.
+        if self.racing_rungs is not None:
+            def play_rung(candidates, seeds, pieces):
+                scores = self._play_games([weight_sets[i] for i in candidates], seeds, pieces)
+                return [[score * 360 / pieces for score in row] for row in scores]
+
+            results = successive_halving(len(weight_sets), play_rung, self.racing_rungs, seeds=self.fixed_seeds)
+            print(f"[{label} race] {summarize(results, self.racing_rungs)}")
+            batch.set_evals(torch.as_tensor(race_evals(results), dtype=torch.float32))
+            return
+
+        if self.fixed_seeds is not None:
+            seeds = list(self.fixed_seeds)
+        else:
+            seeds = [random.randrange(2**32) for _ in range(self.simulation_seeds)]
+        fitness = self._play_games(weight_sets, seeds)
+
+        mean_fitness = np.mean(fitness, axis=1)
+        print(f"[{label} generation] {len(weight_sets)} weight sets x {len(seeds)} seeds. Best mean reward: {mean_fitness.max():.1f}")
+        batch.set_evals(torch.as_tensor(mean_fitness, dtype=torch.float32))
 
     def _evaluate(self, solution: Solution):
         raw_weights = solution.values.cpu().numpy() # Store the weights as a list.
         rounded_weights = np.round(raw_weights).astype(np.int32) # Convert to the i32 format the thinker expects
         weights = rounded_weights.tolist()
         episode_reward = 0.0
-        self.env.reset()
 
-        # Write weights to file. Only done once per episode, which is why it's outside the loop.
-        weights_to_json("tetris_thinker/weights.json", weights)
+        # In-process thinker: one weight set loaded for the whole episode, one library call per move
+        if self.use_thinker_library:
+            thinker = Thinker(weights, search=self.thinker_search)
+        else:
+            thinker = None
+            # Write weights to file. Only done once per episode, which is why it's outside the loop.
+            weights_to_json("tetris_thinker/weights.json", weights)
 
         for step in range(1000):
 
-            # Grab game state and write it to json.
-            game_state = self.env.game.game_state_to_dict()
-            write_compact_field_json("tetris_thinker/input.json", game_state)
-
-            # Call `/tetris_thinker` and get the move sequence
-            subprocess.run(
-                ["cargo", "run"],
-                cwd="tetris_thinker",
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            ) # Waits for program to finish before continuing code
-            best_sequence = unpack_game_actions("tetris_thinker/selected_actions.json")
+            if thinker is not None:
+                best_sequence, _ = thinker.think(self.env.game)
+            else:
+                # Call `/tetris_thinker` on the current game state and get the move sequence
+                best_sequence = run_quiet_thinker(self.env.game.game_state_to_dict(), search=self.thinker_search)["best"]["inputs"]
 
             episode_reward, done, _ = self.env.step(best_sequence)
 
@@ -122,6 +118,8 @@ class HeuristicTetrisProblem(Problem):
                 print(f"[Episode {self.env.reset_tracker}] Done after {step+1} steps. Reward: {episode_reward}")
                 break
 
+        if thinker is not None:
+            thinker.close()
         solution.set_evals(episode_reward)
 
 
@@ -129,16 +127,58 @@ class HeuristicTetrisProblem(Problem):
 use_established_weights = True
 established_weights_path = "default_cold_weights.json"
 render_environment = True
+spectate = False # Watch training in a separate window without slowing it down. Turns off render_environment.
+use_thinker_simulation = False # Play whole episodes inside the thinker, one `--batch` call per generation. No rendering or spectating.
+use_thinker_pool = False # Play each generation's games concurrently in Python, one resident `--serve` thinker per core. No rendering or spectating.
+simulation_seeds, simulation_threads = 4, None # Seeds each weight set plays per generation (simulation or pool); threads (None for every core)
+pool_processes = None # Resident thinkers in the pool (None for one per core)
+use_fitness_cache = True # Look up simulated/pooled fitness of rounded weights already played (fitness_cache.jsonl), across generations and runs.
+racing_rungs = None # e.g. [(2, 60), (4, 180), (8, 360)]: (games per candidate, pieces per game) for successive halving. Needs simulation or the pool.
+fixed_seeds = None # e.g. range(4): play the same seeds every generation. None draws fresh seeds, unless the fitness cache is on (see below).
+thinker_search = {"depth": 1, "width": 16} # Pieces the thinker looks ahead through the next queue per move, and boards kept per depth.
+use_thinker_library = True # Call the thinker in-process (needs `cargo build --release` in tetris_thinker/) instead of `cargo run` per move.
 lower_bound, upper_bound, initial_stdev = 0, 0, 0
 population_size, num_generations = 10, 10
+checkpoint_path, checkpoint_every = "blitz_heuristic_checkpoint.pt", 1 # Written in the background every N generations; `--resume` continues from it.
 
 # Set up and run the search
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the thinker's heuristic weights for Blitz with SNES.")
+    parser.add_argument("--resume", action="store_true", help=f"Continue from {checkpoint_path}.")
+    args = parser.parse_args()
+
+    spectator_queue = None
+    if spectate:
+        spectator_queue, _ = start_spectator(num_boards=1)
+        render_environment = False
+
+    if use_thinker_simulation or use_thinker_pool:
+        render_environment = False # Nothing is played through the env
+
+    if use_thinker_library and not library_available():
+        print("[SETUP] Thinker library not built (run `cargo build --release` in tetris_thinker/). Falling back to `cargo run`.")
+        use_thinker_library = False
+
+    fitness_cache = FitnessCache() if use_fitness_cache and (use_thinker_simulation or use_thinker_pool) else None
+
+    # Cache entries are keyed by seed set, so fresh seeds every generation would never hit, not even on a re-run after a
+    # crash. With the cache on, every generation (and every run) plays the same seeds, enough for the longest race rung.
+    if fitness_cache is not None and fixed_seeds is None:
+        fixed_seeds = range(max([simulation_seeds] + [games for games, _ in racing_rungs or []]))
+        print(f"[SETUP] Fitness cache on: every generation plays seeds 0-{len(fixed_seeds) - 1}.")
+
     print("[SETUP] Initializing Heuristic Tetris Problem...")
-    problem = HeuristicTetrisProblem(lower_bound, upper_bound, render_environment)
+    problem = HeuristicTetrisProblem(lower_bound, upper_bound, render_environment, spectator_queue, use_thinker_library, use_thinker_simulation, simulation_seeds, simulation_threads, thinker_search, use_thinker_pool, pool_processes, fitness_cache, fixed_seeds, racing_rungs)
+
+    resumed = load_checkpoint(checkpoint_path) if args.resume else None
+
+    # Resuming: carry on from the saved search distribution
+    if resumed is not None:
+        print("[SETUP] Initializing SNES optimizer from the checkpoint...")
+        searcher = SNES(problem, popsize = population_size, **snes_init(resumed))
 
     # If weights are being imported:
-    if use_established_weights:
+    elif use_established_weights:
         # Load predefined/pretrained weights.
         with open(established_weights_path) as f:
             saved_weights = json.load(f)
@@ -192,13 +232,16 @@ if __name__ == "__main__":
         searcher = SNES(problem, popsize = population_size, stdev_init = initial_stdev)
 
     logger = StdOutLogger(searcher)
+    checkpointer = AsyncCheckpointer(checkpoint_path, every = checkpoint_every)
+    checkpointer.attach(searcher, resumed)
 
     print("[TRAINING] Starting evolutionary search...") 
-    searcher.run(num_generations)
+    searcher.run(remaining_generations(resumed, num_generations))
     print("[TRAINING] Finished.")
+    checkpointer.close()
 
-    best = searcher.status["best"]
-    print("[RESULT] Best weights found:", best.values.tolist())
+    best_values, _ = checkpointer.best()
+    print("[RESULT] Best weights found:", best_values.tolist())
 
     # Empty the .json files at the end of the script.
     with open("tetris_thinker/selected_actions.json", 'w') as file:
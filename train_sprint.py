@@ -2,6 +2,9 @@ from evotorch import Problem, Solution
 from evotorch.algorithms import SNES
 from evotorch.logging import StdOutLogger
 from tetris_env import TetrisEnv
+from spectator import SpectatorPublisher, start_spectator
+from checkpoint import AsyncCheckpointer, load_checkpoint, snes_init, remaining_generations
+import argparse
 import torch
 import torch.nn as nn
 import numpy as np
@@ -37,13 +40,17 @@ class LinearMLP(nn.Module):
 
 # Step 1: Define a custom Problem class
 class TetrisSprintProblem(Problem):
-    def __init__(self):
+    def __init__(self, render_env = True, spectator_queue = None):
         super().__init__(
             objective_sense="max",       
             solution_length=34433,  # Updated for new MLP: (536 * 64) + 64 + (64 * 1) + 1
             initial_bounds=(-1, 1),
         )
-        self.env = TetrisEnv(mode="Sprint")
+        self.env = TetrisEnv(mode="Sprint", render_env=render_env)
+
+        # Optional spectator: the game publishes snapshots to a renderer process instead of drawing itself
+        if spectator_queue is not None:
+            self.env.game.spectator = SpectatorPublisher(spectator_queue)
         self.policy_model = LinearMLP(input_dim=536, hidden_dim=64, output_dim=1)
 
 
@@ -53,7 +60,7 @@ class TetrisSprintProblem(Problem):
         self.env.reset()  # No longer assigned to obs
 
         for step in range(25000):
-            drop_dict = self.env.game.get_all_viable_hard_drops()
+            drop_dict, _ = self.env.game.get_all_viable_hard_drops()
             placement_keys = list(drop_dict.keys())
             placement_grids = list(drop_dict.values())
 
@@ -65,27 +72,9 @@ class TetrisSprintProblem(Problem):
             # print(f"[DEBUG] Step {step:04}: {len(placement_keys)} drop options")
 
             # Store both current and future grid together in the observation
-            current_grid = self.env.game.grid
-            piece_type = self.env.game.current_piece_type
-            hold = self.env.game.held_piece
-            queue = self.env.game.next_queue
-            current_rotation = self.env.game.current_rotation
-
-            observations = []
-
-            for i, future_grid in enumerate(placement_grids):
-
-                obs_vec = self.env.get_observation(
-                    grid=future_grid,
-                    piece_type=piece_type,
-                    rotation=current_rotation,
-                    hold=hold,
-                    next_queue=queue,
-                    current_grid=current_grid  # <-- add current grid here
-                )
-                observations.append(obs_vec)
-
-            obs_tensor = torch.tensor(np.stack(observations), dtype=torch.float32)  # (N, D)
+            observations = self.env.get_candidate_observations(placement_grids)
+
+            obs_tensor = torch.tensor(observations, dtype=torch.float32)  # (N, D)
             scores = self.policy_model(obs_tensor, weights).squeeze(dim=1)  # (N,)
 
             chosen_idx = torch.argmax(scores).item()
@@ -103,24 +92,51 @@ class TetrisSprintProblem(Problem):
 
         solution.set_evals(total_reward)
 
-# Step 2: Initialize the problem
-print("[SETUP] Initializing problem...")
-problem = TetrisSprintProblem()
-
-# Step 3: Set up the SNES searcher
-print("[SETUP] Initializing SNES optimizer...")
-searcher = SNES(problem, popsize=100, stdev_init=1.0)
-
-# Step 4: Attach a logger to track progress
-logger = StdOutLogger(searcher)
-
-# Step 5: Run the training loop
-print("[TRAINING] Starting evolutionary training...")
-searcher.run(500)
-print("[TRAINING] Finished training loop.")
-
-# Step 6: Save the best solution
-print("[SAVE] Saving best model...")
-best = searcher.status["best"]
-torch.save(best.values, "sprint_best_snes.pt")
-print("[DONE] Training complete! Best model saved to sprint_best_snes.pt")
+# Set to a flat weight file from imitation_data.py to start SNES from a pretrained network instead of from scratch.
+pretrained_weights_path = None
+render_environment = True
+spectate = False # Watch training in a separate window without slowing it down. Turns off render_environment.
+checkpoint_path, checkpoint_every = "sprint_checkpoint.pt", 5 # Written in the background every N generations; `--resume` continues from it.
+num_generations = 500
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the Sprint MLP with SNES.")
+    parser.add_argument("--resume", action="store_true", help=f"Continue from {checkpoint_path}.")
+    args = parser.parse_args()
+
+    # Step 2: Initialize the problem
+    spectator_queue = None
+    if spectate:
+        spectator_queue, _ = start_spectator(num_boards=1)
+        render_environment = False
+
+    print("[SETUP] Initializing problem...")
+    problem = TetrisSprintProblem(render_environment, spectator_queue)
+
+    # Step 3: Set up the SNES searcher
+    print("[SETUP] Initializing SNES optimizer...")
+    resumed = load_checkpoint(checkpoint_path) if args.resume else None
+    if resumed is not None:
+        searcher = SNES(problem, popsize=100, **snes_init(resumed))
+    elif pretrained_weights_path:
+        print(f"[SETUP] Centering SNES on pretrained weights from {pretrained_weights_path}...")
+        searcher = SNES(problem, popsize=100, stdev_init=0.1, center_init=torch.load(pretrained_weights_path))
+    else:
+        searcher = SNES(problem, popsize=100, stdev_init=1.0)
+
+    # Step 4: Attach a logger to track progress
+    logger = StdOutLogger(searcher)
+    checkpointer = AsyncCheckpointer(checkpoint_path, every=checkpoint_every)
+    checkpointer.attach(searcher, resumed)
+
+    # Step 5: Run the training loop
+    print("[TRAINING] Starting evolutionary training...")
+    searcher.run(remaining_generations(resumed, num_generations))
+    print("[TRAINING] Finished training loop.")
+    checkpointer.close()
+
+    # Step 6: Save the best solution (across resumed runs)
+    print("[SAVE] Saving best model...")
+    best_values, _ = checkpointer.best()
+    torch.save(best_values, "sprint_best_snes.pt")
+    print("[DONE] Training complete! Best model saved to sprint_best_snes.pt")
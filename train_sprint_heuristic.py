@@ -1,19 +1,58 @@
 import torch
-from evotorch import Problem, Solution
+from evotorch import Problem, Solution, SolutionBatch
 from evotorch.algorithms import SNES
 from evotorch.logging import StdOutLogger
 from sprint_env import SprintHeuristicEnv
+from placement_export import PlacementExporter, board_features
+from spectator import SpectatorPublisher, start_spectator
+from headless_play import play_heuristic_game
+from racing import successive_halving, race_evals, summarize
+from checkpoint import AsyncCheckpointer, load_checkpoint, snes_init, remaining_generations
+import argparse
 import numpy as np
 
+def sprint_fitness(game, lines = 40):
+    """SprintHeuristicEnv's end-of-game reward for a finished headless game with a `lines` goal. A win's piece count is
+    scaled to a 40-line game, so games with shorter goals score on the same scale."""
+    if game.lines_cleared == 0:
+        return -game.total_pieces_placed * 40 / lines
+    lines_actually_cleared = lines - game.lines_cleared
+    return game.total_pieces_placed + (lines_actually_cleared * 5) - 550
+
+
 # Define the lightweight problem
 class HeuristicTetrisProblem(Problem):
-    def __init__(self):
+    def __init__(self, export_dir = None, render_env = True, spectator_queue = None, racing_rungs = None):
         super().__init__(
             objective_sense="max",
             solution_length=4,  # a, b, c, d
             initial_bounds=(-1.0, 1.0)
         )
-        self.env = SprintHeuristicEnv()
+        self.env = SprintHeuristicEnv(render_env)
+
+        # Optional spectator: the game publishes snapshots to a renderer process instead of drawing itself
+        if spectator_queue is not None:
+            self.env.game.spectator = SpectatorPublisher(spectator_queue)
+
+        # Optional per-placement dataset export (see placement_export.py)
+        self.exporter = PlacementExporter(export_dir) if export_dir else None
+        self.games_played = 0
+        self.racing_rungs = racing_rungs # [(games, line goal), ...] to race candidates (racing.py), or None
+
+    def _evaluate_batch(self, batch: SolutionBatch):
+        # Racing: a few short headless games for everyone, more and longer ones for the best (see racing.py).
+        # Played without the env, so nothing is rendered, spectated or exported.
+        if self.racing_rungs is None:
+            return super()._evaluate_batch(batch)
+
+        weight_sets = batch.values.cpu().numpy()
+
+        def play_rung(candidates, seeds, lines):
+            return [[sprint_fitness(play_heuristic_game(weight_sets[i], "Sprint", seed, lines=lines), lines) for seed in seeds] for i in candidates]
+
+        results = successive_halving(len(weight_sets), play_rung, self.racing_rungs)
+        print(f"[Race] {summarize(results, self.racing_rungs)}")
+        batch.set_evals(torch.as_tensor(race_evals(results), dtype=torch.float32))
 
     def _evaluate(self, solution: Solution):
         weights = solution.values.cpu().numpy()
@@ -30,27 +69,58 @@ class HeuristicTetrisProblem(Problem):
             # Choose best move based on heuristic score
             best_move = max(drop_heuristics.items(), key=lambda x: x[1])[0]
 
+            if self.exporter is not None:
+                features = board_features(self.env.game)
+                score_before = self.env.game.score
+
             _, reward, done, _ = self.env.step(best_move)
             total_reward += reward
 
+            if self.exporter is not None:
+                self.exporter.add_placement(self.env.game, self.games_played, step, features, best_move, drop_heuristics, self.env.game.score - score_before)
+
             if done:
                 print(f"[Episode {self.env.reset_tracker}] Done after {step+1} steps. Reward: {total_reward}")
                 break
 
+        self.games_played += 1
         solution.set_evals(total_reward)
 
 # Set up and run the search
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the four-weight Sprint heuristic with SNES.")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint.")
+    args = parser.parse_args()
+
+    export_dir = None  # e.g. "placement_data" to stream every training placement to columnar shards
+    render_environment = True
+    spectate = False  # Watch training in a separate window without slowing it down. Turns off render_environment.
+    racing_rungs = None  # e.g. [(2, 10), (4, 20), (8, 40)]: (games per candidate, line goal) for successive halving instead of one game each
+    checkpoint_path, checkpoint_every = "sprint_heuristic_checkpoint.pt", 5  # Written in the background every N generations
+    num_generations = 50
+
+    spectator_queue = None
+    if spectate:
+        spectator_queue, _ = start_spectator(num_boards=1)
+        render_environment = False
+
     print("[SETUP] Initializing Heuristic Tetris Problem...")
-    problem = HeuristicTetrisProblem()
+    problem = HeuristicTetrisProblem(export_dir, render_environment, spectator_queue, racing_rungs)
 
     print("[SETUP] Initializing SNES optimizer...")
-    searcher = SNES(problem, popsize=50, stdev_init=0.25)
+    resumed = load_checkpoint(checkpoint_path) if args.resume else None
+    searcher = SNES(problem, popsize=50, **snes_init(resumed, stdev_init=0.25))
     logger = StdOutLogger(searcher)
+    checkpointer = AsyncCheckpointer(checkpoint_path, every=checkpoint_every)
+    checkpointer.attach(searcher, resumed)
 
     print("[TRAINING] Starting evolutionary search...")
-    searcher.run(50)
+    searcher.run(remaining_generations(resumed, num_generations))
     print("[TRAINING] Finished.")
+    checkpointer.close()
+
+    if problem.exporter is not None:
+        problem.exporter.close()
 
-    best = searcher.status["best"]
-    print("[RESULT] Best weights found:", best.values.tolist())
\ No newline at end of file
+    best_values, _ = checkpointer.best()
+    print("[RESULT] Best weights found:", best_values.tolist())
\ No newline at end of file